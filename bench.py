@@ -0,0 +1,109 @@
+# stdlib
+import argparse
+import os
+import socket
+import time
+import uuid
+
+# third party
+from langchain_core.messages import HumanMessage
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run questions end to end through the dbt Assistant graph and time each "
+            "turn.  Combine with DBT_CASSETTE_MODE=record to capture a cassette and "
+            "DBT_CASSETTE_MODE=replay to benchmark it offline."
+        )
+    )
+    parser.add_argument("questions", nargs="*", help="Questions to ask, in order.")
+    parser.add_argument(
+        "--file", help="File with one question per line (used after positional ones)."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Number of times to run the questions."
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help=(
+            "Fail any attempt to open a network connection.  Without questions, only "
+            "checks that the graph can be built (e.g. with DBT_CASSETTE_MODE=replay)."
+        ),
+    )
+    return parser.parse_args()
+
+
+def _block_network():
+    def refuse(*args, **kwargs):
+        raise ConnectionRefusedError("Network access is disabled by --offline")
+
+    socket.socket.connect = refuse
+    socket.socket.connect_ex = refuse
+    socket.create_connection = refuse
+    socket.getaddrinfo = refuse
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    questions = list(args.questions)
+    if args.file:
+        with open(args.file) as f:
+            questions.extend(line.strip() for line in f if line.strip())
+
+    if not questions and not args.offline:
+        raise SystemExit("Provide at least one question.")
+
+    if args.offline:
+        _block_network()
+
+    # Imported late so the cassette env vars are picked up by the graph
+    from dbt_assistant.graph import graph
+
+    if not questions:
+        print(f"Built the graph offline ({len(graph.nodes)} nodes).")
+        raise SystemExit(0)
+
+    print(f"Cassette mode: {os.getenv('DBT_CASSETTE_MODE', 'off')}")
+    timings = []
+    for iteration in range(args.repeat):
+        # Each iteration is a fresh conversation so replays line up with recordings
+        config = {
+            "configurable": {"thread_id": str(uuid.uuid4())},
+            "recursion_limit": 50,
+        }
+        history = []
+        for question in questions:
+            history.append(HumanMessage(content=question))
+            start = time.perf_counter()
+            steps = sum(1 for _ in graph.stream({"messages": history}, config))
+            elapsed = time.perf_counter() - start
+            timings.append(elapsed)
+            print(f"[{iteration + 1}] {elapsed:8.3f}s  {steps:3d} steps  {question}")
+
+    print(
+        f"Total: {sum(timings):.3f}s over {len(timings)} turns "
+        f"(mean {sum(timings) / len(timings):.3f}s)"
+    )
+
+    from dbt_assistant.utils.render import MEASURE_TOKENS, token_savings
+
+    if MEASURE_TOKENS:
+        print("Tool output tokens (raw JSON -> rendered):")
+        for row in token_savings.summary():
+            print(
+                f"  {row['name']:<28} {row['calls']:4d} calls  "
+                f"{row['raw_tokens']:8d} -> {row['rendered_tokens']:8d}  "
+                f"({row['saved_pct']}% saved)"
+            )
+
+    from dbt_assistant.queries import query_stats
+
+    print("Discovery API queries:")
+    for row in query_stats.summary():
+        print(
+            f"  {row['name']:<28} {row['calls']:4d} calls  {row['errors']:3d} errors  "
+            f"{row['short_circuited']:3d} short-circuited  "
+            f"{row['total_s']:8.3f}s total  {row['mean_s']:.3f}s mean"
+        )
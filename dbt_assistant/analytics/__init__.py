@@ -0,0 +1,27 @@
+from .changepoint import detect_changes
+from .columnar import to_markdown_table
+from .execution import ExecutionHistory, summarize_execution_history
+from .flakiness import TestHistory, summarize_test_history
+from .freshness import FreshnessTable, summarize_freshness
+from .run_history import RunHistory, summarize_run_history
+from .run_timing import RunTiming, summarize_run_timing
+from .simulation import RunSimulator
+from .usage import query_history_matrix, summarize_query_history
+
+__all__ = [
+    "ExecutionHistory",
+    "FreshnessTable",
+    "RunHistory",
+    "RunSimulator",
+    "RunTiming",
+    "TestHistory",
+    "detect_changes",
+    "query_history_matrix",
+    "summarize_execution_history",
+    "summarize_freshness",
+    "summarize_query_history",
+    "summarize_run_history",
+    "summarize_run_timing",
+    "summarize_test_history",
+    "to_markdown_table",
+]
@@ -0,0 +1,236 @@
+# stdlib
+import math
+from typing import Dict, List, Tuple
+
+# third party
+import numpy as np
+
+# first party
+from dbt_assistant.analytics.columnar import (
+    grouped_count,
+    grouped_mean,
+    grouped_percentile,
+)
+from dbt_assistant.analytics.execution import ExecutionHistory
+
+_erfc = np.vectorize(math.erfc, otypes=[np.float64])
+
+
+def grouped_ranks(values: np.ndarray, groups: np.ndarray, n_groups: int):
+    """1-based rank of every value within its group, ties sharing their average rank.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The rank of every row (in the original order)
+            and the tie correction term, sum(t^3 - t) over tied runs, of every group.
+    """
+    ranks = np.empty(len(values), dtype=np.float64)
+    ties = np.zeros(n_groups, dtype=np.float64)
+    if len(values) == 0:
+        return ranks, ties
+
+    order = np.lexsort((values, groups))
+    sorted_values, sorted_groups = values[order], groups[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    position = np.arange(len(values)) - starts[sorted_groups]
+
+    # A run is a stretch of equal values within the same group
+    new_run = np.ones(len(values), dtype=bool)
+    new_run[1:] = (sorted_values[1:] != sorted_values[:-1]) | (
+        sorted_groups[1:] != sorted_groups[:-1]
+    )
+    run = np.cumsum(new_run) - 1
+    run_first = position[new_run]
+    run_size = np.bincount(run).astype(np.float64)
+    ranks[order] = run_first[run] + (run_size[run] + 1) / 2
+
+    run_groups = sorted_groups[new_run]
+    ties = np.bincount(run_groups, weights=run_size**3 - run_size, minlength=n_groups)
+    return ranks, ties
+
+
+def mann_whitney(
+    values: np.ndarray, groups: np.ndarray, n_groups: int, is_after: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Two-sided Mann-Whitney U test of "after" vs "before" rows for every group at
+    once, using the normal approximation with tie and continuity corrections.
+
+    Returns:
+        Dict[str, np.ndarray]: Per group `n_before`, `n_after`, `u` (the U statistic
+            of the "after" rows), `p_value` and `effect` - the rank-biserial
+            correlation, from -1 (every run after is faster) to 1 (every run after
+            is slower).
+    """
+    ranks, ties = grouped_ranks(values, groups, n_groups)
+    n_after = grouped_count(groups, n_groups, is_after)
+    n_before = grouped_count(groups, n_groups) - n_after
+    n = n_before + n_after
+    rank_sum_after = np.bincount(
+        groups, weights=np.where(is_after, ranks, 0), minlength=n_groups
+    )
+    u = rank_sum_after - n_after * (n_after + 1) / 2
+    pairs = n_before * n_after
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = pairs / 12 * ((n + 1) - ties / (n * (n - 1)))
+        deviation = np.maximum(np.abs(u - pairs / 2) - 0.5, 0)
+        z = np.where(variance > 0, deviation / np.sqrt(variance), np.nan)
+        p_value = np.where(np.isfinite(z), _erfc(np.nan_to_num(z) / math.sqrt(2)), 1)
+        effect = np.where(pairs > 0, 2 * u / pairs - 1, np.nan)
+
+    return {
+        "n_before": n_before,
+        "n_after": n_after,
+        "u": u,
+        "p_value": p_value,
+        "effect": effect,
+    }
+
+
+def cusum_change_point(
+    values: np.ndarray, order_by: np.ndarray, groups: np.ndarray, n_groups: int
+) -> np.ndarray:
+    """Locate the most likely shift in the mean of every group with CUSUM: the point
+    where the cumulative sum of deviations from the group mean peaks.
+
+    Returns:
+        np.ndarray: Per group, the index (into `values`) of the first row after the
+            change point, or -1 when the group has fewer than two rows.
+    """
+    result = np.full(n_groups, -1, dtype=np.int64)
+    if len(values) == 0:
+        return result
+
+    order = np.lexsort((order_by, groups))
+    sorted_groups = groups[order]
+    deviation = values[order] - grouped_mean(values, groups, n_groups)[sorted_groups]
+    cusum = np.cumsum(deviation)
+    # Turn the running sum into one that restarts for every group
+    counts = np.bincount(groups, minlength=n_groups)
+    ends = np.cumsum(counts)
+    offsets = np.concatenate(([0.0], cusum[ends[:-1] - 1]))
+    strength = np.abs(cusum - offsets[sorted_groups])
+
+    # The last row of a group always sums back to ~0, so it can't be the peak
+    is_last = np.zeros(len(values), dtype=bool)
+    is_last[ends[counts > 0] - 1] = True
+    strength[is_last] = -1
+
+    peak = np.lexsort((-strength, sorted_groups))
+    starts = ends - counts
+    has_change = counts > 1
+    first_after_peak = peak[starts[has_change]] + 1
+    result[has_change] = order[first_after_peak]
+    return result
+
+
+def detect_changes(
+    history: ExecutionHistory,
+    changed_at: np.ndarray,
+    *,
+    alpha: float = 0.05,
+    min_runs: int = 3,
+    min_change_pct: float = 10.0,
+) -> List[Dict]:
+    """Compare the execution time of every model before and after it changed.
+
+    Args:
+        history (ExecutionHistory): Execution history of the models.
+        changed_at (np.ndarray): datetime64 of the change, one per model in
+            `history.unique_ids`.
+        alpha (float, optional): Significance level. Defaults to 0.05.
+        min_runs (int, optional): Runs needed on both sides of the change to reach
+            a verdict. Defaults to 3.
+        min_change_pct (float, optional): Smallest change in median execution time
+            worth calling a regression or improvement. Defaults to 10.0.
+
+    Returns:
+        List[Dict]: One row per model with the verdict, median execution time before
+            and after, the change in percent, the effect size, p-value and where
+            CUSUM places the shift.
+    """
+    n = len(history.unique_ids)
+    valid = np.isfinite(history.execution_time) & ~np.isnat(history.started_at)
+    model = history.model[valid]
+    seconds = history.execution_time[valid]
+    started_at = history.started_at[valid]
+
+    changed_at = np.asarray(changed_at, dtype="datetime64[s]")
+    is_after = started_at >= changed_at[model]
+    test = mann_whitney(seconds, model, n, is_after)
+    median_before, median_after = _medians(seconds, model, n, is_after)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change_pct = (median_after - median_before) / median_before * 100
+
+    shift = cusum_change_point(seconds, started_at.astype(np.int64), model, n)
+    has_shift = shift >= 0
+    shift_at = np.full(n, np.datetime64("NaT"), dtype="datetime64[s]")
+    shift_at[has_shift] = started_at[shift[has_shift]]
+    mean_shift = np.full(n, np.nan)
+    if has_shift.any():
+        # Mean execution time after minus before the CUSUM change point
+        after_shift = started_at >= shift_at[model]
+        mean_shift = grouped_mean(seconds, model, n, after_shift) - grouped_mean(
+            seconds, model, n, ~after_shift
+        )
+
+    rows = []
+    for index, unique_id in enumerate(history.unique_ids):
+        rows.append(
+            {
+                "unique_id": unique_id,
+                "verdict": _verdict(
+                    test["n_before"][index],
+                    test["n_after"][index],
+                    test["p_value"][index],
+                    change_pct[index],
+                    alpha=alpha,
+                    min_runs=min_runs,
+                    min_change_pct=min_change_pct,
+                ),
+                "changed_at": _format_datetime(changed_at[index]),
+                "runs_before": int(test["n_before"][index]),
+                "runs_after": int(test["n_after"][index]),
+                "median_before_s": float(median_before[index]),
+                "median_after_s": float(median_after[index]),
+                "change_pct": float(change_pct[index]),
+                "effect": float(test["effect"][index]),
+                "p_value": float(test["p_value"][index]),
+                "cusum_shift_at": _format_datetime(shift_at[index]),
+                "cusum_shift_s": float(mean_shift[index]),
+            }
+        )
+
+    return rows
+
+
+def _medians(
+    values: np.ndarray, groups: np.ndarray, n_groups: int, is_after: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Before/after become two sets of groups so one sort covers both sides
+    sides = groups * 2 + is_after
+    medians = grouped_percentile(values, sides, n_groups * 2, 50)
+    return medians[0::2], medians[1::2]
+
+
+def _verdict(
+    n_before: float,
+    n_after: float,
+    p_value: float,
+    change_pct: float,
+    *,
+    alpha: float,
+    min_runs: int,
+    min_change_pct: float,
+) -> str:
+    if n_before < min_runs or n_after < min_runs:
+        return "not enough runs"
+
+    if p_value >= alpha or abs(change_pct) < min_change_pct:
+        return "no significant change"
+
+    return "slower" if change_pct > 0 else "faster"
+
+
+def _format_datetime(value: np.datetime64) -> str:
+    return "" if np.isnat(value) else str(value).replace("T", " ")
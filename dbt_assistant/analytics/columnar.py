@@ -0,0 +1,169 @@
+# stdlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# third party
+import numpy as np
+
+
+def to_datetime64(values: Iterable[str]) -> np.ndarray:
+    """Parse ISO-8601 timestamps (as returned by dbt Cloud) into a datetime64[s]
+    column.  Timezone suffixes are dropped - dbt Cloud timestamps are all UTC.
+    Missing values become NaT.
+    """
+    return np.array(
+        [value[:19] if value else "NaT" for value in values], dtype="datetime64[s]"
+    )
+
+
+def factorize(values: Sequence[Any]) -> tuple[np.ndarray, np.ndarray]:
+    """Encode values as integer codes.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The unique values (in order of first
+            appearance) and the code of every value.
+    """
+    array = np.asarray(values, dtype=object)
+    if len(array) == 0:
+        return array, np.zeros(0, dtype=np.int64)
+
+    _, first, codes = np.unique(
+        array.astype(str), return_index=True, return_inverse=True
+    )
+    # Re-number so codes follow the order values first appeared in
+    order = np.argsort(first)
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+    return array[np.sort(first)], remap[codes]
+
+
+def grouped_count(groups: np.ndarray, n_groups: int, mask: np.ndarray = None):
+    weights = None if mask is None else mask.astype(np.float64)
+    return np.bincount(groups, weights=weights, minlength=n_groups)
+
+
+def grouped_sum(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    return np.bincount(groups, weights=values, minlength=n_groups)
+
+
+def grouped_mean(
+    values: np.ndarray, groups: np.ndarray, n_groups: int, mask: np.ndarray = None
+) -> np.ndarray:
+    """Mean of `values` per group (NaN for empty groups), optionally restricted to
+    the rows selected by `mask`.
+    """
+    if mask is not None:
+        values, groups = values[mask], groups[mask]
+
+    counts = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    sums = np.bincount(groups, weights=values, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def grouped_max(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    result = np.full(n_groups, -np.inf)
+    np.maximum.at(result, groups, values)
+    result[np.isneginf(result)] = np.nan
+    return result
+
+
+def grouped_percentile(
+    values: np.ndarray, groups: np.ndarray, n_groups: int, q: float
+) -> np.ndarray:
+    """Linearly interpolated percentile (q in [0, 100]) of `values` per group,
+    computed for every group at once with a single sort.
+    """
+    result = np.full(n_groups, np.nan)
+    if len(values) == 0:
+        return result
+
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    has_values = counts > 0
+
+    position = (counts[has_values] - 1) * (q / 100)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    fraction = position - lower
+    start = starts[has_values]
+    result[has_values] = (
+        sorted_values[start + lower] * (1 - fraction)
+        + sorted_values[start + upper] * fraction
+    )
+    return result
+
+
+def rank_from_end(order_by: np.ndarray, groups: np.ndarray, n_groups: int):
+    """Position of every row within its group counting back from the latest row
+    (0 = latest), ordered by `order_by`.
+    """
+    order = np.lexsort((order_by, groups))
+    counts = np.bincount(groups, minlength=n_groups)
+    ends = np.cumsum(counts)
+    rank = np.empty(len(groups), dtype=np.int64)
+    rank[order] = ends[groups[order]] - 1 - np.arange(len(groups))
+    return rank
+
+
+def grouped_slope(
+    x: np.ndarray, y: np.ndarray, groups: np.ndarray, n_groups: int
+) -> np.ndarray:
+    """Least squares slope of y over x per group (NaN when x doesn't vary)."""
+    n = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    sum_x = np.bincount(groups, weights=x, minlength=n_groups)
+    sum_y = np.bincount(groups, weights=y, minlength=n_groups)
+    sum_xx = np.bincount(groups, weights=x * x, minlength=n_groups)
+    sum_xy = np.bincount(groups, weights=x * y, minlength=n_groups)
+    denominator = n * sum_xx - sum_x**2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(
+            np.abs(denominator) > 1e-12,
+            (n * sum_xy - sum_x * sum_y) / denominator,
+            np.nan,
+        )
+
+
+def _format_value(value: Any, precision: Optional[int]) -> str:
+    if value is None:
+        return ""
+
+    if isinstance(value, (float, np.floating)):
+        if np.isnan(value):
+            return ""
+        if precision is not None:
+            return f"{value:.{precision}f}"
+
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def to_markdown_table(
+    rows: List[Dict[str, Any]],
+    columns: List[str] = None,
+    *,
+    precision: Optional[int] = 1,
+) -> str:
+    """Render rows as a compact markdown table.  Missing values, None and NaN are
+    left as empty cells.
+
+    Args:
+        rows (List[Dict[str, Any]]): The rows.
+        columns (List[str], optional): Columns to show, in order. Defaults to every
+            key of the rows, in order of first appearance.
+        precision (int, optional): Decimal places floats are rounded to, or None
+            to show them in full. Defaults to 1.
+    """
+    if not rows:
+        return "Nothing found."
+
+    columns = columns or list({key: None for row in rows for key in row})
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "|" + "|".join("---" for _ in columns) + "|",
+    ]
+    for row in rows:
+        cells = [_format_value(row.get(column), precision) for column in columns]
+        lines.append("| " + " | ".join(cells) + " |")
+
+    return "\n".join(lines)
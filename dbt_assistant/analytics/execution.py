@@ -0,0 +1,178 @@
+# stdlib
+from typing import Dict, List, Union
+
+# third party
+import numpy as np
+
+# first party
+from dbt_assistant.analytics.columnar import (
+    factorize,
+    grouped_count,
+    grouped_max,
+    grouped_mean,
+    grouped_percentile,
+    grouped_slope,
+    rank_from_end,
+    to_datetime64,
+)
+
+FAILED_STATUSES = {"error", "fail", "failed"}
+SECONDS_PER_DAY = 86400
+
+
+class ExecutionHistory:
+    """Execution history for any number of models held as NumPy columns, one row per
+    model execution.
+
+    Models whose history couldn't be looked up aren't part of `unique_ids`; their
+    error messages are kept in `errors` (keyed by unique ID) instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        unique_ids: List[str],
+        model: np.ndarray,
+        job_id: np.ndarray,
+        run_id: np.ndarray,
+        started_at: np.ndarray,
+        execution_time: np.ndarray,
+        failed: np.ndarray,
+        errors: Dict[str, str] = None,
+    ):
+        self.unique_ids = unique_ids
+        self.errors = errors or {}
+        self.model = model
+        self.job_id = job_id
+        self.run_id = run_id
+        self.started_at = started_at
+        self.execution_time = execution_time
+        self.failed = failed
+
+    def __len__(self) -> int:
+        return len(self.model)
+
+    @classmethod
+    def from_responses(
+        cls, histories: Dict[str, Union[List[Dict], str]]
+    ) -> "ExecutionHistory":
+        """Flatten `modelExecutionHistory` results (keyed by model unique ID) into
+        columns.  Results that are error messages end up in `errors`.
+        """
+        errors = {
+            unique_id: days
+            for unique_id, days in histories.items()
+            if isinstance(days, str)
+        }
+        unique_ids = [unique_id for unique_id in histories if unique_id not in errors]
+        model, job_id, run_id, started_at = [], [], [], []
+        execution_time, status = [], []
+        for index, unique_id in enumerate(unique_ids):
+            for day in histories[unique_id] or []:
+                for job in day.get("executionsByJob") or []:
+                    for execution in job.get("executions") or []:
+                        model.append(index)
+                        job_id.append(job.get("jobId") or 0)
+                        run_id.append(execution.get("runId") or 0)
+                        started_at.append(
+                            execution.get("executionStartedAt")
+                            or execution.get("runStartedAt")
+                            or day.get("date")
+                        )
+                        execution_time.append(execution.get("executionTime"))
+                        status.append((execution.get("status") or "").lower())
+
+        return cls(
+            unique_ids=unique_ids,
+            model=np.asarray(model, dtype=np.int64),
+            job_id=np.asarray(job_id, dtype=np.int64),
+            run_id=np.asarray(run_id, dtype=np.int64),
+            started_at=to_datetime64(started_at),
+            execution_time=np.asarray(execution_time, dtype=np.float64),
+            failed=np.isin(np.asarray(status, dtype=object), list(FAILED_STATUSES)),
+            errors=errors,
+        )
+
+    def by_job(self) -> "ExecutionHistory":
+        """Regroup so every (model, job) pair is summarized separately."""
+        keys = [
+            f"{self.unique_ids[m]} (job {j})" for m, j in zip(self.model, self.job_id)
+        ]
+        labels, codes = factorize(keys)
+        return ExecutionHistory(
+            unique_ids=list(labels),
+            model=codes,
+            job_id=self.job_id,
+            run_id=self.run_id,
+            started_at=self.started_at,
+            execution_time=self.execution_time,
+            failed=self.failed,
+            errors=self.errors,
+        )
+
+
+def summarize_execution_history(
+    history: ExecutionHistory,
+    *,
+    end: np.datetime64,
+    window_days: int = 7,
+    rolling_runs: int = 5,
+) -> List[Dict]:
+    """Compute per-model execution statistics for every model at once.
+
+    Args:
+        history (ExecutionHistory): Execution history to summarize.
+        end (np.datetime64): End of the period being summarized.  The current week
+            is the `window_days` leading up to it and the previous week the
+            `window_days` before that.
+        window_days (int, optional): Length of a "week". Defaults to 7.
+        rolling_runs (int, optional): Number of most recent runs in the rolling mean.
+            Defaults to 5.
+
+    Returns:
+        List[Dict]: One row per model with run/failure counts, p50/p95/max/mean
+            execution time, week-over-week change, rolling mean and trend (seconds
+            per day).
+    """
+    n = len(history.unique_ids)
+    valid = np.isfinite(history.execution_time) & ~np.isnat(history.started_at)
+    model = history.model[valid]
+    seconds = history.execution_time[valid]
+    started_at = history.started_at[valid]
+
+    end = np.datetime64(end, "s")
+    window = np.timedelta64(window_days * SECONDS_PER_DAY, "s")
+    this_week = (started_at > end - window) & (started_at <= end)
+    last_week = (started_at > end - 2 * window) & (started_at <= end - window)
+    this_week_mean = grouped_mean(seconds, model, n, this_week)
+    last_week_mean = grouped_mean(seconds, model, n, last_week)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wow_change = (this_week_mean - last_week_mean) / last_week_mean * 100
+
+    epoch_days = started_at.astype(np.int64) / SECONDS_PER_DAY
+    rank = rank_from_end(epoch_days, model, n)
+
+    columns = {
+        "runs": grouped_count(history.model, n),
+        "failures": grouped_count(history.model, n, history.failed),
+        "p50_s": grouped_percentile(seconds, model, n, 50),
+        "p95_s": grouped_percentile(seconds, model, n, 95),
+        "max_s": grouped_max(seconds, model, n),
+        "mean_s": grouped_mean(seconds, model, n),
+        "this_week_mean_s": this_week_mean,
+        "last_week_mean_s": last_week_mean,
+        "wow_change_pct": wow_change,
+        f"rolling_mean_{rolling_runs}_s": grouped_mean(
+            seconds, model, n, rank < rolling_runs
+        ),
+        "trend_s_per_day": grouped_slope(epoch_days, seconds, model, n),
+    }
+    rows = []
+    for index, unique_id in enumerate(history.unique_ids):
+        row = {"unique_id": unique_id}
+        for name, values in columns.items():
+            value = values[index]
+            row[name] = int(value) if name in ("runs", "failures") else float(value)
+        rows.append(row)
+
+    return rows
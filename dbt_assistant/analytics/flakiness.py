@@ -0,0 +1,221 @@
+# stdlib
+import os
+from typing import Any, Dict, List, Literal
+
+# third party
+import numpy as np
+
+# first party
+from dbt_assistant.analytics.columnar import grouped_count, grouped_max, to_datetime64
+
+# Test statuses as stored, by code
+STATUSES = ("pass", "warn", "fail", "error", "skipped")
+FAILED_STATUSES = ("fail", "error")
+
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+class TestHistory:
+    """Results of every test in an environment over time as NumPy columns, one row
+    per test per run it was executed in.
+
+    Test unique IDs are stored once, sorted, in `unique_ids`; rows refer to them by
+    index.
+    """
+
+    def __init__(
+        self,
+        *,
+        unique_ids: np.ndarray,
+        test: np.ndarray,
+        run_id: np.ndarray,
+        job_id: np.ndarray,
+        completed_at: np.ndarray,
+        status: np.ndarray,
+    ):
+        self.unique_ids = unique_ids
+        self.test = test
+        self.run_id = run_id
+        self.job_id = job_id
+        self.completed_at = completed_at
+        self.status = status
+
+    def __len__(self) -> int:
+        return len(self.test)
+
+    @classmethod
+    def empty(cls) -> "TestHistory":
+        return cls.from_edges([])
+
+    @classmethod
+    def from_edges(cls, edges: List[Dict]) -> "TestHistory":
+        """The latest result of every test that has run, from the edges of a `tests`
+        query.
+        """
+        unique_id, run_id, job_id, completed_at, status = [], [], [], [], []
+        for edge in edges:
+            node = edge.get("node") or {}
+            execution = node.get("executionInfo") or {}
+            if not node.get("uniqueId") or not execution.get("lastRunId"):
+                continue
+
+            unique_id.append(node["uniqueId"])
+            run_id.append(execution["lastRunId"])
+            job_id.append(execution.get("lastJobDefinitionId") or 0)
+            completed_at.append(execution.get("executeCompletedAt"))
+            status.append(
+                _STATUS_CODES.get(
+                    (execution.get("lastRunStatus") or "").lower(),
+                    _STATUS_CODES["error"],
+                )
+            )
+
+        unique_ids, test = np.unique(
+            np.array(unique_id, dtype=str), return_inverse=True
+        )
+        return cls(
+            unique_ids=unique_ids,
+            test=test.astype(np.int64),
+            run_id=np.asarray(run_id, dtype=np.int64),
+            job_id=np.asarray(job_id, dtype=np.int64),
+            completed_at=to_datetime64(completed_at),
+            status=np.asarray(status, dtype=np.int8),
+        )
+
+    def extend(self, other: "TestHistory") -> "TestHistory":
+        """Rows of both histories, with results already recorded (same test and run)
+        kept once.
+        """
+        unique_ids = np.union1d(self.unique_ids, other.unique_ids)
+        test = np.concatenate(
+            [
+                np.searchsorted(unique_ids, self.unique_ids)[self.test],
+                np.searchsorted(unique_ids, other.unique_ids)[other.test],
+            ]
+        ).astype(np.int64)
+        run_id = np.concatenate([self.run_id, other.run_id])
+        _, keep = np.unique(np.stack([test, run_id]), axis=1, return_index=True)
+        keep.sort()
+        return TestHistory(
+            unique_ids=unique_ids,
+            test=test[keep],
+            run_id=run_id[keep],
+            job_id=np.concatenate([self.job_id, other.job_id])[keep],
+            completed_at=np.concatenate([self.completed_at, other.completed_at])[keep],
+            status=np.concatenate([self.status, other.status])[keep],
+        )
+
+    def save(self, path: str) -> None:
+        """Write the history to an `.npz` file, atomically."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                unique_ids=self.unique_ids.astype(str),
+                test=self.test,
+                run_id=self.run_id,
+                job_id=self.job_id,
+                completed_at=self.completed_at,
+                status=self.status,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TestHistory":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+
+def summarize_test_history(
+    history: TestHistory,
+    *,
+    since: np.datetime64 = None,
+    min_runs: int = 1,
+    sort_by: Literal["failure_rate", "flakiness", "failures"] = "failure_rate",
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Rank tests by how often they fail and how flaky they are, computed for every
+    test at once.
+
+    Flakiness is the share of consecutive runs (in order of completion) where a
+    test went from passing to failing or back, so a test failing every other run
+    scores 1 and one that always fails scores 0.  Skipped runs don't count.
+
+    Args:
+        history (TestHistory): Test results to summarize.
+        since (np.datetime64, optional): Only results completed after this.
+            Defaults to None.
+        min_runs (int, optional): Leave out tests with fewer runs. Defaults to 1.
+        sort_by ("failure_rate", "flakiness", "failures", optional): What to rank
+            by. Defaults to "failure_rate".
+        limit (int, optional): Most tests returned. Defaults to 20.
+
+    Returns:
+        List[Dict[str, Any]]: One row per test with runs, failures, warnings,
+            failure rate, flips, flakiness, last status and when it last failed.
+            Only tests that failed or warned at least once are returned.
+    """
+    n = len(history.unique_ids)
+    ran = history.status != _STATUS_CODES["skipped"]
+    if since is not None:
+        ran &= history.completed_at > np.datetime64(since, "s")
+
+    test = history.test[ran]
+    status = history.status[ran]
+    completed_at = history.completed_at[ran]
+    failed = np.isin(status, [_STATUS_CODES[s] for s in FAILED_STATUSES])
+
+    order = np.lexsort((history.run_id[ran], completed_at, test))
+    test, status, completed_at, failed = (
+        test[order],
+        status[order],
+        completed_at[order],
+        failed[order],
+    )
+    flipped = (failed[1:] != failed[:-1]) & (test[1:] == test[:-1])
+
+    runs = grouped_count(test, n)
+    failures = grouped_count(test, n, failed)
+    warnings = grouped_count(test, n, status == _STATUS_CODES["warn"])
+    flips = grouped_count(test[1:], n, flipped)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        failure_rate = failures / runs
+        flakiness = np.where(runs > 1, flips / (runs - 1), np.nan)
+
+    # Rows are grouped by test in order of completion, so a test's last row is its
+    # latest result
+    last = np.cumsum(runs.astype(np.int64)) - 1
+    dated_failure = failed & ~np.isnat(completed_at)
+    last_failed = grouped_max(
+        completed_at[dated_failure].astype(np.int64).astype(np.float64),
+        test[dated_failure],
+        n,
+    )
+
+    keys = {
+        "failure_rate": (flakiness, failure_rate),
+        "flakiness": (failure_rate, flakiness),
+        "failures": (failure_rate, failures),
+    }[sort_by]
+    candidates = np.flatnonzero((runs >= max(min_runs, 1)) & (failures + warnings > 0))
+    order = np.lexsort(tuple(-np.nan_to_num(key[candidates]) for key in keys))
+    rows = []
+    for index in candidates[order][:limit]:
+        rows.append(
+            {
+                "unique_id": history.unique_ids[index],
+                "runs": int(runs[index]),
+                "failures": int(failures[index]),
+                "warnings": int(warnings[index]),
+                "failure_rate": float(failure_rate[index]),
+                "flips": int(flips[index]),
+                "flakiness": float(flakiness[index]),
+                "last_status": STATUSES[status[last[index]]],
+                "last_failed_at": (
+                    None
+                    if np.isnan(last_failed[index])
+                    else str(np.datetime64(int(last_failed[index]), "s"))
+                ),
+            }
+        )
+    return rows
@@ -0,0 +1,197 @@
+# stdlib
+from typing import Any, Dict, List
+
+# third party
+import numpy as np
+
+# first party
+from dbt_assistant.analytics.columnar import to_datetime64
+
+# Freshness statuses as stored, by code.  0 is for sources whose freshness has
+# never been checked.
+STATUSES = ("unchecked", "pass", "warn", "error", "runtime error")
+OFFENDING_STATUSES = ("warn", "error", "runtime error")
+
+# Upper edges, in hours, of every staleness bucket but the last
+BUCKET_EDGES_HOURS = (1, 6, 24, 72)
+BUCKET_LABELS = ("<1h", "1-6h", "6-24h", "1-3d", ">3d", "never loaded")
+
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def _status_code(status: str) -> int:
+    # Unknown statuses are as bad as the worst known one
+    return _STATUS_CODES.get((status or "unchecked").lower(), _STATUS_CODES["error"])
+
+
+class FreshnessTable:
+    """Freshness of every source in an environment as NumPy columns, one row per
+    source, sorted by unique ID so rows can be matched up with `searchsorted`.
+    """
+
+    def __init__(
+        self,
+        *,
+        unique_id: np.ndarray,
+        name: np.ndarray,
+        source_name: np.ndarray,
+        status: np.ndarray,
+        max_loaded_at: np.ndarray,
+        snapshotted_at: np.ndarray,
+    ):
+        self.unique_id = unique_id
+        self.name = name
+        self.source_name = source_name
+        self.status = status
+        self.max_loaded_at = max_loaded_at
+        self.snapshotted_at = snapshotted_at
+
+    def __len__(self) -> int:
+        return len(self.unique_id)
+
+    def _columns(self) -> Dict[str, np.ndarray]:
+        return {
+            "unique_id": self.unique_id,
+            "name": self.name,
+            "source_name": self.source_name,
+            "status": self.status,
+            "max_loaded_at": self.max_loaded_at,
+            "snapshotted_at": self.snapshotted_at,
+        }
+
+    def _take(self, indices: np.ndarray) -> "FreshnessTable":
+        return FreshnessTable(
+            **{name: column[indices] for name, column in self._columns().items()}
+        )
+
+    def filter(self, mask: np.ndarray) -> "FreshnessTable":
+        return self._take(np.flatnonzero(mask))
+
+    @classmethod
+    def from_edges(cls, edges: List[Dict]) -> "FreshnessTable":
+        """Build the table from the edges of a `sources` query."""
+        unique_id, name, source_name, status = [], [], [], []
+        max_loaded_at, snapshotted_at = [], []
+        for edge in edges:
+            node = edge.get("node") or {}
+            if not node.get("uniqueId"):
+                continue
+
+            freshness = node.get("freshness") or {}
+            unique_id.append(node["uniqueId"])
+            name.append(node.get("name"))
+            source_name.append(node.get("sourceName"))
+            checked = freshness.get("freshnessChecked")
+            status.append(
+                _status_code(freshness.get("freshnessStatus") if checked else None)
+            )
+            max_loaded_at.append(freshness.get("maxLoadedAt"))
+            snapshotted_at.append(freshness.get("snapshottedAt"))
+
+        unique_id = np.array(unique_id, dtype=object)
+        # The same source on two pages keeps its last row
+        _, last = np.unique(unique_id[::-1].astype(str), return_index=True)
+        keep = len(unique_id) - 1 - last
+        table = cls(
+            unique_id=unique_id,
+            name=np.array(name, dtype=object),
+            source_name=np.array(source_name, dtype=object),
+            status=np.array(status, dtype=np.int8),
+            max_loaded_at=to_datetime64(max_loaded_at),
+            snapshotted_at=to_datetime64(snapshotted_at),
+        )
+        return table._take(keep)
+
+    def merge(self, other: "FreshnessTable") -> "FreshnessTable":
+        """Rows of `other` replacing those of the same sources in this table, and
+        added where they're new.
+        """
+        if not len(self):
+            return other
+
+        keys = self.unique_id.astype(str)
+        position = np.searchsorted(keys, other.unique_id.astype(str))
+        position = np.minimum(position, len(self) - 1)
+        matched = keys[position] == other.unique_id.astype(str)
+
+        columns = {}
+        for name, column in self._columns().items():
+            updated = column.copy()
+            new = getattr(other, name)
+            updated[position[matched]] = new[matched]
+            columns[name] = np.concatenate([updated, new[~matched]])
+
+        order = np.argsort(columns["unique_id"].astype(str), kind="stable")
+        return FreshnessTable(**columns)._take(order)
+
+    def age_seconds(self, now: np.datetime64) -> np.ndarray:
+        """Seconds since every source was last loaded (NaN if it never was)."""
+        age = (now - self.max_loaded_at).astype("timedelta64[s]").astype(np.float64)
+        age[np.isnat(self.max_loaded_at)] = np.nan
+        return age
+
+    def buckets(self, now: np.datetime64) -> np.ndarray:
+        """Index into `BUCKET_LABELS` of every source."""
+        age = self.age_seconds(now)
+        edges = np.array(BUCKET_EDGES_HOURS, dtype=np.float64) * 3600
+        buckets = np.digitize(np.nan_to_num(age, nan=0.0), edges)
+        buckets[np.isnan(age)] = len(BUCKET_LABELS) - 1
+        return buckets
+
+
+def summarize_freshness(
+    table: FreshnessTable,
+    now: np.datetime64,
+    *,
+    stale_after_hours: float = None,
+    source_names: List[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """Find the sources that are stale, either because their freshness check warned
+    or errored or because they haven't been loaded in `stale_after_hours`.
+
+    Returns:
+        Dict[str, Any]: The number of sources per staleness bucket and per status
+            (of the sources considered), and the offenders - stalest first, at most
+            `limit` of them.
+    """
+    mask = np.ones(len(table), dtype=bool)
+    if source_names:
+        mask &= np.isin(table.source_name.astype(str), list(source_names))
+
+    age = table.age_seconds(now)
+    buckets = table.buckets(now)
+    offending = np.isin(table.status, [_STATUS_CODES[s] for s in OFFENDING_STATUSES])
+    if stale_after_hours is not None:
+        with np.errstate(invalid="ignore"):
+            offending |= age > stale_after_hours * 3600
+    offending &= mask
+
+    indices = np.flatnonzero(offending)
+    # Never loaded first, then stalest
+    order = np.argsort(-np.nan_to_num(age[indices], nan=np.inf), kind="stable")
+    indices = indices[order][:limit]
+
+    bucket_counts = np.bincount(buckets[mask], minlength=len(BUCKET_LABELS))
+    status_counts = np.bincount(table.status[mask], minlength=len(STATUSES))
+    return {
+        "sources": int(mask.sum()),
+        "offenders": int(offending.sum()),
+        "buckets": dict(zip(BUCKET_LABELS, bucket_counts.tolist())),
+        "statuses": dict(zip(STATUSES, status_counts.tolist())),
+        "rows": [
+            {
+                "unique_id": table.unique_id[i],
+                "source_name": table.source_name[i],
+                "status": STATUSES[table.status[i]],
+                "max_loaded_at": (
+                    None
+                    if np.isnat(table.max_loaded_at[i])
+                    else str(table.max_loaded_at[i])
+                ),
+                "hours_since_load": age[i] / 3600,
+                "bucket": BUCKET_LABELS[buckets[i]],
+            }
+            for i in indices
+        ],
+    }
@@ -0,0 +1,248 @@
+# stdlib
+import os
+from typing import Any, Dict, List, Literal
+
+# third party
+import numpy as np
+
+# first party
+from dbt_assistant.analytics.changepoint import mann_whitney
+from dbt_assistant.analytics.columnar import (
+    grouped_count,
+    grouped_max,
+    grouped_mean,
+    grouped_percentile,
+    grouped_slope,
+    rank_from_end,
+    to_datetime64,
+)
+
+# Run statuses, as the Admin API codes them
+SUCCESS, ERROR, CANCELLED = 10, 20, 30
+SECONDS_PER_DAY = 86400
+
+
+def _seconds_between(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    seconds = (end - start).astype(np.float64)
+    seconds[np.isnat(start) | np.isnat(end)] = np.nan
+    return seconds
+
+
+class RunHistory:
+    """Finished runs of every job in an account as NumPy columns, one row per run,
+    sorted by run ID.
+    """
+
+    def __init__(
+        self,
+        *,
+        run_id: np.ndarray,
+        job_id: np.ndarray,
+        created_at: np.ndarray,
+        queued_s: np.ndarray,
+        duration_s: np.ndarray,
+        status: np.ndarray,
+    ):
+        self.run_id = run_id
+        self.job_id = job_id
+        self.created_at = created_at
+        self.queued_s = queued_s
+        self.duration_s = duration_s
+        self.status = status
+
+    def __len__(self) -> int:
+        return len(self.run_id)
+
+    @classmethod
+    def empty(cls) -> "RunHistory":
+        return cls.from_runs([])
+
+    @classmethod
+    def from_runs(cls, runs: List[Dict]) -> "RunHistory":
+        """Build from Admin API runs, leaving out the ones that haven't finished."""
+        finished = [
+            run for run in runs if run.get("status") in (SUCCESS, ERROR, CANCELLED)
+        ]
+        created_at = to_datetime64([run.get("created_at") for run in finished])
+        started_at = to_datetime64([run.get("started_at") for run in finished])
+        finished_at = to_datetime64([run.get("finished_at") for run in finished])
+        history = cls(
+            run_id=np.asarray([run["id"] for run in finished], dtype=np.int64),
+            job_id=np.asarray(
+                [run.get("job_definition_id") or 0 for run in finished],
+                dtype=np.int64,
+            ),
+            created_at=created_at,
+            queued_s=_seconds_between(created_at, started_at),
+            duration_s=_seconds_between(started_at, finished_at),
+            status=np.asarray([run["status"] for run in finished], dtype=np.int8),
+        )
+        _, keep = np.unique(history.run_id, return_index=True)
+        return history._take(keep)
+
+    def _take(self, rows: np.ndarray) -> "RunHistory":
+        return RunHistory(
+            run_id=self.run_id[rows],
+            job_id=self.job_id[rows],
+            created_at=self.created_at[rows],
+            queued_s=self.queued_s[rows],
+            duration_s=self.duration_s[rows],
+            status=self.status[rows],
+        )
+
+    def extend(self, other: "RunHistory") -> "RunHistory":
+        """Rows of both histories, sorted by run ID.  Runs in both are taken from
+        `other`.
+        """
+        both = RunHistory(
+            run_id=np.concatenate([other.run_id, self.run_id]),
+            job_id=np.concatenate([other.job_id, self.job_id]),
+            created_at=np.concatenate([other.created_at, self.created_at]),
+            queued_s=np.concatenate([other.queued_s, self.queued_s]),
+            duration_s=np.concatenate([other.duration_s, self.duration_s]),
+            status=np.concatenate([other.status, self.status]),
+        )
+        # `np.unique` keeps the first occurrence - the one from `other`
+        _, keep = np.unique(both.run_id, return_index=True)
+        return both._take(keep)
+
+    def save(self, path: str) -> None:
+        """Write the history to an `.npz` file, atomically."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                run_id=self.run_id,
+                job_id=self.job_id,
+                created_at=self.created_at,
+                queued_s=self.queued_s,
+                duration_s=self.duration_s,
+                status=self.status,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RunHistory":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+
+def summarize_run_history(
+    history: RunHistory,
+    *,
+    since: np.datetime64 = None,
+    job_ids: List[int] = None,
+    recent_runs: int = 10,
+    alpha: float = 0.05,
+    min_change_pct: float = 10.0,
+    sort_by: Literal["change_pct", "trend", "failure_rate", "runs"] = "change_pct",
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Duration trend, queue time and reliability of every job at once.
+
+    Durations only count successful runs, as failed ones stop early.  A job's
+    latest `recent_runs` successful runs are compared with the ones before them
+    with a Mann-Whitney U test, so a job that has become slower is called out as a
+    regression.
+
+    Args:
+        history (RunHistory): Runs to summarize.
+        since (np.datetime64, optional): Only runs created after this.
+        job_ids (List[int], optional): Only these jobs.
+        recent_runs (int, optional): Runs compared against the rest. Defaults
+            to 10.
+        alpha (float, optional): Significance level. Defaults to 0.05.
+        min_change_pct (float, optional): Smallest change in median duration
+            worth calling a regression or improvement. Defaults to 10.0.
+        sort_by (Literal["change_pct", "trend", "failure_rate", "runs"], optional):
+            What to rank jobs by, largest first. Defaults to "change_pct".
+        limit (int, optional): Number of jobs to return. Defaults to 20.
+
+    Returns:
+        List[Dict[str, Any]]: One row per job with its runs, failure rate, p50/p95
+            duration, trend (seconds per day), the median duration of its recent
+            runs against the ones before, the verdict and p-value, and its mean
+            and p95 queue time.
+    """
+    mask = np.ones(len(history), dtype=bool)
+    if since is not None:
+        mask &= history.created_at >= np.datetime64(since, "s")
+    if job_ids:
+        mask &= np.isin(history.job_id, job_ids)
+
+    jobs, job = np.unique(history.job_id[mask], return_inverse=True)
+    n = len(jobs)
+    if not n:
+        return []
+
+    status = history.status[mask]
+    created_at = history.created_at[mask]
+    queued = history.queued_s[mask]
+    duration = history.duration_s[mask]
+    days = created_at.astype(np.int64) / SECONDS_PER_DAY
+
+    runs = grouped_count(job, n)
+    failures = grouped_count(job, n, status == ERROR)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        failure_rate = failures / runs
+    last_run = grouped_max(created_at.astype(np.int64).astype(np.float64), job, n)
+    has_queue = np.isfinite(queued)
+    mean_queue = grouped_mean(queued[has_queue], job[has_queue], n)
+    p95_queue = grouped_percentile(queued[has_queue], job[has_queue], n, 95)
+
+    ok = (status == SUCCESS) & np.isfinite(duration)
+    ok_job, ok_duration, ok_days = job[ok], duration[ok], days[ok]
+    is_recent = rank_from_end(ok_days, ok_job, n) < recent_runs
+    test = mann_whitney(ok_duration, ok_job, n, is_recent)
+    # Recent and earlier runs become two sets of groups so one sort covers both
+    medians = grouped_percentile(ok_duration, ok_job * 2 + is_recent, n * 2, 50)
+    median_before, median_recent = medians[0::2], medians[1::2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change_pct = (median_recent - median_before) / median_before * 100
+
+    significant = (
+        (test["n_before"] >= 3)
+        & (test["n_after"] >= 3)
+        & (test["p_value"] < alpha)
+        & (np.abs(np.nan_to_num(change_pct)) >= min_change_pct)
+    )
+    columns = {
+        "runs": runs,
+        "failure_rate": failure_rate,
+        "p50_s": grouped_percentile(ok_duration, ok_job, n, 50),
+        "p95_s": grouped_percentile(ok_duration, ok_job, n, 95),
+        "trend_s_per_day": grouped_slope(ok_days, ok_duration, ok_job, n),
+        "median_before_s": median_before,
+        "median_recent_s": median_recent,
+        "change_pct": change_pct,
+        "p_value": test["p_value"],
+        "mean_queue_s": mean_queue,
+        "p95_queue_s": p95_queue,
+    }
+    sort_keys = {
+        "change_pct": change_pct,
+        "trend": columns["trend_s_per_day"],
+        "failure_rate": failure_rate,
+        "runs": runs,
+    }
+    # NaNs last, whatever the direction
+    order = np.argsort(-np.nan_to_num(sort_keys[sort_by], nan=-np.inf), kind="stable")
+
+    rows = []
+    for index in order[:limit]:
+        if test["n_before"][index] < 3 or test["n_after"][index] < 3:
+            verdict = "not enough runs"
+        elif not significant[index]:
+            verdict = "no significant change"
+        else:
+            verdict = "slower" if change_pct[index] > 0 else "faster"
+
+        row = {"job_id": int(jobs[index]), "verdict": verdict}
+        for name, values in columns.items():
+            value = values[index]
+            row[name] = int(value) if name == "runs" else float(value)
+        last_run_at = np.datetime64(int(last_run[index]), "s")
+        row["last_run_at"] = str(last_run_at).replace("T", " ")
+        rows.append(row)
+
+    return rows
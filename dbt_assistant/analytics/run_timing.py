@@ -0,0 +1,268 @@
+# stdlib
+from typing import Any, Dict, Iterable, List, Tuple
+
+# third party
+import numpy as np
+
+# first party
+from dbt_assistant.analytics.columnar import factorize
+
+
+def _to_seconds(values: List[str]) -> np.ndarray:
+    # Sub-second precision matters here, unlike `to_datetime64`
+    stamps = np.array(
+        [value.rstrip("Z")[:26] if value else "NaT" for value in values],
+        dtype="datetime64[us]",
+    )
+    seconds = stamps.astype(np.int64) / 1e6
+    seconds[np.isnat(stamps)] = np.nan
+    return seconds
+
+
+class RunTiming:
+    """When every node of a run executed, from its run_results.json, as NumPy
+    columns - one row per node that ran.  Times are in seconds since the first node
+    started.
+    """
+
+    def __init__(
+        self,
+        *,
+        unique_ids: np.ndarray,
+        status: np.ndarray,
+        threads: np.ndarray,
+        thread: np.ndarray,
+        start: np.ndarray,
+        end: np.ndarray,
+    ):
+        self.unique_ids = unique_ids
+        self.status = status
+        self.threads = threads
+        self.thread = thread
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        return len(self.unique_ids)
+
+    @property
+    def duration(self) -> np.ndarray:
+        return self.end - self.start
+
+    @classmethod
+    def from_results(cls, results: Iterable[Dict]) -> "RunTiming":
+        """Build from the `results` of a run_results.json.  Nodes without timings
+        (e.g. skipped ones) are left out.
+        """
+        unique_ids, status, thread, start, end = [], [], [], [], []
+        for result in results:
+            timing = [t for t in result.get("timing") or [] if t.get("started_at")]
+            if not timing:
+                continue
+
+            unique_ids.append(result.get("unique_id"))
+            status.append(result.get("status"))
+            thread.append(result.get("thread_id") or "")
+            # Compiling happens on the node's thread too, so it counts
+            start.append(min(t["started_at"] for t in timing))
+            end.append(max(t.get("completed_at") or t["started_at"] for t in timing))
+
+        start, end = _to_seconds(start), _to_seconds(end)
+        origin = np.nanmin(start) if len(start) else 0.0
+        threads, thread_codes = factorize(thread)
+        return cls(
+            unique_ids=np.array(unique_ids, dtype=object),
+            status=np.array(status, dtype=object),
+            threads=threads,
+            thread=thread_codes,
+            start=start - origin,
+            end=end - origin,
+        )
+
+    def edges(self, edges: Iterable[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Map `(parent, child)` unique IDs to row indices, keeping only the
+        dependencies between nodes that ran.
+        """
+        position = {unique_id: i for i, unique_id in enumerate(self.unique_ids)}
+        parent, child = [], []
+        for parent_id, child_id in edges:
+            p, c = position.get(parent_id), position.get(child_id)
+            if p is not None and c is not None:
+                parent.append(p)
+                child.append(c)
+        return np.array(parent, dtype=np.int64), np.array(child, dtype=np.int64)
+
+
+def _last_per_group(values: np.ndarray, groups: np.ndarray, n: int) -> np.ndarray:
+    """Row index of the largest value in each group (-1 for empty groups)."""
+    result = np.full(n, -1)
+    if len(groups):
+        order = np.lexsort((values, groups))
+        last = np.r_[groups[order][1:] != groups[order][:-1], True]
+        result[groups[order][last]] = order[last]
+    return result
+
+
+def critical_path(
+    timing: RunTiming, parent: np.ndarray, child: np.ndarray
+) -> List[Dict[str, Any]]:
+    """The chain of nodes that bound the run's wall-clock time, as it actually ran.
+
+    Starting from the node that finished last, every node is traced back to what it
+    was waiting for before it could start: whichever finished later of its last
+    parent and the node before it on the same thread.  Shortening any node on this
+    chain shortens the run; shortening anything else doesn't.
+
+    Returns:
+        List[Dict[str, Any]]: The chain in order of execution, with each node's
+            duration, start, end, the time it waited and what it waited for
+            ("dependency" or "thread").
+    """
+    n = len(timing)
+    if not n:
+        return []
+
+    end = np.nan_to_num(timing.end, nan=-np.inf)
+    # Edge (row) whose parent finished last, per child
+    last_edge = _last_per_group(end[parent], child, n)
+    last_parent = np.where(last_edge >= 0, parent[np.maximum(last_edge, 0)], -1)
+
+    # Node run just before each node on the same thread
+    by_thread = np.lexsort((timing.start, timing.thread))
+    previous = np.full(n, -1)
+    same_thread = timing.thread[by_thread][1:] == timing.thread[by_thread][:-1]
+    previous[by_thread[1:][same_thread]] = by_thread[:-1][same_thread]
+
+    parent_end = np.where(last_parent >= 0, end[np.maximum(last_parent, 0)], -np.inf)
+    previous_end = np.where(previous >= 0, end[np.maximum(previous, 0)], -np.inf)
+    waited_on_thread = previous_end > parent_end
+    blocker = np.where(waited_on_thread, previous, last_parent)
+
+    chain = []
+    node = int(np.argmax(end))
+    seen = set()
+    while node >= 0 and node not in seen:
+        seen.add(node)
+        chain.append(node)
+        node = int(blocker[node])
+    chain.reverse()
+
+    rows = []
+    for node in chain:
+        before = blocker[node]
+        wait = timing.start[node] - end[before] if before >= 0 else timing.start[node]
+        rows.append(
+            {
+                "unique_id": timing.unique_ids[node],
+                "duration_s": float(timing.duration[node]),
+                "start_s": float(timing.start[node]),
+                "end_s": float(timing.end[node]),
+                "waited_s": float(max(wait, 0.0)),
+                "waited_for": (
+                    None
+                    if before < 0
+                    else "thread" if waited_on_thread[node] else "dependency"
+                ),
+            }
+        )
+    return rows
+
+
+def longest_path(
+    duration: np.ndarray, parent: np.ndarray, child: np.ndarray
+) -> Tuple[float, List[int]]:
+    """Longest chain of dependencies by total duration - the shortest the run could
+    take with unlimited threads.  Computed one topological level at a time.
+
+    Returns:
+        Tuple[float, List[int]]: Its length in seconds and its rows, in order.
+    """
+    n = len(duration)
+    if not n:
+        return 0.0, []
+
+    duration = np.nan_to_num(duration)
+    indegree = np.bincount(child, minlength=n)
+    finish = duration.copy()
+    via = np.full(n, -1)
+    frontier = np.flatnonzero(indegree == 0)
+    order = np.argsort(parent, kind="stable")
+    parent_sorted, child_sorted = parent[order], child[order]
+    starts = np.searchsorted(parent_sorted, np.arange(n))
+    ends = np.searchsorted(parent_sorted, np.arange(n), side="right")
+    while len(frontier):
+        # Every edge leaving the frontier
+        counts = ends[frontier] - starts[frontier]
+        edge = np.repeat(starts[frontier] - np.cumsum(counts) + counts, counts)
+        edge += np.arange(counts.sum())
+        src, dst = parent_sorted[edge], child_sorted[edge]
+
+        candidate = finish[src] + duration[dst]
+        best = np.full(n, -np.inf)
+        np.maximum.at(best, dst, candidate)
+        # Parents giving each child its latest finish so far
+        wins = (candidate == best[dst]) & ((candidate > finish[dst]) | (via[dst] < 0))
+        via[dst[wins]] = src[wins]
+        finish = np.maximum(finish, best)
+
+        indegree -= np.bincount(dst, minlength=n)
+        touched = np.unique(dst)
+        frontier = touched[indegree[touched] == 0]
+
+    node = int(np.argmax(finish))
+    path = [node]
+    while via[node] >= 0:
+        node = int(via[node])
+        path.append(node)
+    path.reverse()
+    return float(finish.max()), path
+
+
+def thread_utilization(timing: RunTiming, buckets: int = 10) -> np.ndarray:
+    """Average number of busy threads in each of `buckets` equal slices of the run,
+    from the integral of the running-node count.
+    """
+    valid = ~(np.isnan(timing.start) | np.isnan(timing.end))
+    start, end = timing.start[valid], timing.end[valid]
+    if not len(start):
+        return np.zeros(buckets)
+
+    times = np.concatenate([start, end])
+    steps = np.concatenate([np.ones(len(start)), -np.ones(len(end))])
+    order = np.argsort(times, kind="stable")
+    times, running = times[order], np.cumsum(steps[order])
+    # Busy thread-seconds up to each event
+    area = np.concatenate([[0.0], np.cumsum(running[:-1] * np.diff(times))])
+
+    edges = np.linspace(times[0], times[-1], buckets + 1)
+    position = np.clip(np.searchsorted(times, edges, side="right") - 1, 0, None)
+    area_at_edges = area[position] + running[position] * (edges - times[position])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.diff(area_at_edges) / np.diff(edges)
+
+
+def summarize_run_timing(
+    timing: RunTiming,
+    edges: Iterable[Tuple[str, str]],
+    *,
+    buckets: int = 10,
+) -> Dict[str, Any]:
+    """Wall-clock time, thread utilization, the critical path as the run went and
+    the longest dependency chain, for every node at once.
+    """
+    parent, child = timing.edges(edges)
+    wall_clock = float(np.nanmax(timing.end)) if len(timing) else 0.0
+    busy = float(np.nansum(timing.duration))
+    threads = len(timing.threads)
+    ideal, path = longest_path(timing.duration, parent, child)
+    return {
+        "nodes": len(timing),
+        "threads": threads,
+        "wall_clock_s": wall_clock,
+        "busy_s": busy,
+        "utilization": busy / (threads * wall_clock) if threads and wall_clock else 0,
+        "critical_path": critical_path(timing, parent, child),
+        "longest_chain_s": ideal,
+        "longest_chain": [timing.unique_ids[node] for node in path],
+        "busy_threads": thread_utilization(timing, buckets).tolist(),
+    }
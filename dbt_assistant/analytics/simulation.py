@@ -0,0 +1,159 @@
+# stdlib
+import dataclasses
+import heapq
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+# third party
+import numpy as np
+
+
+def topological_levels(n: int, parent: np.ndarray, child: np.ndarray) -> np.ndarray:
+    """Generation of every node - 0 for nodes without parents, otherwise one more
+    than its deepest parent - one whole generation at a time.  Nodes on a cycle get
+    -1.
+    """
+    levels = np.full(n, -1)
+    indegree = np.bincount(child, minlength=n)
+    order = np.argsort(parent, kind="stable")
+    parent_sorted, child_sorted = parent[order], child[order]
+    starts = np.searchsorted(parent_sorted, np.arange(n))
+    ends = np.searchsorted(parent_sorted, np.arange(n), side="right")
+
+    frontier = np.flatnonzero(indegree == 0)
+    level = 0
+    while len(frontier):
+        levels[frontier] = level
+        counts = ends[frontier] - starts[frontier]
+        edge = np.repeat(starts[frontier] - np.cumsum(counts) + counts, counts)
+        edge += np.arange(counts.sum())
+        dst = child_sorted[edge]
+        indegree -= np.bincount(dst, minlength=n)
+        touched = np.unique(dst)
+        frontier = touched[indegree[touched] == 0]
+        level += 1
+    return levels
+
+
+@dataclass
+class SimulatedRun:
+    threads: int
+    wall_clock_s: float
+    busy_s: float
+    # Most nodes running at once
+    peak_threads: int
+    start: np.ndarray
+    end: np.ndarray
+
+    @property
+    def utilization(self) -> float:
+        if not self.wall_clock_s:
+            return 0.0
+        return self.busy_s / (self.threads * self.wall_clock_s)
+
+
+class RunSimulator:
+    """Discrete-event replay of a dbt run: nodes wait for their parents and for a
+    free thread, and take as long as they're given.
+
+    Ready nodes are picked like dbt's own graph queue does - lowest generation
+    first, then by `tiebreak`.  The event loop works on plain lists and two heaps
+    (ready nodes by priority, running nodes by finish time), so one replay of a
+    20k node DAG takes a fraction of a second.
+
+    Args:
+        duration (np.ndarray): Seconds every node takes.
+        parent (np.ndarray): Parent row of every dependency.
+        child (np.ndarray): Child row of every dependency.
+        tiebreak (np.ndarray, optional): Order of nodes within a generation.
+            Defaults to their row order.
+    """
+
+    def __init__(
+        self,
+        duration: np.ndarray,
+        parent: np.ndarray,
+        child: np.ndarray,
+        tiebreak: np.ndarray = None,
+    ):
+        n = len(duration)
+        self.duration = np.nan_to_num(np.asarray(duration, dtype=np.float64))
+        levels = topological_levels(n, parent, child)
+        if tiebreak is None:
+            tiebreak = np.arange(n)
+        rank = np.empty(n, dtype=np.int64)
+        rank[np.lexsort((tiebreak, levels))] = np.arange(n)
+        self._priority: List[int] = rank.tolist()
+        self._indegree: List[int] = np.bincount(child, minlength=n).tolist()
+
+        order = np.argsort(parent, kind="stable")
+        bounds = np.searchsorted(parent[order], np.arange(n + 1))
+        children = child[order].tolist()
+        self._children: List[List[int]] = [
+            children[bounds[i] : bounds[i + 1]] for i in range(n)
+        ]
+        self._roots = np.flatnonzero(np.bincount(child, minlength=n) == 0).tolist()
+
+    def __len__(self) -> int:
+        return len(self.duration)
+
+    def run(self, threads: int, duration: np.ndarray = None) -> SimulatedRun:
+        """Replay the run on `threads` threads.
+
+        Args:
+            threads (int): Number of threads.
+            duration (np.ndarray, optional): Seconds every node takes instead of
+                the simulator's. Defaults to None.
+        """
+        threads = max(threads, 1)
+        duration = self.duration if duration is None else duration
+        seconds = duration.tolist()
+        priority, children = self._priority, self._children
+        indegree = list(self._indegree)
+        n = len(seconds)
+        start, end = [0.0] * n, [0.0] * n
+
+        ready = [(priority[node], node) for node in self._roots]
+        heapq.heapify(ready)
+        running: List[tuple] = []
+        now, free, peak = 0.0, threads, 0
+        while ready or running:
+            while free and ready:
+                _, node = heapq.heappop(ready)
+                start[node] = now
+                end[node] = now + seconds[node]
+                heapq.heappush(running, (end[node], node))
+                free -= 1
+            peak = max(peak, threads - free)
+
+            now, node = heapq.heappop(running)
+            free += 1
+            for next_node in children[node]:
+                indegree[next_node] -= 1
+                if not indegree[next_node]:
+                    heapq.heappush(ready, (priority[next_node], next_node))
+
+        return SimulatedRun(
+            threads=threads,
+            wall_clock_s=max(end, default=0.0),
+            busy_s=float(duration.sum()),
+            peak_threads=peak,
+            start=np.array(start),
+            end=np.array(end),
+        )
+
+    def sweep(
+        self, threads: Iterable[int], duration: np.ndarray = None
+    ) -> Dict[int, SimulatedRun]:
+        """Replay the run for every thread count.  Counts beyond the most nodes
+        running at once with unlimited threads can't be any faster, so they aren't
+        replayed.
+        """
+        unlimited = self.run(max(len(self), 1), duration)
+        results = {}
+        for count in sorted(set(threads)):
+            if count >= unlimited.peak_threads:
+                results[count] = dataclasses.replace(unlimited, threads=count)
+            else:
+                results[count] = self.run(count, duration)
+        return results
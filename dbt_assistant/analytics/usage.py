@@ -0,0 +1,115 @@
+# stdlib
+from typing import Dict, List, Tuple
+
+# third party
+import numpy as np
+
+
+def query_history_matrix(
+    histories: Dict[str, List[Dict]], start: str, end: str
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Lay `resourceQueryHistory` results out as a resources × days matrix of query
+    counts.  Days without a record count as zero queries.  Resources whose lookup
+    failed (an error message in place of their records) are left out, rather than
+    shown as never queried.
+
+    Args:
+        histories (Dict[str, List[Dict]]): `{date, totalCount}` records keyed by
+            resource unique ID.
+        start (str): First day in the format YYYY-MM-DD.
+        end (str): Last day (inclusive) in the format YYYY-MM-DD.
+
+    Returns:
+        Tuple[List[str], np.ndarray, np.ndarray]: The unique IDs (one per row), the
+            dates (one per column) and the matrix of counts.
+    """
+    unique_ids = [
+        unique_id
+        for unique_id, records in histories.items()
+        if isinstance(records, list)
+    ]
+    dates = np.arange(
+        np.datetime64(start, "D"), np.datetime64(end, "D") + 1, dtype="datetime64[D]"
+    )
+    rows, days, counts = [], [], []
+    for index, unique_id in enumerate(unique_ids):
+        for record in histories[unique_id]:
+            if record.get("date"):
+                rows.append(index)
+                days.append(record["date"][:10])
+                counts.append(record.get("totalCount") or 0)
+
+    matrix = np.zeros((len(unique_ids), len(dates)), dtype=np.float64)
+    if rows:
+        columns = (np.array(days, dtype="datetime64[D]") - dates[0]).astype(np.int64)
+        in_range = (columns >= 0) & (columns < len(dates))
+        np.add.at(
+            matrix,
+            (np.array(rows)[in_range], columns[in_range]),
+            np.array(counts, dtype=np.float64)[in_range],
+        )
+
+    return unique_ids, dates, matrix
+
+
+def summarize_query_history(
+    unique_ids: List[str],
+    dates: np.ndarray,
+    counts: np.ndarray,
+    *,
+    window_days: int = 7,
+) -> List[Dict]:
+    """Compute usage statistics for every resource at once from a resources × days
+    matrix of query counts.
+
+    Args:
+        unique_ids (List[str]): Unique ID of every row.
+        dates (np.ndarray): Date of every column.
+        counts (np.ndarray): Query counts.
+        window_days (int, optional): Length of the recent and previous windows that
+            are compared. Defaults to 7.
+
+    Returns:
+        List[Dict]: One row per resource with total and daily average queries,
+            active days, the busiest day, queries in the recent and previous
+            windows, the change between them and the trend (queries per day).
+    """
+    n_days = counts.shape[1]
+    window = min(window_days, n_days)
+    recent = counts[:, n_days - window :].sum(axis=1)
+    previous = counts[:, max(0, n_days - 2 * window) : n_days - window].sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change_pct = np.where(
+            previous > 0, (recent - previous) / previous * 100, np.nan
+        )
+
+    # Least squares slope of every row against the day number in one go
+    x = np.arange(n_days, dtype=np.float64)
+    x_centered = x - x.mean() if n_days else x
+    denominator = (x_centered**2).sum()
+    trend = (
+        (counts - counts.mean(axis=1, keepdims=True)) @ x_centered / denominator
+        if denominator
+        else np.full(len(unique_ids), np.nan)
+    )
+
+    totals = counts.sum(axis=1)
+    active_days = (counts > 0).sum(axis=1)
+    busiest = counts.argmax(axis=1) if n_days else np.zeros(len(unique_ids), int)
+    rows = []
+    for index, unique_id in enumerate(unique_ids):
+        rows.append(
+            {
+                "unique_id": unique_id,
+                "total_queries": int(totals[index]),
+                "daily_mean": float(totals[index] / n_days) if n_days else np.nan,
+                "active_days": int(active_days[index]),
+                "busiest_day": str(dates[busiest[index]]) if totals[index] else "",
+                f"last_{window}d": int(recent[index]),
+                f"prior_{window}d": int(previous[index]),
+                "change_pct": float(change_pct[index]),
+                "trend_per_day": float(trend[index]),
+            }
+        )
+
+    return rows
@@ -0,0 +1,12 @@
+from .cache import ArtifactCache, ArtifactHandle, artifact_cache, get_artifact
+from .manifest import ManifestIndex, get_manifest_index, index_manifest
+
+__all__ = [
+    "ArtifactCache",
+    "ArtifactHandle",
+    "ManifestIndex",
+    "artifact_cache",
+    "get_artifact",
+    "get_manifest_index",
+    "index_manifest",
+]
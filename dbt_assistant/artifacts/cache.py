@@ -0,0 +1,485 @@
+# stdlib
+import hashlib
+import io
+import mmap
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterator, Optional, Tuple
+
+# third party
+import orjson
+import requests
+
+# first party
+from dbt_assistant.utils.run_watcher import FINISHED_STATUSES
+from dbt_assistant.utils.streaming import CHUNK_SIZE, iter_section
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+ARTIFACT_CACHE_DIR = os.getenv(
+    "DBT_CLOUD_ARTIFACT_CACHE_DIR",
+    os.path.join("~", ".cache", "dbt_assistant", "artifacts"),
+)
+# Attempts at a download, each resuming where the last one stopped
+DOWNLOAD_ATTEMPTS = int(os.getenv("DBT_CLOUD_ARTIFACT_DOWNLOAD_ATTEMPTS", 3))
+# Most bytes the cache (artifacts and manifest indexes) may take up, 0 for no limit
+ARTIFACT_CACHE_MAX_BYTES = int(
+    os.getenv("DBT_CLOUD_ARTIFACT_CACHE_MAX_BYTES", 5 * 1024**3)
+)
+
+# Fields of an artifact's `metadata` block worth repeating in its summary
+_METADATA_FIELDS = (
+    "dbt_schema_version",
+    "dbt_version",
+    "generated_at",
+    "invocation_id",
+)
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+@dataclass(frozen=True)
+class ArtifactHandle:
+    """A run artifact downloaded to the local cache.
+
+    Handles are cheap to pass around - the content stays on disk and is memory
+    mapped only while it's being read.
+    """
+
+    account_id: int
+    run_id: int
+    step: Optional[int]
+    path: str
+    local_path: Path
+    size: int
+    sha256: str
+    downloaded_at: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @contextmanager
+    def open(self) -> Iterator[mmap.mmap]:
+        """Memory map the artifact for reading."""
+        if self.size == 0:
+            # Empty files can't be mapped
+            yield io.BytesIO(b"")
+            return
+
+        with open(self.local_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    def iter_section(self, section: str) -> Iterator[Any]:
+        """Yield the elements of one section of a JSON artifact, e.g. the values of
+        `nodes` in a manifest.json, without decoding the rest of it.
+        """
+        with self.open() as mapped:
+            yield from iter_section(mapped, section)
+
+    def iter_array(self, section: str) -> Iterator[Any]:
+        """Yield the elements of an array in a JSON artifact, e.g. the `results` of a
+        run_results.json.  Faster than `iter_section` for arrays.
+        """
+        with self.open() as mapped:
+            if ijson is None:
+                # No incremental parser available - decode in one go with orjson
+                yield from orjson.loads(mapped.read()).get(section) or []
+                return
+
+            yield from ijson.items(mapped, f"{section}.item", use_float=True)
+
+    def iter_items(self, section: str) -> Iterator[Tuple[str, Any]]:
+        """Yield the `(key, value)` pairs of an object in a JSON artifact, e.g. the
+        nodes of a manifest.json keyed by unique ID.
+        """
+        with self.open() as mapped:
+            if ijson is None:
+                # No incremental parser available - decode in one go with orjson
+                document = orjson.loads(mapped.read())
+                yield from (document.get(section) or {}).items()
+                return
+
+            yield from ijson.kvitems(mapped, section, use_float=True)
+
+    def iter_sections(
+        self, sections: Collection[str]
+    ) -> Iterator[Tuple[str, str, Any]]:
+        """Yield `(section, key, value)` for every entry of several top-level objects
+        in a JSON artifact, in the order they appear, with a single pass over the
+        file - e.g. the nodes, sources and macros of a manifest.json.
+        """
+        with self.open() as mapped:
+            if ijson is None:
+                # No incremental parser available - decode in one go with orjson
+                document = orjson.loads(mapped.read())
+                for section in sections:
+                    for key, value in (document.get(section) or {}).items():
+                        yield section, key, value
+                return
+
+            events = ijson.basic_parse(mapped, use_float=True)
+            depth, section = 0, None
+            for event, value in events:
+                if event == "map_key":
+                    if depth == 1:
+                        section = value
+                    elif depth == 2 and section in sections:
+                        yield section, value, _build_value(events)
+                elif event in ("start_map", "start_array"):
+                    depth += 1
+                elif event in ("end_map", "end_array"):
+                    depth -= 1
+
+    def read_text(self) -> str:
+        return self.local_path.read_text()
+
+    def summary(self) -> Dict[str, Any]:
+        step = self.step if self.step is not None else "last"
+        return {
+            "artifact": f"run {self.run_id} step {step}: {self.path}",
+            "size_mb": round(self.size / 1024**2, 2),
+            "sha256": self.sha256[:12],
+            **self.metadata,
+        }
+
+
+def _build_value(events: Iterator[Tuple[str, Any]]) -> Any:
+    # Consumes exactly the events of the next value
+    builder = ijson.ObjectBuilder()
+    nested = 0
+    for event, value in events:
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            nested += 1
+        elif event in ("end_map", "end_array"):
+            nested -= 1
+        if nested == 0:
+            return builder.value
+
+
+def _read_metadata(local_path: Path) -> Dict[str, Any]:
+    # dbt writes `metadata` first, so only the start of the file is parsed
+    if ijson is None or local_path.suffix != ".json":
+        return {}
+
+    try:
+        with open(local_path, "rb") as f:
+            metadata = next(ijson.items(f, "metadata"), None)
+    except (ijson.JSONError, OSError):
+        return {}
+
+    if not isinstance(metadata, dict):
+        return {}
+
+    return {key: metadata[key] for key in _METADATA_FIELDS if key in metadata}
+
+
+class ArtifactCache:
+    """Run artifacts downloaded to disk, keyed by (account, run, step, path).
+
+    Downloads are streamed in chunks to a `.part` file, and resumed with a `Range`
+    request where they stopped if the connection drops.  Artifacts of finished
+    runs are never downloaded again - runs don't change once they're finished - and
+    a small sidecar file records their size, hash and metadata.  Those of runs
+    still going (whose last step, for one, is yet to come) aren't kept, and are
+    downloaded again on every fetch.
+
+    Once the cache grows past `max_bytes`, the least recently used files (by access
+    time, which is bumped on every use) are deleted - artifacts and the manifest
+    indexes built from them alike.
+
+    Args:
+        directory (str, optional): Root directory of the cache. Defaults to
+            `DBT_CLOUD_ARTIFACT_CACHE_DIR` or ~/.cache/dbt_assistant/artifacts.
+        attempts (int, optional): Attempts at each download. Defaults to
+            `DBT_CLOUD_ARTIFACT_DOWNLOAD_ATTEMPTS` or 3.
+        max_bytes (int, optional): Most bytes the cache may take up, 0 for no
+            limit. Defaults to `DBT_CLOUD_ARTIFACT_CACHE_MAX_BYTES` or 5 GiB.
+    """
+
+    def __init__(
+        self,
+        directory: str = None,
+        attempts: int = DOWNLOAD_ATTEMPTS,
+        max_bytes: int = ARTIFACT_CACHE_MAX_BYTES,
+    ):
+        self.root = Path(directory or ARTIFACT_CACHE_DIR).expanduser()
+        self.attempts = attempts
+        self.max_bytes = max_bytes
+        self._locks: Dict[Path, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+
+    def local_path(
+        self, host: str, account_id: int, run_id: int, step: Optional[int], path: str
+    ) -> Path:
+        step_dir = f"step-{step}" if step is not None else "last-step"
+        local_path = (
+            self.root / host / str(account_id) / str(run_id) / step_dir / path
+        ).resolve()
+        # Artifact paths come from the LLM, so keep them inside the cache
+        if not local_path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid artifact path: {path}")
+        return local_path
+
+    def _lock(self, local_path: Path) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(local_path, threading.Lock())
+
+    def get(
+        self, account_id: int, run_id: int, path: str, *, step: int = None, host: str
+    ) -> Optional[ArtifactHandle]:
+        """The cached artifact, or None if it hasn't been downloaded."""
+        local_path = self.local_path(host, account_id, run_id, step, path)
+        try:
+            meta = orjson.loads(_meta_path(local_path).read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+        if not local_path.exists() or local_path.stat().st_size != meta["size"]:
+            return None
+
+        touch(local_path)
+        return _handle(account_id, run_id, step, path, local_path, meta)
+
+    def _run_finished(self, client, account_id: int, run_id: int) -> bool:
+        response = client.cloud.get_run(account_id=account_id, run_id=run_id)
+        try:
+            return response["data"]["status"] in FINISHED_STATUSES
+        except (KeyError, TypeError):
+            return False
+
+    def fetch(
+        self, client, account_id: int, run_id: int, path: str, *, step: int = None
+    ) -> ArtifactHandle:
+        """The artifact from the cache, downloaded first if it isn't there.
+
+        Args:
+            client: A `dbtCloudClient`.
+            account_id (int): Numeric ID of the account.
+            run_id (int): Numeric ID of the run.
+            path (str): Path of the artifact, e.g. "manifest.json".
+            step (int, optional): Index of the step in the run. Defaults to the last.
+        """
+        host = client.cloud._host
+        local_path = self.local_path(host, account_id, run_id, step, path)
+        with self._lock(local_path):
+            handle = self.get(account_id, run_id, path, step=step, host=host)
+            if handle is not None:
+                return handle
+
+            finished = self._run_finished(client, account_id, run_id)
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            url = (
+                f"https://{host}/api/v2/accounts/{account_id}/runs/{run_id}"
+                f"/artifacts/{path}"
+            )
+            self._download(client.cloud.session, url, step, local_path)
+
+            meta = {
+                "size": local_path.stat().st_size,
+                "sha256": _sha256(local_path),
+                "downloaded_at": time.time(),
+                "metadata": _read_metadata(local_path),
+            }
+            if not finished:
+                # Without a sidecar it's downloaded again next time
+                _meta_path(local_path).unlink(missing_ok=True)
+                self.evict(keep=[local_path])
+                return _handle(account_id, run_id, step, path, local_path, meta)
+
+            meta_path = _meta_path(local_path)
+            tmp = meta_path.with_suffix(".tmp")
+            tmp.write_bytes(orjson.dumps(meta))
+            os.replace(tmp, meta_path)
+            self.evict(keep=[local_path])
+            return self.get(account_id, run_id, path, step=step, host=host)
+
+    def evict(self, keep: Collection[Path] = ()) -> int:
+        """Delete the least recently used files until the cache fits in `max_bytes`.
+
+        Artifacts go together with their sidecar.  Files in `keep`, artifacts being
+        downloaded and partial downloads are left alone.
+
+        Returns:
+            int: Number of bytes freed.
+        """
+        if not self.max_bytes:
+            return 0
+
+        with self._evict_lock:
+            entries, total = [], 0
+            # Resolved, like the paths downloads are locked by
+            for path in self.root.resolve().rglob("*"):
+                if not path.is_file() or path.name.endswith(
+                    (".part", ".tmp", ".meta.json")
+                ):
+                    continue
+
+                files = [path, _meta_path(path)]
+                try:
+                    stat = path.stat()
+                    size = stat.st_size + sum(
+                        file.stat().st_size for file in files[1:] if file.exists()
+                    )
+                except OSError:
+                    # Deleted in the meantime
+                    continue
+
+                total += size
+                entries.append((stat.st_atime, size, path, files))
+
+            freed = 0
+            for _, size, path, files in sorted(entries, key=lambda e: e[:2]):
+                if total - freed <= self.max_bytes:
+                    break
+
+                with self._locks_lock:
+                    lock = self._locks.get(path)
+                if path in keep or (lock is not None and lock.locked()):
+                    continue
+
+                for file in files:
+                    try:
+                        file.unlink(missing_ok=True)
+                    except OSError:
+                        # e.g. an index still open on Windows - it goes next time
+                        pass
+                freed += size
+            return freed
+
+    def _download(self, session, url: str, step: Optional[int], local_path: Path):
+        part = local_path.with_name(local_path.name + ".part")
+        for attempt in range(1, self.attempts + 1):
+            offset = part.stat().st_size if part.exists() else 0
+            headers = {}
+            if offset:
+                # What's on disk is decoded, so ask for unencoded bytes to match
+                headers = {"Range": f"bytes={offset}-", "Accept-Encoding": "identity"}
+            try:
+                with session.get(
+                    url, params={"step": step}, headers=headers, stream=True
+                ) as response:
+                    if response.status_code == 416:
+                        # Nothing left past what we already have
+                        break
+
+                    response.raise_for_status()
+                    total = None
+                    if response.status_code == 206:
+                        match = _CONTENT_RANGE.match(
+                            response.headers.get("Content-Range", "")
+                        )
+                        if not match or int(match.group(1)) != offset:
+                            # Not the range asked for - start over
+                            part.unlink()
+                            continue
+                        if match.group(3) != "*":
+                            total = int(match.group(3))
+                    else:
+                        # The server ignored the range - start over
+                        offset = 0
+                        encoding = response.headers.get("Content-Encoding", "identity")
+                        if (
+                            encoding == "identity"
+                            and "Content-Length" in response.headers
+                        ):
+                            total = int(response.headers["Content-Length"])
+
+                    with open(part, "r+b" if offset else "wb") as f:
+                        f.seek(offset)
+                        f.truncate()
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            f.write(chunk)
+
+                if total is not None and part.stat().st_size != total:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"Incomplete download of {url}: "
+                        f"{part.stat().st_size} of {total} bytes"
+                    )
+                break
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout,
+            ):
+                if attempt == self.attempts:
+                    raise
+        else:
+            raise requests.exceptions.RetryError(f"Couldn't download {url}")
+
+        os.replace(part, local_path)
+
+
+def _handle(
+    account_id: int,
+    run_id: int,
+    step: Optional[int],
+    path: str,
+    local_path: Path,
+    meta: Dict[str, Any],
+) -> ArtifactHandle:
+    return ArtifactHandle(
+        account_id=account_id,
+        run_id=run_id,
+        step=step,
+        path=path,
+        local_path=local_path,
+        size=meta["size"],
+        sha256=meta["sha256"],
+        downloaded_at=meta["downloaded_at"],
+        metadata=meta.get("metadata") or {},
+    )
+
+
+def touch(path: Path) -> None:
+    """Mark a cached file as just used.  Access times are set explicitly, as many
+    filesystems are mounted without updating them on reads.
+    """
+    try:
+        os.utime(path, (time.time(), path.stat().st_mtime))
+    except OSError:
+        pass
+
+
+def _meta_path(local_path: Path) -> Path:
+    return local_path.with_name(local_path.name + ".meta.json")
+
+
+def _sha256(local_path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(local_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+artifact_cache = ArtifactCache()
+
+
+def get_artifact(
+    account_id: int, run_id: int, path: str, *, step: int = None, client=None
+) -> ArtifactHandle:
+    """A run artifact from the local cache, downloaded first if needed.
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        run_id (int): Numeric ID of the run.
+        path (str): Path of the artifact, e.g. "manifest.json".
+        step (int, optional): Index of the step in the run. Defaults to the last.
+        client (optional): A `dbtCloudClient`. Defaults to a pooled one.
+    """
+    if client is not None:
+        return artifact_cache.fetch(client, account_id, run_id, path, step=step)
+
+    # Imported here as the tools package itself depends on this one
+    from dbt_assistant.tools.base_dbt_client import pooled_client
+
+    with pooled_client() as client:
+        return artifact_cache.fetch(client, account_id, run_id, path, step=step)
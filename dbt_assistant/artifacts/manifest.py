@@ -0,0 +1,349 @@
+# stdlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+# third party
+import orjson
+
+# first party
+from dbt_assistant.artifacts.cache import (
+    ArtifactHandle,
+    artifact_cache,
+    get_artifact,
+    touch,
+)
+
+INDEX_VERSION = 1
+
+# Sections of a manifest.json holding resources, and whether they have `depends_on`
+RESOURCE_SECTIONS = {
+    "nodes": True,
+    "sources": False,
+    "exposures": True,
+    "metrics": True,
+    "semantic_models": True,
+    "saved_queries": True,
+}
+
+SCHEMA = """
+CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE nodes (
+    unique_id TEXT PRIMARY KEY,
+    name TEXT,
+    resource_type TEXT,
+    package_name TEXT,
+    materialized TEXT,
+    database TEXT,
+    schema TEXT,
+    alias TEXT,
+    access TEXT,
+    original_file_path TEXT,
+    description TEXT
+);
+CREATE TABLE edges (parent TEXT, child TEXT);
+CREATE TABLE tags (unique_id TEXT, tag TEXT);
+CREATE TABLE macro_usage (unique_id TEXT, macro TEXT);
+CREATE TABLE macros (unique_id TEXT PRIMARY KEY, name TEXT, package_name TEXT);
+"""
+
+# Created after the bulk insert, which is faster than maintaining them during it
+INDEXES = """
+CREATE INDEX nodes_name ON nodes (name);
+CREATE INDEX nodes_type ON nodes (resource_type, materialized);
+CREATE INDEX nodes_package ON nodes (package_name);
+CREATE INDEX edges_parent ON edges (parent);
+CREATE INDEX edges_child ON edges (child);
+CREATE INDEX tags_tag ON tags (tag);
+CREATE INDEX macro_usage_macro ON macro_usage (macro);
+CREATE INDEX macros_name ON macros (name);
+"""
+
+_BATCH_SIZE = 5000
+
+
+def _node_row(unique_id: str, node: Dict[str, Any]) -> Tuple:
+    config = node.get("config") or {}
+    return (
+        unique_id,
+        node.get("name"),
+        node.get("resource_type"),
+        node.get("package_name"),
+        config.get("materialized"),
+        node.get("database"),
+        node.get("schema"),
+        node.get("alias") or node.get("identifier"),
+        node.get("access"),
+        node.get("original_file_path"),
+        (node.get("description") or "")[:500],
+    )
+
+
+class _Batches:
+    """Rows for each table, flushed with `executemany` every `_BATCH_SIZE` rows."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.rows: Dict[str, List[Tuple]] = {}
+
+    def add(self, table: str, row: Tuple) -> None:
+        rows = self.rows.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= _BATCH_SIZE:
+            self.flush(table)
+
+    def flush(self, table: str = None) -> None:
+        for name in [table] if table else list(self.rows):
+            rows = self.rows.pop(name, [])
+            if rows:
+                placeholders = ", ".join("?" * len(rows[0]))
+                self.connection.executemany(
+                    f"INSERT OR REPLACE INTO {name} VALUES ({placeholders})", rows
+                )
+
+
+def build_index(artifact: ArtifactHandle, path: Path) -> None:
+    """Parse a manifest.json into a SQLite database at `path` in a single pass over
+    the file, decoding only a single resource at once.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    connection = sqlite3.connect(tmp)
+    try:
+        connection.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;")
+        connection.executescript(SCHEMA)
+        batches = _Batches(connection)
+        sections = [*RESOURCE_SECTIONS, "macros"]
+        for section, unique_id, node in artifact.iter_sections(sections):
+            if section == "macros":
+                batches.add(
+                    "macros", (unique_id, node.get("name"), node.get("package_name"))
+                )
+                continue
+
+            batches.add("nodes", _node_row(unique_id, node))
+            for tag in node.get("tags") or []:
+                batches.add("tags", (unique_id, tag))
+            if not RESOURCE_SECTIONS[section]:
+                continue
+
+            depends_on = node.get("depends_on") or {}
+            for parent in depends_on.get("nodes") or []:
+                batches.add("edges", (parent, unique_id))
+            for macro in depends_on.get("macros") or []:
+                batches.add("macro_usage", (unique_id, macro))
+
+        batches.flush()
+        connection.executescript(INDEXES)
+        info = {
+            "version": INDEX_VERSION,
+            "sha256": artifact.sha256,
+            "indexed_at": time.time(),
+            **artifact.metadata,
+        }
+        connection.executemany(
+            "INSERT INTO info VALUES (?, ?)",
+            [(key, orjson.dumps(value).decode()) for key, value in info.items()],
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(tmp, path)
+
+
+class ManifestIndex:
+    """Queries over a manifest.json indexed into SQLite: resources, the
+    `depends_on` graph, tags and macro usage.
+
+    Args:
+        path (Path): The SQLite database built by `build_index`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._connection = sqlite3.connect(
+            f"file:{path}?mode=ro", uri=True, check_same_thread=False
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _query(self, sql: str, parameters: Tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(sql, parameters)]
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        return {
+            row["key"]: orjson.loads(row["value"])
+            for row in self._query("SELECT key, value FROM info")
+        }
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Unique ID of a resource given its unique ID or name, preferring models."""
+        rows = self._query(
+            "SELECT unique_id FROM nodes WHERE unique_id = ? OR name = ? "
+            "ORDER BY unique_id != ?, resource_type != 'model' LIMIT 1",
+            (name, name, name),
+        )
+        return rows[0]["unique_id"] if rows else None
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Number of resources per type and materialization."""
+        return self._query(
+            "SELECT resource_type, materialized, COUNT(*) AS count FROM nodes "
+            "GROUP BY resource_type, materialized ORDER BY count DESC"
+        )
+
+    def find(
+        self,
+        *,
+        resource_type: str = None,
+        materialized: str = None,
+        tag: str = None,
+        package_name: str = None,
+        name: str = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Resources matching every filter given.  `name` is a substring match."""
+        clauses, parameters = [], []
+        if resource_type:
+            clauses.append("resource_type = ?")
+            parameters.append(resource_type)
+        if materialized:
+            clauses.append("materialized = ?")
+            parameters.append(materialized)
+        if package_name:
+            clauses.append("package_name = ?")
+            parameters.append(package_name)
+        if name:
+            clauses.append("name LIKE ?")
+            parameters.append(f"%{name}%")
+        if tag:
+            clauses.append("unique_id IN (SELECT unique_id FROM tags WHERE tag = ?)")
+            parameters.append(tag)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(
+            "SELECT unique_id, resource_type, materialized, package_name, "
+            "database || '.' || schema || '.' || alias AS relation "
+            f"FROM nodes {where} ORDER BY unique_id LIMIT ?",
+            (*parameters, limit),
+        )
+
+    def lineage(
+        self,
+        unique_id: str,
+        *,
+        direction: Literal["upstream", "downstream"] = "upstream",
+        depth: int = 1,
+        limit: int = 200,
+    ) -> List[Dict[str, Any]]:
+        """Resources a resource depends on (upstream) or that depend on it
+        (downstream), up to `depth` hops away (0 for any distance).
+        """
+        if direction == "upstream":
+            start, end = "child", "parent"
+        else:
+            start, end = "parent", "child"
+
+        return self._query(
+            f"""
+            WITH RECURSIVE walk (unique_id, distance) AS (
+                SELECT {end}, 1 FROM edges WHERE {start} = ?
+                UNION
+                SELECT edges.{end}, walk.distance + 1
+                FROM edges JOIN walk ON edges.{start} = walk.unique_id
+                WHERE ? = 0 OR walk.distance < ?
+            )
+            SELECT walk.unique_id, MIN(distance) AS distance, nodes.resource_type,
+                nodes.materialized
+            FROM walk LEFT JOIN nodes ON nodes.unique_id = walk.unique_id
+            GROUP BY walk.unique_id
+            ORDER BY distance, walk.unique_id
+            LIMIT ?
+            """,
+            (unique_id, depth, depth, limit),
+        )
+
+    def macro_usage(self, macro: str, *, limit: int = 100) -> List[Dict[str, Any]]:
+        """Resources calling a macro, given its unique ID or name."""
+        return self._query(
+            "SELECT macro_usage.macro, macro_usage.unique_id, nodes.resource_type "
+            "FROM macro_usage JOIN nodes ON nodes.unique_id = macro_usage.unique_id "
+            "WHERE macro_usage.macro = ? OR macro_usage.macro IN "
+            "(SELECT unique_id FROM macros WHERE name = ?) "
+            "ORDER BY macro_usage.unique_id LIMIT ?",
+            (macro, macro, limit),
+        )
+
+    def edges(self) -> List[Tuple[str, str]]:
+        """Every `(parent, child)` dependency."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT parent, child FROM edges"
+            ).fetchall()
+
+
+_indexes: Dict[str, ManifestIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _index_is_current(path: Path) -> bool:
+    try:
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return False
+
+    try:
+        row = connection.execute(
+            "SELECT value FROM info WHERE key = 'version'"
+        ).fetchone()
+        return row is not None and orjson.loads(row[0]) == INDEX_VERSION
+    except sqlite3.Error:
+        return False
+    finally:
+        connection.close()
+
+
+def index_manifest(artifact: ArtifactHandle) -> ManifestIndex:
+    """The index of a cached manifest.json, built on first use.
+
+    Indexes are keyed by the manifest's hash, so runs sharing a manifest share an
+    index and an already indexed manifest is never parsed again (unless its index
+    has been evicted from the cache).
+    """
+    with _indexes_lock:
+        index = _indexes.get(artifact.sha256)
+        if index is not None:
+            # Still readable while open, even if it's been evicted since
+            touch(index.path)
+            return index
+
+        directory = artifact_cache.root.resolve() / "manifest_index"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{artifact.sha256}.sqlite"
+        if not path.exists() or not _index_is_current(path):
+            build_index(artifact, path)
+            artifact_cache.evict(keep=[path, artifact.local_path])
+        else:
+            touch(path)
+
+        index = _indexes[artifact.sha256] = ManifestIndex(path)
+        return index
+
+
+def get_manifest_index(
+    account_id: int, run_id: int, *, step: int = None, client=None
+) -> ManifestIndex:
+    """The index of a run's manifest.json, downloading and indexing it if needed."""
+    artifact = get_artifact(
+        account_id, run_id, "manifest.json", step=step, client=client
+    )
+    return index_manifest(artifact)
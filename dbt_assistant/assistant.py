@@ -1,8 +1,27 @@
 # third party
+from langchain_core.messages import HumanMessage
 from langchain_core.runnables import Runnable, RunnableConfig
 
 # first party
 from dbt_assistant.state import State
+from dbt_assistant.utils.run_watcher import run_watcher
+
+
+def run_updates(thread_id: str = None) -> list[HumanMessage]:
+    """Runs the conversation is watching that finished since its last turn, as a
+    message.
+    """
+    finished = run_watcher.notifications(thread_id)
+    if not finished:
+        return []
+
+    lines = [
+        f"- Run {run.run_id} (job {run.job_id}): {run.status_humanized}"
+        + (f" after {run.duration}" if run.duration else "")
+        for run in finished
+    ]
+    content = "[Automatic run update] These runs have finished:\n" + "\n".join(lines)
+    return [HumanMessage(content=content)]
 
 
 class DbtAssistant:
@@ -10,6 +29,10 @@ class DbtAssistant:
         self.runnable = runnable
 
     def __call__(self, state: State, config: RunnableConfig):
+        updates = run_updates(config.get("configurable", {}).get("thread_id"))
+        if updates:
+            state = {**state, "messages": state["messages"] + updates}
+
         while True:
             result = self.runnable.invoke(state)
 
@@ -24,4 +47,4 @@ class DbtAssistant:
                 state = {**state, "messages": messages}
             else:
                 break
-        return {"messages": result}
+        return {"messages": updates + [result]}
@@ -0,0 +1,3 @@
+from .store import AuditLogStore, get_audit_logs
+
+__all__ = ["AuditLogStore", "get_audit_logs"]
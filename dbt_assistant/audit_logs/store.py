@@ -0,0 +1,374 @@
+# stdlib
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# third party
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# first party
+from dbt_assistant.utils.pagination import paginate
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover
+    duckdb = None
+
+AUDIT_LOG_DIR = os.getenv(
+    "DBT_CLOUD_AUDIT_LOG_DIR",
+    os.path.join("~", ".cache", "dbt_assistant", "audit_logs"),
+)
+# Seconds before audit logs logged since the last sync are pulled in
+AUDIT_LOG_SYNC_INTERVAL = float(os.getenv("DBT_CLOUD_AUDIT_LOG_SYNC_INTERVAL", 300))
+# How far back the first sync of an account goes
+AUDIT_LOG_BACKFILL_DAYS = int(os.getenv("DBT_CLOUD_AUDIT_LOG_BACKFILL_DAYS", 90))
+
+# Fields of an audit log kept as columns - the rest of it goes into `details`
+COLUMNS = (
+    "event_type",
+    "actor_id",
+    "actor_name",
+    "actor_type",
+    "project_id",
+    "service",
+    "source",
+)
+SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("logged_at", pa.timestamp("us", tz="UTC")),
+        *[(column, pa.string()) for column in COLUMNS],
+        ("details", pa.string()),
+    ]
+)
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+# Rows buffered from the API before they're written out
+_FLUSH_ROWS = 10_000
+
+
+def _to_microseconds(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+
+    # dbt Cloud timestamps are all UTC
+    value = value.rstrip("Z")
+    value = value[:10] + value[10:].split("+")[0]
+    return int(np.datetime64(value[:26], "us").astype(np.int64))
+
+
+def _to_table(records: List[Dict[str, Any]]) -> pa.Table:
+    columns = {name: [] for name in SCHEMA.names}
+    for record in records:
+        columns["id"].append(record.get("id"))
+        columns["logged_at"].append(_to_microseconds(record.get("logged_at")))
+        for column in COLUMNS:
+            value = record.get(column)
+            columns[column].append(None if value is None else str(value))
+        rest = {
+            key: value
+            for key, value in record.items()
+            if key not in COLUMNS and key not in ("id", "logged_at")
+        }
+        columns["details"].append(orjson.dumps(rest).decode())
+    return pa.table(columns, schema=SCHEMA)
+
+
+class AuditLogStore:
+    """Audit logs of one account, exported to Parquet files on disk.
+
+    Every sync pulls only the logs logged since the newest one already stored (the
+    watermark) and writes them to one directory per day, `date=YYYY-MM-DD`.  Syncs
+    add a file to each day they touch, so days with more than one file are merged
+    back into one by a background compaction.  Questions are answered by scanning
+    the files - with DuckDB when it's installed, otherwise pyarrow - without
+    calling the API again within `sync_interval` seconds of the last sync.
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        directory (str, optional): Where audit logs are stored. Defaults to
+            `DBT_CLOUD_AUDIT_LOG_DIR` or ~/.cache/dbt_assistant/audit_logs.
+        sync_interval (float, optional): Seconds between syncs.
+        backfill_days (int, optional): Days of logs the first sync pulls in.
+    """
+
+    def __init__(
+        self,
+        account_id: int,
+        *,
+        directory: str = None,
+        sync_interval: float = AUDIT_LOG_SYNC_INTERVAL,
+        backfill_days: int = AUDIT_LOG_BACKFILL_DAYS,
+    ):
+        host = os.getenv("DBT_CLOUD_HOST", "cloud.getdbt.com")
+        self.account_id = account_id
+        self.root = (
+            Path(directory or AUDIT_LOG_DIR).expanduser() / host / str(account_id)
+        )
+        self.sync_interval = sync_interval
+        self.backfill_days = backfill_days
+        self._sync_lock = threading.Lock()
+        # Held while files are swapped by compaction, and while they're scanned
+        self._files_lock = threading.Lock()
+        self._compaction: Optional[threading.Thread] = None
+
+    @property
+    def _state_path(self) -> Path:
+        # Leading underscores keep it out of the dataset
+        return self.root / "_sync.json"
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            return orjson.loads(self._state_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+
+    def _write_state(self, state: Dict[str, Any]) -> None:
+        tmp = self._state_path.with_name("_sync.tmp")
+        tmp.write_bytes(orjson.dumps(state))
+        os.replace(tmp, self._state_path)
+
+    @property
+    def synced_at(self) -> Optional[float]:
+        return self._read_state().get("synced_at")
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        table = _to_table(records)
+        dates = pc.strftime(table["logged_at"], format="%Y-%m-%d").to_numpy(
+            zero_copy_only=False
+        )
+        for date in np.unique(dates):
+            part = table.filter(pa.array(dates == date))
+            directory = self.root / f"date={date}"
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"part-{time.time_ns()}.parquet"
+            # Dot files are ignored by the dataset, so half written ones never show
+            tmp = directory / f".{path.name}"
+            pq.write_table(part, tmp)
+            os.replace(tmp, path)
+
+    def sync(self) -> Optional[str]:
+        """Pull in the audit logs logged since the watermark.  Returns an error
+        message if the API call failed.
+        """
+        state = self._read_state()
+        watermark = state.get("watermark")
+        seen = set(state.get("ids_at_watermark") or [])
+        if watermark is None:
+            start = datetime.now(timezone.utc) - timedelta(days=self.backfill_days)
+        else:
+            start = datetime.fromtimestamp(watermark / 1e6, timezone.utc)
+
+        buffer: List[Dict[str, Any]] = []
+        newest, newest_ids = watermark, set(seen)
+
+        def sink(records: List[Dict[str, Any]]) -> None:
+            nonlocal newest, newest_ids
+            for record in records:
+                logged_at = _to_microseconds(record.get("logged_at"))
+                # The API filters by day, so the start of the watermark's day
+                # comes back again
+                if (
+                    logged_at is None
+                    or watermark is not None
+                    and (
+                        logged_at < watermark
+                        or logged_at == watermark
+                        and record.get("id") in seen
+                    )
+                ):
+                    continue
+
+                buffer.append(record)
+                if newest is None or logged_at > newest:
+                    newest, newest_ids = logged_at, {record.get("id")}
+                elif logged_at == newest:
+                    newest_ids.add(record.get("id"))
+
+            if len(buffer) >= _FLUSH_ROWS:
+                self._write(buffer)
+                buffer.clear()
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        response = paginate(
+            "list_audit_logs",
+            account_id=self.account_id,
+            logged_at_start=start.strftime("%Y-%m-%d"),
+            # Every log since the watermark, not just the first `MAX_RESULTS`
+            limit=sys.maxsize,
+            sink=sink,
+        )
+        if buffer:
+            self._write(buffer)
+        if not response["status"]["is_success"]:
+            # The watermark stays put, so the next sync writes the logs already
+            # written again - compaction drops the duplicates
+            self.compact_in_background()
+            return response["status"].get("user_message") or "Couldn't sync logs."
+
+        self._write_state(
+            {
+                "watermark": newest,
+                "ids_at_watermark": sorted(newest_ids),
+                "synced_at": time.time(),
+            }
+        )
+        self.compact_in_background()
+        return None
+
+    def ensure_current(self) -> Optional[str]:
+        with self._sync_lock:
+            synced_at = self.synced_at
+            if synced_at is None or time.time() - synced_at > self.sync_interval:
+                return self.sync()
+
+            return None
+
+    def compact(self) -> int:
+        """Merge the files of every day that has more than one into a single file,
+        sorted by time.  Returns the number of days compacted.
+        """
+        compacted = 0
+        for directory in sorted(self.root.glob("date=*")):
+            files = sorted(directory.glob("part-*.parquet"))
+            if len(files) < 2:
+                continue
+
+            table = pa.concat_tables(pq.read_table(f, schema=SCHEMA) for f in files)
+            # Syncs that failed part way through may have written a log twice
+            _, first = np.unique(table["id"].to_numpy(), return_index=True)
+            table = table.take(first).sort_by([("logged_at", "ascending")])
+            path = directory / f"part-{time.time_ns()}.parquet"
+            tmp = directory / f".{path.name}"
+            pq.write_table(table, tmp)
+            with self._files_lock:
+                os.replace(tmp, path)
+                for f in files:
+                    f.unlink()
+            compacted += 1
+        return compacted
+
+    def compact_in_background(self) -> None:
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+
+        self._compaction = threading.Thread(
+            target=self.compact, name="audit-log-compaction", daemon=True
+        )
+        self._compaction.start()
+
+    def dataset(self) -> ds.Dataset:
+        return ds.dataset(
+            self.root,
+            format="parquet",
+            partitioning=PARTITIONING,
+            schema=SCHEMA.append(pa.field("date", pa.string())),
+        )
+
+    def __len__(self) -> int:
+        with self._files_lock:
+            return self.dataset().count_rows() if self.root.exists() else 0
+
+    def query(
+        self,
+        *,
+        since: str = None,
+        until: str = None,
+        event_type: str = None,
+        actor: str = None,
+        group_by: str = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Audit logs matching every filter given, newest first - or, with
+        `group_by`, their count per value of that column.
+
+        Args:
+            since (str, optional): First day, as yyyy-mm-dd.
+            until (str, optional): Last day, as yyyy-mm-dd.
+            event_type (str, optional): Part of the event type.
+            actor (str, optional): Part of the actor's name.
+            group_by (str, optional): Column to count logs by, or "date".
+            limit (int, optional): Most rows to return. Defaults to 100.
+        """
+        filters = []
+        # Partitions are filtered on their directory name, so days outside the
+        # range are never opened
+        if since:
+            filters.append(ds.field("date") >= since)
+        if until:
+            filters.append(ds.field("date") <= until)
+        if event_type:
+            filters.append(pc.match_substring(ds.field("event_type"), event_type))
+        if actor:
+            filters.append(
+                pc.match_substring(ds.field("actor_name"), actor, ignore_case=True)
+            )
+
+        expression = None
+        for condition in filters:
+            expression = condition if expression is None else expression & condition
+
+        with self._files_lock:
+            if not self.root.exists():
+                return []
+            table = self.dataset().to_table(filter=expression)
+
+        if group_by:
+            counts = table.group_by(group_by).aggregate(
+                [([], "count_all"), ("logged_at", "min"), ("logged_at", "max")]
+            )
+            table = pa.table(
+                {
+                    group_by: counts[group_by],
+                    "count": counts["count_all"],
+                    "first_logged_at": counts["logged_at_min"],
+                    "last_logged_at": counts["logged_at_max"],
+                }
+            ).sort_by([("count", "descending")])
+        else:
+            table = table.sort_by([("logged_at", "descending")])
+
+        return table.slice(0, limit).to_pylist()
+
+    def sql(self, sql: str, *, limit: int = 100) -> List[Dict[str, Any]]:
+        """Run a DuckDB query over the logs, as the `audit_logs` table.
+
+        Raises:
+            RuntimeError: If DuckDB isn't installed.
+        """
+        if duckdb is None:
+            raise RuntimeError("DuckDB isn't installed - `pip install duckdb`.")
+
+        with self._files_lock:
+            if not self.root.exists():
+                return []
+            connection = duckdb.connect()
+            try:
+                connection.register("audit_logs", self.dataset())
+                # The query comes from the LLM, so keep it away from other files
+                connection.execute("SET enable_external_access = false")
+                result = connection.execute(sql).fetch_arrow_table()
+            finally:
+                connection.close()
+
+        return result.slice(0, limit).to_pylist()
+
+
+_stores: Dict[int, AuditLogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_audit_logs(account_id: int) -> AuditLogStore:
+    with _stores_lock:
+        if account_id not in _stores:
+            _stores[account_id] = AuditLogStore(account_id)
+        return _stores[account_id]
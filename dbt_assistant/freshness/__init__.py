@@ -0,0 +1,3 @@
+from .monitor import SourceFreshness, get_source_freshness
+
+__all__ = ["SourceFreshness", "get_source_freshness"]
@@ -0,0 +1,114 @@
+# stdlib
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+# third party
+import numpy as np
+
+# first party
+from dbt_assistant.analytics.freshness import FreshnessTable
+from dbt_assistant.queries import query_engine
+
+# Seconds before the freshness of checked sources is fetched again
+FRESHNESS_REFRESH_INTERVAL = float(
+    os.getenv("DBT_CLOUD_FRESHNESS_REFRESH_INTERVAL", 300)
+)
+# Seconds before every source is fetched again, to pick up new and deleted ones
+FRESHNESS_REBUILD_INTERVAL = float(
+    os.getenv("DBT_CLOUD_FRESHNESS_REBUILD_INTERVAL", 24 * 3600)
+)
+
+
+class SourceFreshness:
+    """Freshness of every source in one environment, kept locally as a
+    `FreshnessTable`.
+
+    Every source is paged through once, on first use, with only the fields needed
+    for freshness.  After that, at most every `refresh_interval` seconds, only the
+    sources whose freshness is checked are fetched again and merged in - the others
+    can't change status without a new deployment, which the rebuild every
+    `rebuild_interval` seconds picks up.
+
+    Args:
+        environment_id (int): Environment ID.
+        refresh_interval (float, optional): Seconds between incremental refreshes.
+        rebuild_interval (float, optional): Seconds between full rebuilds.
+    """
+
+    def __init__(
+        self,
+        environment_id: int,
+        *,
+        refresh_interval: float = FRESHNESS_REFRESH_INTERVAL,
+        rebuild_interval: float = FRESHNESS_REBUILD_INTERVAL,
+    ):
+        self.environment_id = environment_id
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.table = FreshnessTable.from_edges([])
+        self.built_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _fetch(self, freshness_checked: bool = None):
+        edges = query_engine.execute(
+            "get_source_freshness",
+            raw=True,
+            environment_id=self.environment_id,
+            freshness_checked=freshness_checked,
+        )
+        if isinstance(edges, str):
+            return edges
+
+        return FreshnessTable.from_edges(edges)
+
+    def rebuild(self) -> Optional[str]:
+        started_at = time.time()
+        table = self._fetch()
+        if isinstance(table, str):
+            return table
+
+        self.table = table
+        self.built_at = self.refreshed_at = started_at
+        return None
+
+    def refresh(self) -> Optional[str]:
+        """Merge in the current freshness of every checked source."""
+        started_at = time.time()
+        checked = self._fetch(freshness_checked=True)
+        if isinstance(checked, str):
+            return checked
+
+        # Checked sources missing now were deleted or aren't checked anymore
+        table = self.table
+        table = table.filter(
+            (table.status == 0)
+            | np.isin(table.unique_id.astype(str), checked.unique_id.astype(str))
+        )
+        self.table = table.merge(checked)
+        self.refreshed_at = started_at
+        return None
+
+    def ensure_current(self) -> Optional[str]:
+        with self._lock:
+            now = time.time()
+            if self.built_at is None or now - self.built_at > self.rebuild_interval:
+                return self.rebuild()
+
+            if now - self.refreshed_at > self.refresh_interval:
+                return self.refresh()
+
+            return None
+
+
+_monitors: Dict[int, SourceFreshness] = {}
+_monitors_lock = threading.Lock()
+
+
+def get_source_freshness(environment_id: int) -> SourceFreshness:
+    with _monitors_lock:
+        if environment_id not in _monitors:
+            _monitors[environment_id] = SourceFreshness(environment_id)
+        return _monitors[environment_id]
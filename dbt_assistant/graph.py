@@ -11,7 +11,10 @@ from langgraph.prebuilt import tools_condition
 from dbt_assistant import runnables as dbt_runnables
 from dbt_assistant import tools as dbt_tools
 from dbt_assistant.assistant import DbtAssistant
+from dbt_assistant.llm import uses_local_provider
 from dbt_assistant.state import State
+from dbt_assistant.tools.base_dbt_client import can_reach_dbt_cloud
+from dbt_assistant.tools.discovery_api import prefetch_discovery_api
 from dbt_assistant.tools.pydantic import (
     CompleteOrEscalate,
     ToAdminApiAssistant,
@@ -20,7 +23,9 @@ from dbt_assistant.tools.pydantic import (
     ToDocsAssistant,
     ToSemanticLayerAssistant,
 )
+from dbt_assistant.tools.semantic_layer import prefetch_semantic_layer
 from dbt_assistant.utils.graph import create_entry_node, create_tool_node_with_fallback
+from dbt_assistant.utils.prefetch import prefetcher
 
 
 def pop_dialog_state(state: State) -> dict:
@@ -29,6 +34,11 @@ def pop_dialog_state(state: State) -> dict:
     This lets the full graph explicitly track the dialog flow and delegate control
     to specific sub-graphs.
     """
+    # Anything the specialist prefetched is no longer needed
+    dialog_state = state.get("dialog_state")
+    if dialog_state:
+        prefetcher.cancel(dialog_state[-1])
+
     messages = []
     if state["messages"][-1].tool_calls:
         messages.append(
@@ -63,8 +73,19 @@ def route_to_workflow(
     return dialog_state[-1]
 
 
+# Stands in for the user's account when a local model runs without dbt Cloud
+LOCAL_ACCOUNT_INFO = {
+    "account_id": 0,
+    "account_name": "Local account",
+    "account_plan": "local",
+}
+
+
 def account_info(state: State):
     if state["account_info"] is None or state["account_info"] == "":
+        if uses_local_provider() and not can_reach_dbt_cloud():
+            return {"account_info": LOCAL_ACCOUNT_INFO}
+
         list_accounts_tool = [
             tool for tool in dbt_tools.admin_api_tools if tool.name == "list_accounts"
         ][0]
@@ -115,7 +136,11 @@ def route_discovery_api(
 
 builder.add_node(
     "enter_discovery_api",
-    create_entry_node("Discovery API Assistant", "retrieve_metadata"),
+    create_entry_node(
+        "Discovery API Assistant",
+        "retrieve_metadata",
+        prefetch=[prefetch_discovery_api],
+    ),
 )
 builder.add_node(
     "retrieve_metadata", DbtAssistant(dbt_runnables.discovery_api_runnable)
@@ -148,7 +173,11 @@ def route_semantic_layer(
 
 builder.add_node(
     "enter_semantic_layer",
-    create_entry_node("Semantic Layer Assistant", "retrieve_semantics"),
+    create_entry_node(
+        "Semantic Layer Assistant",
+        "retrieve_semantics",
+        prefetch=[prefetch_semantic_layer],
+    ),
 )
 builder.add_node(
     "retrieve_semantics", DbtAssistant(dbt_runnables.semantic_layer_runnable)
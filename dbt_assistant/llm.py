@@ -6,6 +6,10 @@ from typing import Any, Dict
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 
+# first party
+from dbt_assistant.llm_providers.scripted import ScriptedChatModel
+from dbt_assistant.utils.cassette import CassetteChatModel, get_cassette
+
 DEFAULTS = {
     "temperature": 0,
     "streaming": True,
@@ -15,6 +19,15 @@ DEFAULTS = {
 DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
 DEFAULT_ANTHROPIC_MODEL = "claude-3-5-sonnet-20240620"
 
+# Set DBT_ASSISTANT_PROVIDER to one of these to use a local model instead of a
+# hosted one (no API key or network required)
+LOCAL_PROVIDERS = {"scripted": ScriptedChatModel}
+
+
+def uses_local_provider() -> bool:
+    """Whether DBT_ASSISTANT_PROVIDER selects one of the `LOCAL_PROVIDERS`."""
+    return os.getenv("DBT_ASSISTANT_PROVIDER") in LOCAL_PROVIDERS
+
 
 class LLMFactory:
     @staticmethod
@@ -40,7 +53,32 @@ class LLMFactory:
 
     @staticmethod
     def create_llm(model_name: str = None):
+        cassette = get_cassette()
+        if cassette is None:
+            return LLMFactory._create_provider_llm(model_name)
+
+        # Replaying a cassette doesn't need (or call) a real provider
+        if cassette.mode == "replay":
+            return CassetteChatModel(cassette=cassette)
+
+        return CassetteChatModel(
+            cassette=cassette, llm=LLMFactory._create_provider_llm(model_name)
+        )
+
+    @staticmethod
+    def _create_provider_llm(model_name: str = None):
         env_vars = LLMFactory._get_llm_env_vars()
+        provider = env_vars.pop("provider", None)
+        if provider is not None:
+            try:
+                llm_class = LOCAL_PROVIDERS[provider]
+            except KeyError:
+                raise ValueError(f"Invalid LLM provider: {provider}")
+
+            if model_name is not None:
+                env_vars["model"] = model_name
+            return llm_class(**env_vars)
+
         if "OPENAI_API_KEY" in os.environ:
             return ChatOpenAI(
                 model=model_name or env_vars.pop("model", DEFAULT_OPENAI_MODEL),
@@ -1,4 +1,10 @@
 from .anthropic import AnthropicProvider
 from .openai import OpenAIProvider
+from .scripted import ScriptedChatModel, ScriptedProvider
 
-__all__ = ["AnthropicProvider", "OpenAIProvider"]
+__all__ = [
+    "AnthropicProvider",
+    "OpenAIProvider",
+    "ScriptedChatModel",
+    "ScriptedProvider",
+]
@@ -0,0 +1,254 @@
+# stdlib
+import json
+import re
+import threading
+import time
+import uuid
+from typing import Any, Iterator, List, Optional, Sequence
+
+# third party
+from langchain_core.language_models.chat_models import (
+    BaseChatModel,
+    generate_from_stream,
+)
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.pydantic_v1 import PrivateAttr
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+# first party
+from dbt_assistant.llm_providers.base import BaseProvider
+
+COMPLETE_OR_ESCALATE = "CompleteOrEscalate"
+
+# Keywords used to route a user's message to a specialized assistant.  The first
+# match wins; anything else goes to the Discovery API Assistant.
+ROUTING_RULES = [
+    (r"semantic|metric|dimension|revenue|arr\b", "ToSemanticLayerAssistant"),
+    (r"package|hub", "ToDbtHubAssistant"),
+    (
+        r"webhook|job|run\b|runs\b|account|user|environment|artifact",
+        "ToAdminApiAssistant",
+    ),
+    (r"\bdocs?\b|documentation|how (do|can|should) i|best practice", "ToDocsAssistant"),
+]
+DEFAULT_ROUTE = "ToDiscoveryApiAssistant"
+
+# Tools a specialist reaches for first, when they're bound
+PREFERRED_TOOLS = ["get_resources", "get_dimension_values", "list_accounts"]
+
+
+def _is_transfer(name: str) -> bool:
+    return name.startswith("To") and name.endswith("Assistant")
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Local chat model that never touches the network.
+
+    Responses either come from a script (a JSON list of `{"content": ...,
+    "tool_calls": [{"name": ..., "args": ...}]}` turns served in order) or from simple
+    rules that walk the graph the way a real model would: route the user to a
+    specialist with a `To*Assistant` call, have the specialist call one of its tools,
+    hand back with `CompleteOrEscalate` and finish with a text answer.
+
+    Tokens are streamed with a configurable delay so graph orchestration can be load
+    tested with realistic (or zero) model latency.
+    """
+
+    model: str = "scripted"
+    script_path: Optional[str] = None
+    token_latency: float = 0.0
+    first_token_latency: float = 0.0
+    invoke_tools: bool = True
+    # Accepted so the usual DBT_ASSISTANT_ env vars can be passed straight through
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    streaming: bool = False
+
+    _script: Optional[List[dict]] = PrivateAttr(default=None)
+    _position: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if self.script_path:
+            with open(self.script_path) as f:
+                self._script = json.load(f)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs):
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs
+        )
+
+    # Deciding what to say
+
+    def _next_scripted_turn(self) -> dict:
+        with self._lock:
+            turn = self._script[self._position % len(self._script)]
+            self._position += 1
+        return turn
+
+    def _pick_specialist_tool(self, tools: List[dict]) -> Optional[dict]:
+        specialist_tools = {
+            tool["function"]["name"]: tool
+            for tool in tools
+            if tool["function"]["name"] != COMPLETE_OR_ESCALATE
+        }
+        for name in PREFERRED_TOOLS:
+            if name in specialist_tools:
+                return specialist_tools[name]
+
+        for tool in specialist_tools.values():
+            if not tool["function"].get("parameters", {}).get("required"):
+                return tool
+
+        return None
+
+    def _specialist_turn(self, tools: List[dict], human_text: str) -> dict:
+        tool = self._pick_specialist_tool(tools) if self.invoke_tools else None
+        if tool is None:
+            return self._escalate("There is nothing more I can do here.")
+
+        args = {}
+        required = tool["function"].get("parameters", {}).get("required", [])
+        if required:
+            # Only reached with PREFERRED_TOOLS - fill the first argument with the ask
+            args = {required[0]: human_text}
+        return {
+            "content": "",
+            "tool_calls": [{"name": tool["function"]["name"], "args": args}],
+        }
+
+    def _escalate(self, reason: str) -> dict:
+        return {
+            "content": "",
+            "tool_calls": [
+                {
+                    "name": COMPLETE_OR_ESCALATE,
+                    "args": {"cancel": True, "reason": reason},
+                }
+            ],
+        }
+
+    def _ruled_turn(self, messages: List[BaseMessage], tools: List[dict]) -> dict:
+        tool_names = {tool["function"]["name"] for tool in tools}
+        human_text = next(
+            (m.content for m in reversed(messages) if m.type == "human"), ""
+        )
+        if not isinstance(human_text, str):
+            human_text = json.dumps(human_text)
+
+        last = messages[-1]
+        last_call = next(
+            (
+                m.tool_calls[0]["name"]
+                for m in reversed(messages)
+                if isinstance(m, AIMessage) and m.tool_calls
+            ),
+            None,
+        )
+        is_primary = any(_is_transfer(name) for name in tool_names)
+
+        if last.type == "human" or last_call is None:
+            if is_primary:
+                route = next(
+                    (
+                        name
+                        for pattern, name in ROUTING_RULES
+                        if name in tool_names
+                        and re.search(pattern, human_text, re.IGNORECASE)
+                    ),
+                    DEFAULT_ROUTE,
+                )
+                return {
+                    "content": "",
+                    "tool_calls": [{"name": route, "args": {"request": human_text}}],
+                }
+
+            if tool_names:
+                return self._specialist_turn(tools, human_text)
+
+        if last_call is not None and _is_transfer(last_call) and not is_primary:
+            return self._specialist_turn(tools, human_text)
+
+        if not is_primary and COMPLETE_OR_ESCALATE in tool_names:
+            return self._escalate("I have fully completed the task.")
+
+        return {
+            "content": f"Here is what I found for your question: {human_text}",
+            "tool_calls": [],
+        }
+
+    # Streaming it out
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        tools = kwargs.get("tools") or []
+        if self._script:
+            turn = self._next_scripted_turn()
+        else:
+            turn = self._ruled_turn(messages, tools)
+
+        if self.first_token_latency:
+            time.sleep(self.first_token_latency)
+
+        for token in re.findall(r"\S+\s*", turn.get("content") or ""):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+        tool_call_chunks = [
+            {
+                "name": call["name"],
+                "args": json.dumps(call.get("args", {})),
+                "id": f"call_{uuid.uuid4().hex[:24]}",
+                "index": index,
+            }
+            for index, call in enumerate(turn.get("tool_calls") or [])
+        ]
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", tool_call_chunks=tool_call_chunks)
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return generate_from_stream(
+            self._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+
+class ScriptedProvider(BaseProvider):
+    def __init__(self, model: str, temperature: float, max_tokens: int, **kwargs):
+        # Nothing to authenticate against, so skip the API key lookup
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.api_key = None
+        self.kwargs = kwargs
+        self.llm = self.get_llm_model()
+
+    def get_llm_model(self):
+        return ScriptedChatModel(
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            **self.kwargs,
+        )
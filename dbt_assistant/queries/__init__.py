@@ -0,0 +1,48 @@
+from .discovery import (
+    DISCOVERY_QUERIES,
+    query_engine,
+    query_stats,
+    resource_query_histories_query,
+)
+from .engine import (
+    CacheHook,
+    QueryEngine,
+    QueryHook,
+    QueryRequest,
+    QueryStats,
+    map_concurrently,
+)
+from .schema import SchemaCache, SchemaIndex, get_schema, named_type
+from .spec import Arg, CompiledQuery, QuerySpec, compile_query, create_date_range
+from .validation import (
+    ValidationHook,
+    build_graphql_schema,
+    validate_document,
+    validate_variables,
+)
+
+__all__ = [
+    "Arg",
+    "CacheHook",
+    "CompiledQuery",
+    "DISCOVERY_QUERIES",
+    "QueryEngine",
+    "QueryHook",
+    "QueryRequest",
+    "QuerySpec",
+    "QueryStats",
+    "SchemaCache",
+    "SchemaIndex",
+    "ValidationHook",
+    "build_graphql_schema",
+    "compile_query",
+    "create_date_range",
+    "get_schema",
+    "map_concurrently",
+    "named_type",
+    "query_engine",
+    "query_stats",
+    "resource_query_histories_query",
+    "validate_document",
+    "validate_variables",
+]
@@ -0,0 +1,1019 @@
+# third party
+from dbtc.client.metadata import QUERIES as DBTC_QUERIES
+
+# first party
+from dbt_assistant.queries.engine import (
+    QUERY_CACHE_TTL,
+    CacheHook,
+    QueryEngine,
+    QueryStats,
+)
+from dbt_assistant.queries.spec import ENVIRONMENT_ID, FIRST_N_RESULTS, Arg, QuerySpec
+from dbt_assistant.queries.validation import VALIDATE_QUERIES, ValidationHook
+
+CONSUMER_PROJECTS_QUERY = """
+    query Environment($environmentId: BigInt!) {
+    environment(id: $environmentId) {
+        consumerProjects {
+        consumerCloudProject
+        consumerCoreProject
+        consumerEnvironmentId
+        consumerProjectId
+        producerPublicModels {
+            numEdges
+            uniqueId
+        }
+        }
+    }
+    }
+    """
+
+EXPOSURES_QUERY = """
+    query Environment($environmentId: BigInt!, $after: String, $filter: ExposureFilter, $first: Int) {
+    environment(id: $environmentId) {
+        applied {
+        exposures(after: $after, filter: $filter, first: $first) {
+            pageInfo {
+            endCursor
+            hasNextPage
+            hasPreviousPage
+            startCursor
+            }
+            totalCount
+            edges {
+            cursor
+            node {
+                description
+                exposureType
+                label
+                maturity
+                meta
+                name
+                ownerEmail
+                ownerName
+                packageName
+                resourceType
+                tags
+                uniqueId
+                url
+            }
+            }
+        }
+        }
+    }
+    }
+    """
+
+MODELS_QUERY = """
+    query Environment($environmentId: BigInt!, $after: String, $filter: ModelAppliedFilter, $first: Int, $types: [AncestorNodeType!]!) {
+    environment(id: $environmentId) {
+        applied {
+        models(after: $after, filter: $filter, first: $first) {
+            pageInfo {
+            endCursor
+            hasNextPage
+            hasPreviousPage
+            startCursor
+            }
+            totalCount
+            edges {
+            cursor
+            node {
+                access
+                alias
+                ancestors(types: $types) {
+                    description
+                    name
+                    resourceType
+                    uniqueId
+                }
+                catalog {
+                columns {
+                    description
+                    name
+                    type
+                }
+                rowCountStat
+                stats {
+                    description
+                    label
+                    value
+                }
+                }
+                children {
+                    description
+                    name
+                    resourceType
+                    uniqueId
+                }
+                database
+                dbtVersion
+                deprecationDate
+                description
+                executionInfo {
+                    compileCompletedAt
+                    compileStartedAt
+                    executeCompletedAt
+                    executeStartedAt
+                    executionTime
+                    lastJobDefinitionId
+                    lastRunError
+                    lastRunGeneratedAt
+                    lastRunId
+                    lastRunStatus
+                    lastSuccessJobDefinitionId
+                    lastSuccessRunId
+                    runElapsedTime
+                    runGeneratedAt
+                }
+                fqn
+                group
+                language
+                materializedType
+                meta
+                modelingLayer
+                name
+                packageName
+                resourceType
+                schema
+                tags
+                uniqueId
+                usageQueryCount
+            }
+            }
+        }
+        }
+    }
+    }
+    """
+
+RECENT_RESOURCE_CHANGES_QUERY = """
+    query Environment($environmentId: BigInt!, $after: String, $first: Int, $numDays: Int!) {
+    environment(id: $environmentId) {
+        applied {
+        recentResourceChanges(after: $after, first: $first, numDays: $numDays) {
+            totalCount
+            pageInfo {
+            endCursor
+            hasNextPage
+            hasPreviousPage
+            startCursor
+            }
+            edges {
+            cursor
+            node {
+                changes
+                accountId
+                environmentId
+                gitSha
+                jobDefinitionId
+                mostRecentChangedAt
+                projectId
+                resource {
+                ... on ExposureAppliedStateNestedNode {
+                    name
+                    resourceType
+                    uniqueId
+                }
+                ... on ExternalModelNode {
+                    name
+                    resourceType
+                    uniqueId
+                }
+                ... on MacroDefinitionNestedNode {
+                    name
+                    resourceType
+                    uniqueId
+                }
+                ... on MetricDefinitionNestedNode {
+                    name
+                    resourceType
+                    uniqueId
+                }
+                ... on ModelAppliedStateNestedNode {
+                    name
+                    resourceType
+                    uniqueId
+                }
+                ... on SeedAppliedStateNestedNode {
+                    name
+                    resourceType
+                    uniqueId
+                }
+                ... on SemanticModelDefinitionNestedNode {
+                    name
+                    resourceType
+                    uniqueId
+                }
+                ... on SnapshotAppliedStateNestedNode {
+                    name
+                    resourceType
+                    uniqueId
+                }
+                ... on SourceAppliedStateNestedNode {
+                    name
+                    resourceType
+                    uniqueId
+                }
+                ... on TestAppliedStateNestedNode {
+                    name
+                    resourceType
+                    uniqueId
+                }
+                }
+                runId
+                uniqueId
+            }
+            }
+        }
+        }
+    }
+    }
+    """
+
+MODEL_STATES_QUERY = """
+    query Environment($environmentId: BigInt!, $after: String, $filter: ModelAppliedFilter, $first: Int) {
+    environment(id: $environmentId) {
+        applied {
+        models(after: $after, filter: $filter, first: $first) {
+            pageInfo {
+            endCursor
+            hasNextPage
+            }
+            edges {
+            node {
+                uniqueId
+                executionInfo {
+                    executeCompletedAt
+                    executionTime
+                    lastRunStatus
+                }
+            }
+            }
+        }
+        }
+    }
+    }
+    """
+
+RESOURCE_COUNTS_QUERY = """
+    query Environment($environmentId: BigInt!) {
+    environment(id: $environmentId) {
+        applied {
+        resourceCounts
+        }
+    }
+    }
+    """
+
+PROJECT_TAGS_QUERY = """
+    query Environment($environmentId: BigInt!) {
+    environment(id: $environmentId) {
+        applied {
+        tags {
+            name
+        }
+        }
+    }
+    }
+    """
+
+SOURCES_QUERY = """
+query Environment($environmentId: BigInt!, $after: String, $filter: SourceAppliedFilter, $first: Int) {
+  environment(id: $environmentId) {
+    applied {
+      sources(after: $after, filter: $filter, first: $first) {
+        edges {
+          cursor
+          node {
+            accountId
+            database
+            children {
+              ... on ExposureAppliedStateNestedNode {
+                name
+                uniqueId
+                description
+                url
+              }
+              ... on MetricDefinitionNestedNode {
+                name
+                description
+                uniqueId
+                resourceType
+              }
+              ... on ModelAppliedStateNestedNode {
+                name
+                description
+                uniqueId
+              }
+            }
+            description
+            fqn
+            freshness {
+              freshnessChecked
+              freshnessJobDefinitionId
+              freshnessRunGeneratedAt
+              freshnessRunId
+              freshnessStatus
+              maxLoadedAt
+              maxLoadedAtTimeAgoInS
+              snapshottedAt
+            }
+            identifier
+            loader
+            meta
+            name
+            projectId
+            resourceType
+            schema
+            sourceDescription
+            sourceName
+            tags
+            uniqueId
+          }
+        }
+        pageInfo {
+          endCursor
+          hasNextPage
+          hasPreviousPage
+          startCursor
+        }
+        totalCount
+      }
+    }
+  }
+}
+    """
+
+GROUPS_QUERY = """
+query Definition($environmentId: BigInt!, $after: String, $filter: GroupFilter, $first: Int) {
+  environment(id: $environmentId) {
+    definition {
+      groups(after: $after, filter: $filter, first: $first) {
+        pageInfo {
+          endCursor
+          hasNextPage
+          hasPreviousPage
+          startCursor
+        }
+        totalCount
+        edges {
+          node {
+            accountId
+            description
+            environmentId
+            meta
+            modelCount
+            name
+            ownerEmail
+            ownerName
+            packageName
+            projectId
+            runGeneratedAt
+            resourceType
+            uniqueId
+            models {
+              materializedType
+              name
+              description
+              resourceType
+              runGeneratedAt
+              runId
+              schema
+              uniqueId
+              database
+            }
+          }
+        }
+      }
+    }
+  }
+}
+    """
+
+SEMANTIC_MODELS_QUERY = """
+query Definition($environmentId: BigInt!, $after: String, $filter: GenericMaterializedFilter, $first: Int) {
+  environment(id: $environmentId) {
+    definition {
+      semanticModels(after: $after, filter: $filter, first: $first) {
+        pageInfo {
+          endCursor
+          hasNextPage
+          hasPreviousPage
+          startCursor
+        }
+        totalCount
+        edges {
+          node {
+            ancestors {
+              ... on ExternalModelNode {
+                name
+                resourceType
+                description
+                database
+                schema
+                uniqueId
+              }
+              ... on ModelDefinitionNestedNode {
+                database
+                description
+                group
+                name
+                resourceType
+                schema
+                uniqueId
+              }
+              ... on SnapshotDefinitionNestedNode {
+                database
+                name
+                description
+                schema
+                uniqueId
+              }
+              ... on SourceDefinitionNestedNode {
+                description
+                database
+                name
+                resourceType
+                schema
+                sourceName
+                sourceDescription
+                uniqueId
+              }
+            }
+            children {
+              ... on MetricDefinitionNestedNode {
+                description
+                filter
+                formula
+                group
+                name
+                resourceType
+                type
+                typeParams
+                uniqueId
+              }
+            }
+            description
+            dimensions {
+              description
+              name
+              type
+            }
+            entities {
+              description
+              name
+              type
+            }
+            measures {
+              agg
+              createMetric
+              description
+              expr
+              name
+            }
+            name
+            resourceType
+            tags
+            uniqueId
+          }
+        }
+      }
+    }
+  }
+}
+    """
+
+METRICS_QUERY = """
+query Definition($environmentId: BigInt!, $after: String, $filter: GenericMaterializedFilter, $first: Int) {
+  environment(id: $environmentId) {
+    definition {
+      metrics(after: $after, filter: $filter, first: $first) {
+        pageInfo {
+          endCursor
+          hasNextPage
+          hasPreviousPage
+          startCursor
+        }
+        totalCount
+        edges {
+          node {
+            ancestors {
+              description
+              name
+              resourceType
+              uniqueId
+            }
+            children {
+              description
+              name
+              resourceType
+              uniqueId
+            }
+            description
+            filter
+            formula
+            group
+            name
+            meta
+            resourceType
+            type
+            uniqueId
+            tags
+          }
+        }
+      }
+    }
+  }
+}
+    """
+
+MOST_QUERIED_RESOURCES_QUERY = """
+    query MostQueriedResources($end: Date!, $start: Date!, $environmentId: BigInt!, $limit: Int, $resourceType: [MostQueriedResourceType!]!) {
+        performance(environmentId: $environmentId) {
+            mostQueriedResources(end: $end, start: $start, limit: $limit, resourceType: $resourceType) {
+            totalCount
+            uniqueId
+            }
+        }
+    }
+    """
+
+RESOURCE_QUERY_HISTORY_QUERY = """
+    query ResourceQueryHistory($environmentId: BigInt!, $end: Date!, $uniqueId: String!, $start: Date!) {
+        performance(environmentId: $environmentId) {
+            resourceQueryHistory(end: $end, uniqueId: $uniqueId, start: $start) {
+                date
+                totalCount
+            }
+        }
+    }
+    """
+
+RESOURCES_QUERY = """
+query Resources($filter: DefinitionResourcesFilter!, $environmentId: BigInt!, $after: String, $first: Int) {
+  environment(id: $environmentId) {
+    definition {
+      resources(filter: $filter, after: $after, first: $first) {
+        pageInfo {
+          endCursor
+          hasNextPage
+          hasPreviousPage
+          startCursor
+        }
+        totalCount
+        edges {
+          node {
+            description
+            name
+            resourceType
+            tags
+            uniqueId
+          }
+        }
+      }
+    }
+  }
+}
+    """
+
+
+MODEL_CATALOG_QUERY = """
+query Environment($environmentId: BigInt!, $after: String, $filter: ModelAppliedFilter, $first: Int) {
+  environment(id: $environmentId) {
+    applied {
+      models(after: $after, filter: $filter, first: $first) {
+        pageInfo {
+          endCursor
+          hasNextPage
+        }
+        edges {
+          node {
+            uniqueId
+            name
+            description
+            resourceType
+            packageName
+            tags
+            catalog {
+              columns {
+                name
+                description
+                type
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+SOURCE_CATALOG_QUERY = """
+query Environment($environmentId: BigInt!, $after: String, $filter: SourceAppliedFilter, $first: Int) {
+  environment(id: $environmentId) {
+    applied {
+      sources(after: $after, filter: $filter, first: $first) {
+        pageInfo {
+          endCursor
+          hasNextPage
+        }
+        edges {
+          node {
+            uniqueId
+            name
+            sourceName
+            description
+            resourceType
+            tags
+            catalog {
+              columns {
+                name
+                description
+                type
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+SOURCE_FRESHNESS_QUERY = """
+query Environment($environmentId: BigInt!, $after: String, $filter: SourceAppliedFilter, $first: Int) {
+  environment(id: $environmentId) {
+    applied {
+      sources(after: $after, filter: $filter, first: $first) {
+        pageInfo {
+          endCursor
+          hasNextPage
+        }
+        edges {
+          node {
+            uniqueId
+            name
+            sourceName
+            freshness {
+              freshnessChecked
+              freshnessStatus
+              maxLoadedAt
+              snapshottedAt
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+TEST_RESULTS_QUERY = """
+query Environment($environmentId: BigInt!, $after: String, $filter: TestAppliedFilter, $first: Int) {
+  environment(id: $environmentId) {
+    applied {
+      tests(after: $after, filter: $filter, first: $first) {
+        pageInfo {
+          endCursor
+          hasNextPage
+        }
+        edges {
+          node {
+            uniqueId
+            executionInfo {
+              executeCompletedAt
+              lastJobDefinitionId
+              lastRunId
+              lastRunStatus
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def _paginated(**variables) -> dict:
+    return {
+        "environmentId": ENVIRONMENT_ID,
+        "first": FIRST_N_RESULTS,
+        "after": None,
+        **variables,
+    }
+
+
+DISCOVERY_QUERIES = [
+    # Performance
+    QuerySpec(
+        name="get_longest_executed_models",
+        document=DBTC_QUERIES["longest_executed_models"],
+        variables={
+            "environmentId": ENVIRONMENT_ID,
+            "start": Arg("start_date"),
+            "end": Arg("end_date"),
+            "limit": Arg("limit", default=5),
+            "jobLimit": Arg("job_limit", default=5),
+            "jobId": Arg("job_id"),
+            "orderBy": Arg("order_by", default="MAX"),
+        },
+        result_path=("data", "performance", "longestExecutedModels"),
+        output_format="markdown",
+        date_range=("start_date", "end_date"),
+    ),
+    QuerySpec(
+        name="get_model_execution_history",
+        document=DBTC_QUERIES["model_execution_history"],
+        variables={
+            "environmentId": ENVIRONMENT_ID,
+            "startDate": Arg("start_date"),
+            "endDate": Arg("end_date"),
+            "uniqueId": Arg("unique_id", required=True),
+        },
+        result_path=("data", "performance", "modelExecutionHistory"),
+        date_range=("start_date", "end_date"),
+    ),
+    QuerySpec(
+        name="get_most_executed_models",
+        document=DBTC_QUERIES["most_executed_models"],
+        variables={
+            "environmentId": ENVIRONMENT_ID,
+            "start": Arg("start_date"),
+            "end": Arg("end_date"),
+            "limit": Arg("limit", default=5),
+            "jobLimit": Arg("job_limit", default=5),
+        },
+        result_path=("data", "performance", "mostExecutedModels"),
+        output_format="markdown",
+        date_range=("start_date", "end_date"),
+    ),
+    QuerySpec(
+        name="get_most_failed_models",
+        document=DBTC_QUERIES["most_execution_failed_models"],
+        variables={
+            "environmentId": ENVIRONMENT_ID,
+            "start": Arg("start_date"),
+            "end": Arg("end_date"),
+            "limit": Arg("limit", default=5),
+        },
+        result_path=("data", "performance", "mostFailedModels"),
+        output_format="markdown",
+        date_range=("start_date", "end_date"),
+    ),
+    QuerySpec(
+        name="get_most_queried_resources",
+        document=MOST_QUERIED_RESOURCES_QUERY,
+        variables={
+            "environmentId": ENVIRONMENT_ID,
+            "start": Arg("start"),
+            "end": Arg("end"),
+            "limit": Arg("limit", default=5),
+            "resourceType": Arg(
+                "resource_type", default="model", transform=lambda value: [value]
+            ),
+        },
+        result_path=("data", "performance", "mostQueriedResources"),
+        output_format="markdown",
+        date_range=("start", "end"),
+    ),
+    QuerySpec(
+        name="get_resource_query_history",
+        document=RESOURCE_QUERY_HISTORY_QUERY,
+        variables={
+            "environmentId": ENVIRONMENT_ID,
+            "uniqueId": Arg("unique_id", required=True),
+            "start": Arg("start"),
+            "end": Arg("end"),
+        },
+        result_path=("data", "performance", "resourceQueryHistory"),
+        output_format="markdown",
+        date_range=("start", "end"),
+    ),
+    # Environment
+    QuerySpec(
+        name="get_consumer_projects",
+        document=CONSUMER_PROJECTS_QUERY,
+        variables={"environmentId": ENVIRONMENT_ID},
+        result_path=("data", "environment", "consumerProjects"),
+        output_format="csv",
+    ),
+    QuerySpec(
+        name="get_resource_counts",
+        document=RESOURCE_COUNTS_QUERY,
+        variables={"environmentId": ENVIRONMENT_ID},
+        result_path=("data", "environment", "applied", "resourceCounts"),
+    ),
+    QuerySpec(
+        name="get_project_tags",
+        document=PROJECT_TAGS_QUERY,
+        variables={"environmentId": ENVIRONMENT_ID},
+        result_path=("data", "environment", "applied", "tags"),
+        output_format="markdown",
+    ),
+    QuerySpec(
+        name="get_recent_resource_changes",
+        document=RECENT_RESOURCE_CHANGES_QUERY,
+        variables=_paginated(numDays=Arg("number_of_days", default=7)),
+        result_path=(
+            "data",
+            "environment",
+            "applied",
+            "recentResourceChanges",
+            "edges",
+        ),
+        output_format="csv",
+    ),
+    # Resources
+    QuerySpec(
+        name="get_resources",
+        document=RESOURCES_QUERY,
+        variables=_paginated(
+            filter={
+                "types": Arg("resource_types", default=["Model"]),
+                "uniqueIds": Arg("unique_ids"),
+            }
+        ),
+        result_path=("data", "environment", "definition", "resources", "edges"),
+        output_format="csv",
+    ),
+    QuerySpec(
+        name="get_exposures",
+        document=EXPOSURES_QUERY,
+        variables=_paginated(
+            filter={
+                "exposureType": Arg("exposure_type"),
+                "tags": Arg("tags"),
+                "uniqueIds": Arg("unique_ids"),
+            }
+        ),
+        result_path=("data", "environment", "applied", "exposures", "edges"),
+        output_format="csv",
+    ),
+    QuerySpec(
+        name="get_models",
+        document=MODELS_QUERY,
+        variables=_paginated(
+            types=["Model", "Source", "Snapshot", "Seed"],
+            filter={
+                "access": Arg("access"),
+                "database": Arg("database"),
+                "group": Arg("group"),
+                "identifier": Arg("identifier"),
+                "lastRunStatus": Arg("last_run_status"),
+                "modelingLayer": Arg("modeling_layer"),
+                "packageName": Arg("package_name"),
+                "schema": Arg("database_schema"),
+                "tags": Arg("tags"),
+                "uniqueIds": Arg("unique_ids"),
+            },
+        ),
+        result_path=("data", "environment", "applied", "models", "edges"),
+        output_format="csv",
+        graph=True,
+    ),
+    QuerySpec(
+        name="get_model_states",
+        document=MODEL_STATES_QUERY,
+        variables=_paginated(filter={"uniqueIds": Arg("unique_ids")}),
+        result_path=("data", "environment", "applied", "models", "edges"),
+    ),
+    QuerySpec(
+        name="get_model_catalog",
+        document=MODEL_CATALOG_QUERY,
+        variables=_paginated(filter={"uniqueIds": Arg("unique_ids")}),
+        result_path=("data", "environment", "applied", "models", "edges"),
+    ),
+    QuerySpec(
+        name="get_source_catalog",
+        document=SOURCE_CATALOG_QUERY,
+        variables=_paginated(filter={"uniqueIds": Arg("unique_ids")}),
+        result_path=("data", "environment", "applied", "sources", "edges"),
+    ),
+    QuerySpec(
+        name="get_source_freshness",
+        document=SOURCE_FRESHNESS_QUERY,
+        variables=_paginated(
+            filter={
+                "freshnessChecked": Arg("freshness_checked"),
+                "sourceNames": Arg("source_names"),
+            }
+        ),
+        result_path=("data", "environment", "applied", "sources", "edges"),
+    ),
+    QuerySpec(
+        name="get_test_results",
+        document=TEST_RESULTS_QUERY,
+        variables=_paginated(filter={"uniqueIds": Arg("unique_ids")}),
+        result_path=("data", "environment", "applied", "tests", "edges"),
+    ),
+    QuerySpec(
+        name="get_sources",
+        document=SOURCES_QUERY,
+        variables=_paginated(
+            filter={
+                "database": Arg("database"),
+                "freshnessChecked": Arg("freshness_checked"),
+                "schema": Arg("database_schema"),
+                "sourceNames": Arg("source_names"),
+                "tags": Arg("tags"),
+                "uniqueIds": Arg("unique_ids"),
+            }
+        ),
+        result_path=("data", "environment", "applied", "sources", "edges"),
+        output_format="csv",
+    ),
+    QuerySpec(
+        name="get_groups",
+        document=GROUPS_QUERY,
+        variables=_paginated(filter={"uniqueIds": Arg("unique_ids")}),
+        result_path=("data", "environment", "definition", "groups", "edges"),
+        output_format="csv",
+    ),
+    QuerySpec(
+        name="get_semantic_models",
+        document=SEMANTIC_MODELS_QUERY,
+        variables=_paginated(
+            filter={
+                "database": Arg("database"),
+                "schema": Arg("database_schema"),
+                "tags": Arg("tags"),
+                "uniqueIds": Arg("unique_ids"),
+                "identifier": Arg("identifier"),
+            }
+        ),
+        result_path=("data", "environment", "definition", "semanticModels", "edges"),
+        output_format="csv",
+        graph=True,
+    ),
+    QuerySpec(
+        name="get_metrics",
+        document=METRICS_QUERY,
+        variables=_paginated(
+            filter={
+                "database": Arg("database"),
+                "schema": Arg("database_schema"),
+                "tags": Arg("tags"),
+                "uniqueIds": Arg("unique_ids"),
+                "identifier": Arg("identifier"),
+            }
+        ),
+        result_path=("data", "environment", "definition", "metrics", "edges"),
+        output_format="csv",
+        graph=True,
+    ),
+]
+
+query_stats = QueryStats()
+query_engine = QueryEngine(DISCOVERY_QUERIES, hooks=[query_stats])
+if VALIDATE_QUERIES:
+    query_engine.add_hook(ValidationHook())
+if QUERY_CACHE_TTL > 0:
+    query_engine.add_hook(CacheHook(QUERY_CACHE_TTL))
+
+
+def resource_query_histories_query(batch_size: int) -> str:
+    """Name of a query looking up the query history of `batch_size` resources at
+    once, with one aliased `resourceQueryHistory` field each - registered with the
+    engine the first time it's needed.  It's called with `unique_ids`, and returns
+    the histories keyed `r0`, `r1`, ... in the same order.
+    """
+    name = f"get_resource_query_histories_{batch_size}"
+    if name in query_engine:
+        return name
+
+    arguments = "".join(f", $u{i}: String!" for i in range(batch_size))
+    fields = "".join(f"""
+            r{i}: resourceQueryHistory(end: $end, uniqueId: $u{i}, start: $start) {{
+                date
+                totalCount
+            }}""" for i in range(batch_size))
+    query_engine.register(
+        QuerySpec(
+            name=name,
+            document=f"""
+    query ResourceQueryHistories($environmentId: BigInt!, $end: Date!, $start: Date!{arguments}) {{
+        performance(environmentId: $environmentId) {{{fields}
+        }}
+    }}
+    """,
+            variables={
+                "environmentId": ENVIRONMENT_ID,
+                "start": Arg("start"),
+                "end": Arg("end"),
+                **{
+                    f"u{i}": Arg(
+                        "unique_ids",
+                        required=True,
+                        transform=lambda unique_ids, i=i: unique_ids[i],
+                    )
+                    for i in range(batch_size)
+                },
+            },
+            result_path=("data", "performance"),
+            date_range=("start", "end"),
+        )
+    )
+    return name
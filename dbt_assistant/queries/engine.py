@@ -0,0 +1,312 @@
+# stdlib
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# third party
+import orjson
+
+# first party
+from dbt_assistant.queries.spec import CompiledQuery, QuerySpec, compile_query
+from dbt_assistant.utils.rate_limit import dbt_cloud_rate_limiter
+from dbt_assistant.utils.render import OutputFormat, render_graph, render_output
+from dbt_assistant.utils.streaming import StreamedQuery
+
+MAX_CONCURRENT_REQUESTS = 4
+# Seconds query results are reused for - off unless asked for
+QUERY_CACHE_TTL = float(os.getenv("DBT_CLOUD_QUERY_CACHE_TTL", 0))
+
+
+def map_concurrently(func: Callable, items: List) -> List:
+    """Call `func` for every item on a bounded thread pool, respecting the shared
+    dbt Cloud rate limit, and return the results in the same order as `items`.
+    """
+
+    def call(item):
+        dbt_cloud_rate_limiter.acquire()
+        return func(item)
+
+    if len(items) <= 1:
+        return [call(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        return list(executor.map(call, items))
+
+
+@dataclass
+class QueryRequest:
+    """A single execution of a registered query, as seen by hooks."""
+
+    name: str
+    query: CompiledQuery
+    variables: Dict[str, Any]
+    output_format: Optional[OutputFormat]
+
+    @property
+    def key(self) -> Tuple[str, bytes, Optional[str]]:
+        return (
+            self.name,
+            orjson.dumps(self.variables, option=orjson.OPT_SORT_KEYS),
+            self.output_format,
+        )
+
+
+class QueryHook:
+    """Runs around every query the engine executes."""
+
+    def before(self, request: QueryRequest) -> Any:
+        """Return anything but None to answer the request without running it."""
+        return None
+
+    def after(
+        self,
+        request: QueryRequest,
+        result: Any,
+        elapsed: float,
+        error: Exception = None,
+        short_circuited: bool = False,
+    ) -> None:
+        """Called once the request has been answered - with `short_circuited` set
+        when a hook's `before` answered it without running it.
+        """
+        pass
+
+
+class CacheHook(QueryHook):
+    """Reuse the result of an identical request made in the last `ttl` seconds.
+
+    Args:
+        ttl (float): Seconds results are fresh for.
+        maxsize (int, optional): Most results kept, least recently used dropped
+            first. Defaults to 256.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    def before(self, request: QueryRequest) -> Any:
+        with self._lock:
+            entry = self._entries.get(request.key)
+            if entry is None:
+                return None
+
+            stored_at, result = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[request.key]
+                return None
+
+            self._entries.move_to_end(request.key)
+            return result
+
+    def after(
+        self, request, result, elapsed, error=None, short_circuited=False
+    ) -> None:
+        # Short-circuited results are either this cache's own or a hook's error
+        if (
+            short_circuited
+            or error is not None
+            or result == request.query.spec.error_message
+        ):
+            return
+
+        with self._lock:
+            self._entries[request.key] = (time.monotonic(), result)
+            self._entries.move_to_end(request.key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class QueryStats(QueryHook):
+    """Running totals of calls, errors and time spent per query.  Calls answered
+    by a hook without being sent (e.g. from the cache, or rejected by validation)
+    are counted as short-circuited.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = defaultdict(
+            lambda: {"calls": 0, "errors": 0, "short_circuited": 0, "seconds": 0.0}
+        )
+
+    def after(
+        self, request, result, elapsed, error=None, short_circuited=False
+    ) -> None:
+        with self._lock:
+            totals = self._totals[request.name]
+            totals["calls"] += 1
+            totals["errors"] += error is not None
+            totals["short_circuited"] += short_circuited
+            totals["seconds"] += elapsed
+
+    def summary(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "name": name,
+                    "calls": totals["calls"],
+                    "errors": totals["errors"],
+                    "short_circuited": totals["short_circuited"],
+                    "total_s": round(totals["seconds"], 3),
+                    "mean_s": round(totals["seconds"] / totals["calls"], 3),
+                }
+                for name, totals in sorted(self._totals.items())
+                if totals["calls"]
+            ]
+
+
+def extract_result(response: Dict, query: CompiledQuery) -> Any:
+    """Pick the result out of a decoded response, or None if it isn't there."""
+    current = response
+    for key in query.spec.result_path:
+        if not isinstance(current, dict) or key not in current:
+            print(f"An error seems to have occurred.  See response:\n{response}")
+            return None
+        current = current[key]
+
+    return current
+
+
+class QueryEngine:
+    """Registry of compiled Discovery API queries and the one place they're executed.
+
+    Queries are looked up by name, their variables bound from keyword arguments,
+    sent over a pooled client - streamed page by page when the query paginates -
+    and rendered as their spec asks.  Hooks see every request before and after it
+    runs, which is where caching and instrumentation plug in.
+
+    Args:
+        specs (Iterable[QuerySpec], optional): Queries to register.
+        hooks (Iterable[QueryHook], optional): Hooks to add.
+    """
+
+    def __init__(
+        self, specs: Iterable[QuerySpec] = (), hooks: Iterable[QueryHook] = ()
+    ):
+        self._queries: Dict[str, CompiledQuery] = {}
+        self._hooks: List[QueryHook] = list(hooks)
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: QuerySpec) -> CompiledQuery:
+        query = compile_query(spec)
+        self._queries[spec.name] = query
+        return query
+
+    def add_hook(self, hook: QueryHook) -> QueryHook:
+        self._hooks.append(hook)
+        return hook
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._queries
+
+    def get(self, name: str) -> CompiledQuery:
+        try:
+            return self._queries[name]
+        except KeyError:
+            raise ValueError(f"Invalid query: {name}")
+
+    def execute(self, name: str, *, raw: bool = False, client=None, **kwargs) -> Any:
+        """Run a registered query.
+
+        Args:
+            name (str): Name of the query.
+            raw (bool, optional): Return the result undecorated - a list of edges
+                (or whatever sits at the result path) - instead of rendering it.
+                Defaults to False.
+            client (optional): A `dbtCloudClient` to use instead of a pooled one.
+            **kwargs: The query's arguments.
+        """
+        query = self.get(name)
+        request = QueryRequest(
+            name=name,
+            query=query,
+            variables=query.bind(kwargs),
+            output_format=None if raw else query.spec.output_format,
+        )
+        start = time.perf_counter()
+        for hook in self._hooks:
+            result = hook.before(request)
+            if result is not None:
+                # Every hook still sees the request, e.g. to count it
+                elapsed = time.perf_counter() - start
+                for after_hook in self._hooks:
+                    after_hook.after(request, result, elapsed, short_circuited=True)
+                return result
+
+        start = time.perf_counter()
+        try:
+            result = self._fetch(request, client)
+        except Exception as e:
+            for hook in self._hooks:
+                hook.after(request, None, time.perf_counter() - start, error=e)
+            raise
+
+        elapsed = time.perf_counter() - start
+        for hook in self._hooks:
+            hook.after(request, result, elapsed)
+        return result
+
+    def execute_many(
+        self, name: str, calls: List[Dict[str, Any]], *, raw: bool = False, **kwargs
+    ) -> List[Any]:
+        """Run a registered query once per set of arguments in `calls`, concurrently
+        and within the shared rate limit.  `kwargs` are passed to every call.
+
+        Returns:
+            List[Any]: The results, in the same order as `calls`.
+        """
+        return map_concurrently(
+            lambda call: self.execute(name, raw=raw, **{**kwargs, **call}), calls
+        )
+
+    def _fetch(self, request: QueryRequest, client) -> Any:
+        if client is not None:
+            return self._send(request, client)
+
+        # Imported here as the tools package itself depends on this one
+        from dbt_assistant.tools.base_dbt_client import pooled_client
+
+        with pooled_client() as client:
+            return self._send(request, client)
+
+    def _send(self, request: QueryRequest, client) -> Any:
+        query = request.query
+        spec = query.spec
+        if spec.graph and request.output_format is not None:
+            render = render_graph
+        else:
+            render = render_output
+        if not query.paginates:
+            response = client.metadata.query(spec.document, request.variables)
+            result = extract_result(response, query)
+            if result is None:
+                return spec.error_message
+
+            return render(result, request.output_format, name=query.result_name)
+
+        # Stream the list out of each page as it arrives, straight into the
+        # renderer, instead of decoding every page into a dict first
+        streamed = StreamedQuery(
+            client,
+            spec.document,
+            request.variables,
+            query.path,
+            max_pages=spec.max_pages,
+        )
+        result = render(iter(streamed), request.output_format, name=query.result_name)
+        if not result and streamed.errors:
+            print(f"An error seems to have occurred.  See errors:\n{streamed.errors}")
+            return spec.error_message
+
+        return result
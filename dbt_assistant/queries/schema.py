@@ -0,0 +1,388 @@
+# stdlib
+import hashlib
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# third party
+import orjson
+
+CACHE_VERSION = 3
+SCHEMA_CACHE_DIR = os.getenv(
+    "DBT_CLOUD_SCHEMA_CACHE_DIR", os.path.join("~", ".cache", "dbt_assistant")
+)
+# Seconds between checks whether the cached schema is still current
+SCHEMA_CHECK_INTERVAL = float(os.getenv("DBT_CLOUD_SCHEMA_CHECK_INTERVAL", 24 * 3600))
+
+INTROSPECTION_QUERY = """
+query IntrospectionQuery {
+    __schema {
+    queryType { name }
+    mutationType { name }
+    subscriptionType { name }
+    types {
+        ...FullType
+    }
+    directives {
+        name
+        description
+        locations
+        args(includeDeprecated: false) {
+        ...InputValue
+        }
+    }
+    }
+}
+
+fragment FullType on __Type {
+    kind
+    name
+    description
+    fields(includeDeprecated: false) {
+    name
+    description
+    args(includeDeprecated: false) {
+        ...InputValue
+    }
+    type {
+        ...TypeRef
+    }
+    isDeprecated
+    deprecationReason
+    }
+    inputFields(includeDeprecated: false) {
+    ...InputValue
+    }
+    interfaces {
+    ...TypeRef
+    }
+    enumValues(includeDeprecated: false) {
+    name
+    description
+    isDeprecated
+    deprecationReason
+    }
+    possibleTypes {
+    ...TypeRef
+    }
+}
+
+fragment InputValue on __InputValue {
+    name
+    description
+    type { ...TypeRef }
+    defaultValue
+    isDeprecated
+    deprecationReason
+}
+
+fragment TypeRef on __Type {
+    kind
+    name
+    ofType {
+    kind
+    name
+    ofType {
+        kind
+        name
+        ofType {
+        kind
+        name
+        ofType {
+            kind
+            name
+            ofType {
+            kind
+            name
+            ofType {
+                kind
+                name
+                ofType {
+                kind
+                name
+                }
+            }
+            }
+        }
+        }
+    }
+    }
+}
+"""
+
+# Every type with the names and types of its fields, arguments and values - enough
+# to notice any change to the schema at a fraction of the cost of the full
+# introspection
+FINGERPRINT_QUERY = """
+query SchemaFingerprint {
+    __schema {
+    queryType { name }
+    types {
+        kind
+        name
+        fields(includeDeprecated: false) {
+        name
+        args { name type { ...TypeRef } }
+        type { ...TypeRef }
+        }
+        inputFields { name type { ...TypeRef } }
+        enumValues(includeDeprecated: false) { name }
+    }
+    }
+}
+
+fragment TypeRef on __Type {
+    kind
+    name
+    ofType { kind name ofType { kind name ofType { kind name } } }
+}
+"""
+
+
+def named_type(type_ref: Optional[Dict]) -> Optional[str]:
+    """Name of the type a (possibly NON_NULL / LIST wrapped) type reference is of."""
+    while type_ref is not None and type_ref.get("name") is None:
+        type_ref = type_ref.get("ofType")
+
+    return type_ref.get("name") if type_ref else None
+
+
+class SchemaIndex:
+    """Read-only view over a cached introspection schema.
+
+    Types are stored one per line in a file named after the schema's fingerprint,
+    which is memory-mapped; only the byte offsets of each type are read up front.
+    A type is decoded the first time it's looked up, and its fields and input
+    fields are indexed by name.  Every version of the schema has its own file, so
+    an index stays valid after the cache has moved on to a newer one.
+
+    Args:
+        directory (Path): Directory of the cache.
+        index (Dict): The cache's `index.json`.
+    """
+
+    def __init__(self, directory: Path, index: Dict[str, Any]):
+        self.directory = directory
+        self.fingerprint: str = index["fingerprint"]
+        self.query_type: str = index.get("query_type") or "Query"
+        self.directives: List[Dict] = index.get("directives") or []
+        self._offsets: Dict[str, List[int]] = index["types"]
+        self._lock = threading.Lock()
+        self._types: Dict[str, Dict] = {}
+        self._fields: Dict[str, Dict[str, Dict]] = {}
+        # Mapped straight away, so the file can be removed once a newer version
+        # of the schema replaces it
+        with open(directory / index["types_file"], "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def type_names(self) -> List[str]:
+        return list(self._offsets)
+
+    def get_type(self, name: str) -> Optional[Dict]:
+        """The introspected `__Type` called `name`, or None if there's no such type."""
+        if name not in self._offsets:
+            return None
+
+        with self._lock:
+            if name not in self._types:
+                offset, length = self._offsets[name]
+                self._types[name] = orjson.loads(self._mmap[offset : offset + length])
+            return self._types[name]
+
+    def fields(self, type_name: str) -> Dict[str, Dict]:
+        """Fields (or input fields) of a type keyed by name."""
+        if type_name not in self._fields:
+            type_ = self.get_type(type_name) or {}
+            fields = (type_.get("fields") or []) + (type_.get("inputFields") or [])
+            self._fields[type_name] = {field["name"]: field for field in fields}
+        return self._fields[type_name]
+
+    def get_field(self, type_name: str, field_name: str) -> Optional[Dict]:
+        return self.fields(type_name).get(field_name)
+
+    def iter_types(self) -> Iterator[Dict]:
+        for name in self._offsets:
+            yield self.get_type(name)
+
+    def close(self) -> None:
+        """Unmap the types file.  Only for indexes no other thread can still hold -
+        the cache itself leaves replaced indexes to the garbage collector.
+        """
+        self._mmap.close()
+
+
+class SchemaCache:
+    """Discovery API introspection schema persisted to disk, per dbt Cloud host.
+
+    The full introspection query is only sent when there's no cache yet or the
+    schema's fingerprint - a hash of a much smaller query listing every type, field,
+    argument and enum value - has changed.  The fingerprint itself is only checked
+    every `check_interval` seconds.
+
+    Args:
+        host (str): dbt Cloud host the schema belongs to.
+        directory (str, optional): Root directory of the cache. Defaults to
+            `DBT_CLOUD_SCHEMA_CACHE_DIR` or ~/.cache/dbt_assistant.
+        check_interval (float, optional): Seconds before the fingerprint is checked
+            again. Defaults to `DBT_CLOUD_SCHEMA_CHECK_INTERVAL` or a day.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        directory: str = None,
+        check_interval: float = SCHEMA_CHECK_INTERVAL,
+    ):
+        root = Path(directory or SCHEMA_CACHE_DIR).expanduser()
+        self.directory = root / "schema" / host
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._schema: Optional[SchemaIndex] = None
+
+    def _read_index(self) -> Optional[Dict[str, Any]]:
+        try:
+            index = orjson.loads((self.directory / "index.json").read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+        if index.get("version") != CACHE_VERSION:
+            return None
+
+        # Another process may have moved on to a newer version in the meantime
+        if not (self.directory / index["types_file"]).is_file():
+            return None
+
+        return index
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        path = self.directory / "index.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(orjson.dumps(index))
+        os.replace(tmp, path)
+
+    def _fingerprint(self, client) -> str:
+        response = client.metadata.query(FINGERPRINT_QUERY, {})
+        schema = response["data"]["__schema"]
+        types = sorted(schema["types"], key=lambda type_: type_["name"])
+        document = orjson.dumps(
+            {"queryType": schema["queryType"], "types": types},
+            option=orjson.OPT_SORT_KEYS,
+        )
+        return hashlib.sha256(document).hexdigest()
+
+    def _fetch(self, client, fingerprint: str) -> Dict[str, Any]:
+        variables = {"operationName": "IntrospectionQuery"}
+        response = client.metadata.query(INTROSPECTION_QUERY, variables)
+        schema = response["data"]["__schema"]
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        offsets = {}
+        types_file = f"types-{fingerprint}.jsonl"
+        tmp = self.directory / f"{types_file}.tmp"
+        with open(tmp, "wb") as f:
+            for type_ in schema["types"]:
+                line = orjson.dumps(type_)
+                offsets[type_["name"]] = [f.tell(), len(line)]
+                f.write(line + b"\n")
+        os.replace(tmp, self.directory / types_file)
+
+        now = time.time()
+        index = {
+            "version": CACHE_VERSION,
+            "fingerprint": fingerprint,
+            "fetched_at": now,
+            "checked_at": now,
+            "query_type": (schema.get("queryType") or {}).get("name"),
+            "directives": schema.get("directives") or [],
+            "types_file": types_file,
+            "types": offsets,
+        }
+        self._write_index(index)
+        self._remove_stale(types_file)
+        return index
+
+    def _remove_stale(self, types_file: str) -> None:
+        # Indexes of older versions have their files mapped already, so removing
+        # them doesn't pull the data out from under threads still using them
+        for path in self.directory.glob("types*.jsonl"):
+            if path.name != types_file:
+                try:
+                    path.unlink()
+                except OSError:
+                    # e.g. still mapped on Windows - it goes with the next refresh
+                    pass
+
+    def load(self, client, *, force: bool = False) -> SchemaIndex:
+        """The cached schema, refreshed first if it's missing or has changed.
+
+        Args:
+            client: A `dbtCloudClient`.
+            force (bool, optional): Send the full introspection query regardless.
+                Defaults to False.
+        """
+        with self._lock:
+            index = self._read_index()
+            if (
+                index is not None
+                and not force
+                and time.time() - index["checked_at"] < self.check_interval
+            ):
+                return self._open(index)
+
+            try:
+                fingerprint = self._fingerprint(client)
+            except Exception as e:
+                if index is None:
+                    raise
+                # Better a stale schema than none at all
+                print(f"Couldn't check the Discovery API schema, using cache: {e}")
+                return self._open(index)
+
+            if index is not None and not force and index["fingerprint"] == fingerprint:
+                index["checked_at"] = time.time()
+                self._write_index(index)
+                return self._open(index)
+
+            return self._open(self._fetch(client, fingerprint))
+
+    def _open(self, index: Dict[str, Any]) -> SchemaIndex:
+        if self._schema is None or self._schema.fingerprint != index["fingerprint"]:
+            # The index being replaced may still be in use by other threads, so
+            # it's left for the garbage collector to unmap
+            self._schema = SchemaIndex(self.directory, index)
+        return self._schema
+
+
+_caches: Dict[str, SchemaCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_schema(client=None, *, host: str = None, force: bool = False) -> SchemaIndex:
+    """The Discovery API schema for a host, from the on-disk cache when it's current.
+
+    Args:
+        client (optional): A `dbtCloudClient`. Defaults to a pooled one.
+        host (str, optional): dbt Cloud host. Defaults to `DBT_CLOUD_HOST`.
+        force (bool, optional): Refetch the schema regardless. Defaults to False.
+    """
+    host = host or os.getenv("DBT_CLOUD_HOST", "cloud.getdbt.com")
+    with _caches_lock:
+        cache = _caches.setdefault(host, SchemaCache(host))
+
+    if client is not None:
+        return cache.load(client, force=force)
+
+    # Imported here as the tools package itself depends on this one
+    from dbt_assistant.tools.base_dbt_client import pooled_client
+
+    with pooled_client() as client:
+        return cache.load(client, force=force)
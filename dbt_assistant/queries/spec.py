@@ -0,0 +1,220 @@
+# stdlib
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# first party
+from dbt_assistant.utils.render import OutputFormat
+
+FIRST_N_RESULTS = 500
+DEFAULT_DAYS_AGO = 14
+MAXIMUM_DAYS_AGO = 90
+
+_DECLARED_VARIABLE = re.compile(r"\$(\w+)\s*:")
+
+
+def create_date_range(start_date: str = None, end_date: str = None) -> Tuple[str, str]:
+    today = datetime.now().date()
+    default_start_date = today - timedelta(days=DEFAULT_DAYS_AGO)
+    minimum_start_date = today - timedelta(days=MAXIMUM_DAYS_AGO)
+
+    # Process start_date
+    if start_date:
+        try:
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+            start_date = max(start_date, minimum_start_date)
+        except ValueError:
+            # If there's an error parsing the date, default to two weeks ago
+            start_date = default_start_date
+    else:
+        start_date = default_start_date
+
+    # Process end_date
+    if end_date:
+        try:
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+            end_date = min(end_date, today)
+        except ValueError:
+            # If there's an error parsing the date, default to today
+            end_date = today
+    else:
+        end_date = today
+
+    # Ensure end_date is not before start_date
+    if end_date < start_date:
+        end_date = start_date
+
+    return start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+
+def default_environment_id(environment_id: Optional[int]) -> int:
+    return int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
+
+
+@dataclass(frozen=True)
+class Arg:
+    """Placeholder in a spec's variables for a keyword argument of the query.
+
+    Args:
+        name (str): Name of the keyword argument.
+        default (Any, optional): Value when the argument isn't given.
+            Defaults to None.
+        required (bool, optional): Raise when the argument isn't given.
+            Defaults to False.
+        transform (Callable, optional): Applied to the value (or default) before
+            it's sent. Defaults to None.
+    """
+
+    name: str
+    default: Any = None
+    required: bool = False
+    transform: Optional[Callable[[Any], Any]] = None
+
+
+ENVIRONMENT_ID = Arg("environment_id", transform=default_environment_id)
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    """Declarative description of a Discovery API query.
+
+    Args:
+        name (str): Name the query is executed by.
+        document (str): The GraphQL query.
+        variables (Dict[str, Any]): The query's variables, with `Arg` placeholders
+            (at any depth) for the keyword arguments it's called with.
+        result_path (Tuple[str, ...]): Path to the result in the response, e.g.
+            ("data", "environment", "applied", "models", "edges").
+        output_format ("csv", "markdown", "raw", optional): How the result is
+            rendered for the LLM. Defaults to None (untouched).
+        graph (bool, optional): Normalize nodes that embed their ancestors and
+            children into a node table and an edge list. Defaults to False.
+        date_range (Tuple[str, str], optional): Names of a start and end date
+            argument, clamped and defaulted by `create_date_range`.
+            Defaults to None.
+        max_pages (int, optional): Stop paginating after this many pages.
+            Defaults to None.
+        error_message (str, optional): Returned when the result can't be found.
+            Defaults to "Nothing found.".
+    """
+
+    name: str
+    document: str
+    variables: Dict[str, Any]
+    result_path: Tuple[str, ...]
+    output_format: Optional[OutputFormat] = None
+    graph: bool = False
+    date_range: Optional[Tuple[str, str]] = None
+    max_pages: Optional[int] = None
+    error_message: str = "Nothing found."
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    """A `QuerySpec` checked and prepared once, at registration, so executing it only
+    has to fill in the bound arguments.
+    """
+
+    spec: QuerySpec
+    arguments: Dict[str, Arg]
+    bindings: Tuple[Tuple[Tuple[str, ...], Arg], ...]
+    paginates: bool
+    path: str
+    result_name: str
+    _template: Dict[str, Any] = field(repr=False)
+
+    def bind(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the variables for a call with `kwargs`."""
+        unexpected = set(kwargs) - set(self.arguments)
+        if unexpected:
+            raise TypeError(
+                f"{self.spec.name}() got unexpected arguments: {sorted(unexpected)}"
+            )
+
+        kwargs = dict(kwargs)
+        if self.spec.date_range:
+            start, end = self.spec.date_range
+            kwargs[start], kwargs[end] = create_date_range(
+                kwargs.get(start), kwargs.get(end)
+            )
+
+        variables = _copy(self._template)
+        for path, arg in self.bindings:
+            if kwargs.get(arg.name) is not None:
+                value = kwargs[arg.name]
+            elif arg.required:
+                raise TypeError(
+                    f"{self.spec.name}() missing required argument: {arg.name!r}"
+                )
+            else:
+                value = arg.default
+
+            if arg.transform is not None:
+                value = arg.transform(value)
+
+            container = variables
+            for key in path[:-1]:
+                container = container[key]
+            container[path[-1]] = value
+
+        return variables
+
+
+def _copy(template: Any) -> Any:
+    # Only the dicts are copied - they're the only thing bindings write into
+    if isinstance(template, dict):
+        return {key: _copy(value) for key, value in template.items()}
+
+    return template
+
+
+def _find_bindings(
+    template: Any, path: Tuple[str, ...] = ()
+) -> List[Tuple[Tuple[str, ...], Arg]]:
+    if isinstance(template, Arg):
+        return [(path, template)]
+
+    if isinstance(template, dict):
+        return [
+            binding
+            for key, value in template.items()
+            for binding in _find_bindings(value, path + (key,))
+        ]
+
+    return []
+
+
+def compile_query(spec: QuerySpec) -> CompiledQuery:
+    """Validate a spec against its document and work out everything that doesn't
+    change from call to call: where each argument goes, whether the query paginates
+    and where its result is.
+
+    Raises:
+        ValueError: If a variable isn't declared by the document.
+    """
+    declared = set(_DECLARED_VARIABLE.findall(spec.document))
+    undeclared = set(spec.variables) - declared
+    if undeclared:
+        raise ValueError(
+            f"Query {spec.name!r} sets variables its document doesn't declare: "
+            f"{sorted(undeclared)}"
+        )
+
+    bindings = tuple(_find_bindings(spec.variables))
+    arguments = {arg.name: arg for _, arg in bindings}
+    for name in spec.date_range or ():
+        arguments.setdefault(name, Arg(name))
+
+    result_path = tuple(spec.result_path)
+    return CompiledQuery(
+        spec=spec,
+        arguments=arguments,
+        bindings=bindings,
+        # Same rule `client.metadata.query` uses to decide whether to paginate
+        paginates="pageInfo" in spec.document and spec.document.count("$after") >= 2,
+        path=".".join(result_path),
+        result_name=result_path[-2] if result_path[-1] == "edges" else result_path[-1],
+        _template=_copy(spec.variables),
+    )
@@ -0,0 +1,246 @@
+# stdlib
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# third party
+from graphql import (
+    DocumentNode,
+    GraphQLError,
+    GraphQLScalarType,
+    GraphQLSchema,
+    OperationDefinitionNode,
+    build_client_schema,
+    is_input_type,
+    is_non_null_type,
+    parse,
+    print_ast,
+    validate,
+)
+from graphql.utilities import coerce_input_value, type_from_ast
+
+# first party
+from dbt_assistant.queries.engine import QueryHook, QueryRequest
+from dbt_assistant.queries.schema import SCHEMA_CHECK_INTERVAL, SchemaIndex, get_schema
+from dbt_assistant.queries.spec import CompiledQuery
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# Seconds to wait before trying to load the schema again after it failed
+SCHEMA_RETRY_INTERVAL = 300
+# Set to 0 to send queries without checking them against the schema first
+VALIDATE_QUERIES = os.getenv("DBT_CLOUD_VALIDATE_QUERIES", "1").lower() in ("1", "true")
+
+Path = Tuple[Any, ...]
+
+
+def _parse_date(value: Any) -> Any:
+    if not isinstance(value, str) or not _DATE.match(value):
+        raise GraphQLError(f"Expected a date in the format YYYY-MM-DD, got {value!r}.")
+    return value
+
+
+def _parse_big_int(value: Any) -> Any:
+    if isinstance(value, bool) or not (
+        isinstance(value, int) or (isinstance(value, str) and value.isdigit())
+    ):
+        raise GraphQLError(f"Expected an integer (BigInt), got {value!r}.")
+    return value
+
+
+# Introspection doesn't say how custom scalars are parsed, so without these any
+# value would be accepted for them
+CUSTOM_SCALARS = {"Date": _parse_date, "BigInt": _parse_big_int}
+
+
+def build_graphql_schema(index: SchemaIndex) -> GraphQLSchema:
+    """Build an executable schema from the cached introspection schema, decoding
+    every type in it.
+    """
+    schema = build_client_schema(
+        {
+            "__schema": {
+                "queryType": {"name": index.query_type},
+                "mutationType": None,
+                "subscriptionType": None,
+                "types": list(index.iter_types()),
+                "directives": index.directives,
+            }
+        }
+    )
+    for name, parse_value in CUSTOM_SCALARS.items():
+        scalar = schema.get_type(name)
+        if isinstance(scalar, GraphQLScalarType):
+            scalar.parse_value = parse_value
+    return schema
+
+
+def validate_document(schema: GraphQLSchema, document: DocumentNode) -> List[str]:
+    """Check a parsed document against the schema with every rule of the GraphQL
+    spec: fields, arguments, fragments, variables and their types.
+    """
+    return [error.message for error in validate(schema, document)]
+
+
+def validate_variables(
+    schema: GraphQLSchema, document: DocumentNode, variables: Dict[str, Any]
+) -> List[Tuple[Path, str]]:
+    """Check variables against the types their operation declares.
+
+    Returns:
+        List[Tuple[Path, str]]: Path within the variables and message of each error.
+    """
+    errors = []
+    for operation in document.definitions:
+        if not isinstance(operation, OperationDefinitionNode):
+            continue
+
+        for definition in operation.variable_definitions:
+            name = definition.variable.name.value
+            type_ = type_from_ast(schema, definition.type)
+            if type_ is None or not is_input_type(type_):
+                # Already reported by `validate_document`
+                continue
+
+            value = variables.get(name)
+            if value is None:
+                if is_non_null_type(type_) and definition.default_value is None:
+                    errors.append(
+                        ((name,), f"a value is required ({print_ast(definition.type)})")
+                    )
+                continue
+
+            coerce_input_value(
+                value,
+                type_,
+                lambda path, _, error, name=name: errors.append(
+                    ((name, *path), error.message)
+                ),
+            )
+    return errors
+
+
+def _argument_name(query: CompiledQuery, path: Path) -> str:
+    # Report errors against the argument the value came from, when there is one
+    for binding_path, arg in query.bindings:
+        if path[: len(binding_path)] == binding_path:
+            rest = path[len(binding_path) :]
+            return arg.name + "".join(
+                f"[{key}]" if isinstance(key, int) else f".{key}" for key in rest
+            )
+    return "$" + ".".join(str(key) for key in path)
+
+
+class ValidationHook(QueryHook):
+    """Check each request against the cached Discovery API schema before it's sent.
+
+    Invalid requests are answered with the list of errors straight away.  Documents
+    are parsed (with graphql-core) once per query and checked once per schema
+    version; only the variables are checked on every request.  Without a schema (e.g. the API can't be
+    reached to fetch one) requests are sent unchecked.
+
+    The schema is loaded once and kept; every `check_interval` seconds it's
+    refreshed in the background while requests go on being checked against the
+    one already loaded.
+
+    Args:
+        load_schema (Callable, optional): Returns the current `SchemaIndex`.
+            Defaults to `get_schema`.
+        check_interval (float, optional): Seconds before the schema is refreshed.
+            Defaults to `DBT_CLOUD_SCHEMA_CHECK_INTERVAL` or a day.
+    """
+
+    def __init__(
+        self,
+        load_schema=get_schema,
+        check_interval: float = SCHEMA_CHECK_INTERVAL,
+    ):
+        self._load_schema = load_schema
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._documents: Dict[str, Optional[DocumentNode]] = {}
+        self._document_errors: Dict[Tuple[str, str], List[str]] = {}
+        # Fingerprint of the loaded schema and the schema built from it
+        self._loaded: Optional[Tuple[str, GraphQLSchema]] = None
+        self._loaded_at = 0.0
+        self._retry_at = 0.0
+        self._refresh: Optional[threading.Thread] = None
+
+    def _load(self) -> None:
+        try:
+            index = self._load_schema()
+            if self._loaded is None or self._loaded[0] != index.fingerprint:
+                self._loaded = (index.fingerprint, build_graphql_schema(index))
+        except Exception as e:
+            print(f"Couldn't load the Discovery API schema, not validating: {e}")
+            self._retry_at = time.monotonic() + SCHEMA_RETRY_INTERVAL
+            return
+
+        self._loaded_at = time.monotonic()
+
+    def _schema(self) -> Optional[Tuple[str, GraphQLSchema]]:
+        now = time.monotonic()
+        if now < self._retry_at:
+            return self._loaded
+
+        if self._loaded is None:
+            # Only the first request waits for the schema
+            with self._load_lock:
+                if self._loaded is None and time.monotonic() >= self._retry_at:
+                    self._load()
+            return self._loaded
+
+        if now - self._loaded_at >= self.check_interval:
+            self._refresh_in_background()
+        return self._loaded
+
+    def _refresh_in_background(self) -> None:
+        with self._load_lock:
+            if self._refresh is not None and self._refresh.is_alive():
+                return
+
+            self._refresh = threading.Thread(
+                target=self._load, name="schema-refresh", daemon=True
+            )
+            self._refresh.start()
+
+    def _document(self, request: QueryRequest) -> Optional[DocumentNode]:
+        with self._lock:
+            if request.name not in self._documents:
+                try:
+                    document = parse(request.query.spec.document)
+                except GraphQLError as e:
+                    # Sent unchecked rather than not at all, so the API has the
+                    # final word
+                    print(f"Couldn't parse query {request.name}, not validating: {e}")
+                    document = None
+                self._documents[request.name] = document
+            return self._documents[request.name]
+
+    def before(self, request: QueryRequest) -> Any:
+        loaded = self._schema()
+        if loaded is None:
+            return None
+
+        document = self._document(request)
+        if document is None:
+            return None
+
+        fingerprint, schema = loaded
+        key = (request.name, fingerprint)
+        if key not in self._document_errors:
+            self._document_errors[key] = validate_document(schema, document)
+
+        errors = list(self._document_errors[key])
+        errors.extend(
+            f"{_argument_name(request.query, path)}: {message}"
+            for path, message in validate_variables(schema, document, request.variables)
+        )
+        if not errors:
+            return None
+
+        return "The query wasn't sent as it's invalid:\n" + "\n".join(
+            f"- {error}" for error in errors
+        )
@@ -0,0 +1,3 @@
+from .store import RunHistoryStore, get_run_history, record_run_webhook
+
+__all__ = ["RunHistoryStore", "get_run_history", "record_run_webhook"]
@@ -0,0 +1,208 @@
+# stdlib
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# third party
+import numpy as np
+import orjson
+
+# first party
+from dbt_assistant.analytics.run_history import CANCELLED, ERROR, SUCCESS, RunHistory
+from dbt_assistant.utils.pagination import iter_pages
+
+RUN_HISTORY_DIR = os.getenv(
+    "DBT_CLOUD_RUN_HISTORY_DIR",
+    os.path.join("~", ".cache", "dbt_assistant", "run_history"),
+)
+# Seconds before runs finished since the last sync are pulled in
+RUN_HISTORY_REFRESH_INTERVAL = float(
+    os.getenv("DBT_CLOUD_RUN_HISTORY_REFRESH_INTERVAL", 300)
+)
+# How far back the first sync of an account goes
+RUN_HISTORY_BACKFILL_DAYS = int(os.getenv("DBT_CLOUD_RUN_HISTORY_BACKFILL_DAYS", 90))
+
+
+class RunHistoryStore:
+    """History of the runs of every job in an account, kept on disk.
+
+    Runs are listed newest first and every sync stops at the watermark - the
+    highest run ID below which every run had already finished - so only runs
+    newer than the last sync are fetched.  Runs still going are fetched again on
+    the next sync.  Finished runs can also be recorded as their webhooks arrive,
+    with `record_webhook`.
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        directory (str, optional): Where histories are stored. Defaults to
+            `DBT_CLOUD_RUN_HISTORY_DIR` or ~/.cache/dbt_assistant/run_history.
+        refresh_interval (float, optional): Seconds between syncs.
+        backfill_days (int, optional): Days of runs the first sync pulls in.
+    """
+
+    def __init__(
+        self,
+        account_id: int,
+        *,
+        directory: str = None,
+        refresh_interval: float = RUN_HISTORY_REFRESH_INTERVAL,
+        backfill_days: int = RUN_HISTORY_BACKFILL_DAYS,
+    ):
+        host = os.getenv("DBT_CLOUD_HOST", "cloud.getdbt.com")
+        root = Path(directory or RUN_HISTORY_DIR).expanduser() / host
+        self.account_id = account_id
+        self.path = root / f"{account_id}.npz"
+        self.state_path = root / f"{account_id}.json"
+        self.refresh_interval = refresh_interval
+        self.backfill_days = backfill_days
+        self._history: Optional[RunHistory] = None
+        self._sync_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            return orjson.loads(self.state_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+
+    @property
+    def synced_at(self) -> Optional[float]:
+        return self._read_state().get("synced_at")
+
+    @property
+    def history(self) -> RunHistory:
+        if self._history is None:
+            try:
+                self._history = RunHistory.load(str(self.path))
+            except (OSError, KeyError, ValueError):
+                self._history = RunHistory.empty()
+        return self._history
+
+    def _save(self, history: RunHistory, state: Dict[str, Any] = None) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        history.save(str(self.path))
+        self._history = history
+        if state is not None:
+            tmp = self.state_path.with_suffix(".tmp")
+            tmp.write_bytes(orjson.dumps(state))
+            os.replace(tmp, self.state_path)
+
+    def sync(self) -> Optional[str]:
+        """Pull in the runs newer than the watermark.  Returns an error message if
+        the API call failed.
+        """
+        watermark = self._read_state().get("watermark")
+        cutoff = np.datetime64("now", "s") - np.timedelta64(self.backfill_days, "D")
+        runs: List[Dict[str, Any]] = []
+        pages = iter_pages(
+            "list_runs",
+            account_id=self.account_id,
+            order_by="-id",
+            # Every run down to the watermark, not just the first `MAX_RESULTS`
+            limit=sys.maxsize,
+        )
+        try:
+            for page in pages:
+                if not page["status"]["is_success"]:
+                    return page["status"].get("user_message") or "Couldn't list runs."
+
+                data = page.get("data") or []
+                if watermark is None:
+                    data = [run for run in data if _created_after(run, cutoff)]
+                else:
+                    data = [run for run in data if run["id"] > watermark]
+                runs.extend(data)
+                # Pages are newest first, so a page reaching back past the
+                # watermark (or the backfill) is the last one needed
+                if len(data) < len(page.get("data") or []):
+                    break
+        finally:
+            pages.close()
+
+        unfinished = [
+            run["id"]
+            for run in runs
+            if run.get("status") not in (SUCCESS, ERROR, CANCELLED)
+        ]
+        if unfinished:
+            # Runs still going are picked up again next time
+            watermark = min(unfinished) - 1
+        elif runs:
+            watermark = max(run["id"] for run in runs)
+
+        with self._lock:
+            history = self.history.extend(RunHistory.from_runs(runs))
+            self._save(history, {"watermark": watermark, "synced_at": time.time()})
+        return None
+
+    def ensure_current(self) -> Optional[str]:
+        with self._sync_lock:
+            synced_at = self.synced_at
+            if synced_at is None or time.time() - synced_at > self.refresh_interval:
+                return self.sync()
+
+            return None
+
+    def record_webhook(self, payload: Dict[str, Any]) -> bool:
+        """Record a run from a `job.run.completed` webhook, without waiting for the
+        next sync.  The watermark doesn't move, so the next sync still fetches the
+        run - along with its queue time, which webhooks don't include.
+
+        Returns:
+            bool: Whether the payload was a completed run of this account.
+        """
+        data = payload.get("data") or {}
+        if (
+            payload.get("eventType") != "job.run.completed"
+            or str(payload.get("accountId")) != str(self.account_id)
+            or not data.get("runId")
+        ):
+            return False
+
+        run = {
+            "id": int(data["runId"]),
+            "job_definition_id": int(data.get("jobId") or 0),
+            # Webhooks don't say when the run was queued
+            "created_at": data.get("runStartedAt"),
+            "started_at": data.get("runStartedAt"),
+            "finished_at": data.get("runFinishedAt"),
+            "status": int(data.get("runStatusCode") or 0),
+        }
+        with self._lock:
+            history = RunHistory.from_runs([run])
+            if not len(history):
+                return False
+            # Anything synced for the run already is more complete
+            self._save(history.extend(self.history))
+        return True
+
+
+def _created_after(run: Dict[str, Any], cutoff: np.datetime64) -> bool:
+    created_at = run.get("created_at")
+    return bool(created_at) and np.datetime64(created_at[:19], "s") >= cutoff
+
+
+_stores: Dict[int, RunHistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_run_history(account_id: int) -> RunHistoryStore:
+    with _stores_lock:
+        if account_id not in _stores:
+            _stores[account_id] = RunHistoryStore(account_id)
+        return _stores[account_id]
+
+
+def record_run_webhook(payload: Dict[str, Any]) -> bool:
+    """Record a run from a `job.run.completed` webhook payload in its account's
+    history.  For whatever receives dbt Cloud webhooks to call.
+    """
+    try:
+        account_id = int(payload["accountId"])
+    except (KeyError, TypeError, ValueError):
+        return False
+
+    return get_run_history(account_id).record_webhook(payload)
@@ -0,0 +1,9 @@
+from .index import SearchIndex, tokenize
+from .project import ProjectSearch, get_project_search
+
+__all__ = [
+    "ProjectSearch",
+    "SearchIndex",
+    "get_project_search",
+    "tokenize",
+]
@@ -0,0 +1,194 @@
+# stdlib
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_WORD = re.compile(r"[a-z0-9_]+")
+
+# How much a term found in each field counts towards a document's term frequency
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "column": 2.0,
+    "tag": 2.0,
+    "description": 1.0,
+    "column_description": 0.5,
+}
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase words, with snake_case identifiers kept whole as well as split, so
+    `customer_id` matches both "customer_id" and "customer".
+    """
+    tokens = []
+    for word in _WORD.findall((text or "").lower()):
+        parts = [part for part in word.split("_") if part]
+        if len(parts) > 1:
+            tokens.append(word.strip("_"))
+        tokens.extend(parts)
+    return tokens
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """In-memory inverted index ranking documents with BM25.
+
+    Each document is a set of weighted fields (see `FIELD_WEIGHTS`); a term's
+    frequency in a document is the sum of the weights of the fields it appears in.
+    Documents can be added, replaced and removed one at a time.  Query terms that
+    aren't in the vocabulary are matched to similar terms by trigram overlap, so
+    typos and partial names still find something.
+
+    Args:
+        k1 (float, optional): BM25 term frequency saturation. Defaults to 1.2.
+        b (float, optional): BM25 length normalization. Defaults to 0.75.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._lengths: Dict[str, float] = {}
+        self._terms: Dict[str, Counter] = {}
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._records
+
+    def add(
+        self,
+        doc_id: str,
+        fields: Iterable[Tuple[str, Optional[str]]],
+        record: Dict[str, Any] = None,
+    ) -> None:
+        """Index a document, replacing any previous version of it.
+
+        Args:
+            doc_id (str): Unique ID of the document.
+            fields (Iterable[Tuple[str, str]]): `(field, text)` pairs, where field
+                is a key of `FIELD_WEIGHTS`.
+            record (Dict[str, Any], optional): Returned with search results.
+        """
+        terms = Counter()
+        for name, text in fields:
+            weight = FIELD_WEIGHTS.get(name, 1.0)
+            for token in tokenize(text):
+                terms[token] += weight
+
+        with self._lock:
+            self.remove(doc_id)
+            for term, frequency in terms.items():
+                if term not in self._postings:
+                    for trigram in trigrams(term):
+                        self._trigrams[trigram].add(term)
+                self._postings[term][doc_id] = frequency
+
+            self._terms[doc_id] = terms
+            self._lengths[doc_id] = sum(terms.values())
+            self._total_length += self._lengths[doc_id]
+            self._records[doc_id] = record or {}
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            terms = self._terms.pop(doc_id, None)
+            if terms is None:
+                return
+
+            for term in terms:
+                postings = self._postings[term]
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+                    for trigram in trigrams(term):
+                        self._trigrams[trigram].discard(term)
+
+            self._total_length -= self._lengths.pop(doc_id)
+            del self._records[doc_id]
+
+    def record(self, doc_id: str) -> Dict[str, Any]:
+        return self._records[doc_id]
+
+    def _similar_terms(self, term: str, limit: int = 3) -> List[Tuple[str, float]]:
+        grams = trigrams(term)
+        overlap = Counter()
+        for trigram in grams:
+            for candidate in self._trigrams.get(trigram, ()):
+                overlap[candidate] += 1
+
+        similar = []
+        for candidate, shared in overlap.items():
+            similarity = shared / len(grams | trigrams(candidate))
+            if similarity >= 0.4:
+                similar.append((candidate, similarity))
+        return heapq.nlargest(limit, similar, key=lambda item: item[1])
+
+    def _expand(self, query: str) -> Dict[str, float]:
+        # Query terms and how much each counts, with unknown terms swapped for the
+        # closest ones in the vocabulary
+        expanded: Dict[str, float] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            if term in self._postings:
+                expanded[term] = max(expanded.get(term, 0.0), 1.0)
+                continue
+
+            for similar, similarity in self._similar_terms(term):
+                expanded[similar] = max(expanded.get(similar, 0.0), similarity)
+        return expanded
+
+    def search(
+        self, query: str, *, limit: int = 10, filter: Dict[str, Any] = None
+    ) -> List[Tuple[str, float, List[str]]]:
+        """Rank documents against a query.
+
+        Args:
+            query (str): Free text.
+            limit (int, optional): Most results returned. Defaults to 10.
+            filter (Dict[str, Any], optional): Only documents whose record has these
+                values. Defaults to None.
+
+        Returns:
+            List[Tuple[str, float, List[str]]]: Document ID, score and the terms
+                that matched, best first.
+        """
+        with self._lock:
+            n_docs = len(self._records)
+            if not n_docs:
+                return []
+
+            average_length = self._total_length / n_docs
+            scores: Dict[str, float] = defaultdict(float)
+            matched: Dict[str, List[str]] = defaultdict(list)
+            for term, boost in self._expand(query).items():
+                postings = self._postings[term]
+                idf = math.log(
+                    1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for doc_id, frequency in postings.items():
+                    if filter and any(
+                        self._records[doc_id].get(key) != value
+                        for key, value in filter.items()
+                    ):
+                        continue
+
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self._lengths[doc_id] / average_length
+                    )
+                    scores[doc_id] += (
+                        boost * idf * frequency * (self.k1 + 1) / (frequency + norm)
+                    )
+                    matched[doc_id].append(term)
+
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(doc_id, score, matched[doc_id]) for doc_id, score in best]
@@ -0,0 +1,234 @@
+# stdlib
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# first party
+from dbt_assistant.queries import map_concurrently, query_engine
+from dbt_assistant.search.index import SearchIndex, tokenize
+
+# Seconds before recent changes are pulled into the index
+SEARCH_REFRESH_INTERVAL = float(os.getenv("DBT_CLOUD_SEARCH_REFRESH_INTERVAL", 900))
+# Seconds before the index is rebuilt from scratch, to drop deleted resources
+SEARCH_REBUILD_INTERVAL = float(
+    os.getenv("DBT_CLOUD_SEARCH_REBUILD_INTERVAL", 24 * 3600)
+)
+
+# Registered query feeding the index for each resource type
+CATALOG_QUERIES = {"model": "get_model_catalog", "source": "get_source_catalog"}
+
+
+def _documents(edges: List[Dict]) -> Iterator[Tuple[str, list, Dict[str, Any]]]:
+    for edge in edges:
+        node = edge.get("node") or {}
+        unique_id = node.get("uniqueId")
+        if not unique_id:
+            continue
+
+        columns = (node.get("catalog") or {}).get("columns") or []
+        fields = [
+            ("name", node.get("name")),
+            ("name", node.get("sourceName")),
+            ("description", node.get("description")),
+        ]
+        fields += [("tag", tag) for tag in node.get("tags") or []]
+        for column in columns:
+            fields.append(("column", column.get("name")))
+            fields.append(("column_description", column.get("description")))
+
+        record = {
+            "unique_id": unique_id,
+            "resource_type": (node.get("resourceType") or "").lower(),
+            "name": node.get("name"),
+            "columns": [column.get("name") or "" for column in columns],
+        }
+        yield unique_id, fields, record
+
+
+class ProjectSearch:
+    """Search index over the models and sources of one environment, fed from the
+    Discovery API catalog.
+
+    The index is built on first use.  After that, only resources changed since the
+    last refresh (per `recentResourceChanges`) are fetched again, at most every
+    `refresh_interval` seconds; every `rebuild_interval` seconds it's rebuilt from
+    scratch in the background, while searches go on against the current index.
+
+    Args:
+        environment_id (int): Environment ID.
+        refresh_interval (float, optional): Seconds between incremental refreshes.
+        rebuild_interval (float, optional): Seconds between full rebuilds.
+    """
+
+    def __init__(
+        self,
+        environment_id: int,
+        *,
+        refresh_interval: float = SEARCH_REFRESH_INTERVAL,
+        rebuild_interval: float = SEARCH_REBUILD_INTERVAL,
+    ):
+        self.environment_id = environment_id
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.index = SearchIndex()
+        self.built_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._rebuild: Optional[threading.Thread] = None
+        self._retry_rebuild_at = 0.0
+
+    def _fetch(
+        self, index: SearchIndex, unique_ids: Dict[str, List[str]] = None
+    ) -> Optional[str]:
+        """(Re)index every resource, or only `unique_ids` keyed by resource type.
+        Returns an error message if a query failed.
+        """
+        resource_types = list(unique_ids if unique_ids is not None else CATALOG_QUERIES)
+        results = map_concurrently(
+            lambda resource_type: query_engine.execute(
+                CATALOG_QUERIES[resource_type],
+                raw=True,
+                environment_id=self.environment_id,
+                unique_ids=unique_ids[resource_type] if unique_ids else None,
+            ),
+            resource_types,
+        )
+        for resource_type, edges in zip(resource_types, results):
+            if isinstance(edges, str):
+                return edges
+
+            found = set()
+            for unique_id, fields, record in _documents(edges):
+                index.add(unique_id, fields, record)
+                found.add(unique_id)
+
+            # Changed resources that no longer come back have been deleted
+            for unique_id in (unique_ids or {}).get(resource_type, []):
+                if unique_id not in found:
+                    index.remove(unique_id)
+
+        return None
+
+    def rebuild(self) -> Optional[str]:
+        started_at = time.time()
+        # Searches keep using the old index until the new one is complete
+        index = SearchIndex()
+        error = self._fetch(index)
+        if error is None:
+            self.index = index
+            self.built_at = self.refreshed_at = started_at
+        return error
+
+    def refresh(self) -> Optional[str]:
+        """Reindex the models and sources changed since the last refresh."""
+        since = self.refreshed_at or 0
+        number_of_days = max(1, math.ceil((time.time() - since) / 86400))
+        started_at = time.time()
+        changes = query_engine.execute(
+            "get_recent_resource_changes",
+            raw=True,
+            environment_id=self.environment_id,
+            number_of_days=number_of_days,
+        )
+        if isinstance(changes, str):
+            return changes
+
+        unique_ids: Dict[str, List[str]] = {}
+        for edge in changes:
+            node = edge.get("node") or {}
+            resource_type = (
+                (node.get("resource") or {}).get("resourceType") or ""
+            ).lower()
+            if resource_type in CATALOG_QUERIES and node.get("uniqueId"):
+                unique_ids.setdefault(resource_type, []).append(node["uniqueId"])
+
+        error = self._fetch(self.index, unique_ids) if unique_ids else None
+        if error is None:
+            self.refreshed_at = started_at
+        return error
+
+    def _rebuild_in_background(self) -> None:
+        if self._rebuild is not None and self._rebuild.is_alive():
+            return
+
+        def rebuild():
+            error = self.rebuild()
+            if error is not None:
+                print(
+                    f"Couldn't rebuild the search index, keeping the old one: {error}"
+                )
+                # Not again on every search while the API is failing
+                self._retry_rebuild_at = time.time() + self.refresh_interval
+
+        self._rebuild = threading.Thread(
+            target=rebuild, name="search-rebuild", daemon=True
+        )
+        self._rebuild.start()
+
+    def ensure_current(self) -> Optional[str]:
+        with self._lock:
+            now = time.time()
+            if self.built_at is None:
+                # Nothing to search yet, so the first build is waited for
+                return self.rebuild()
+
+            if (
+                now - self.built_at > self.rebuild_interval
+                and now >= self._retry_rebuild_at
+            ):
+                self._rebuild_in_background()
+            if self._rebuild is not None and self._rebuild.is_alive():
+                # The rebuild picks up every change anyway
+                return None
+
+            if now - self.refreshed_at > self.refresh_interval:
+                return self.refresh()
+
+            return None
+
+    def search(
+        self, query: str, *, limit: int = 10, resource_type: str = None
+    ) -> List[Dict[str, Any]]:
+        """Rank models and sources against a query.
+
+        Returns:
+            List[Dict[str, Any]]: Unique ID, resource type, name, score and the
+                columns that matched, best first.
+        """
+        filter = {"resource_type": resource_type.lower()} if resource_type else None
+        rows = []
+        for unique_id, score, terms in self.index.search(
+            query, limit=limit, filter=filter
+        ):
+            record = self.index.record(unique_id)
+            terms = set(terms)
+            # Columns named after the query, not ones merely sharing a word with it
+            columns = [
+                column
+                for column in record["columns"]
+                if column.lower() in terms or terms.issuperset(tokenize(column) or [""])
+            ]
+            rows.append(
+                {
+                    "unique_id": unique_id,
+                    "resource_type": record["resource_type"],
+                    "name": record["name"],
+                    "score": score,
+                    "matched_columns": ", ".join(columns),
+                    "matched_terms": ", ".join(sorted(terms)),
+                }
+            )
+        return rows
+
+
+_searches: Dict[int, ProjectSearch] = {}
+_searches_lock = threading.Lock()
+
+
+def get_project_search(environment_id: int) -> ProjectSearch:
+    with _searches_lock:
+        if environment_id not in _searches:
+            _searches[environment_id] = ProjectSearch(environment_id)
+        return _searches[environment_id]
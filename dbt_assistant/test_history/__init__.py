@@ -0,0 +1,3 @@
+from .store import TestHistoryStore, get_test_history
+
+__all__ = ["TestHistoryStore", "get_test_history"]
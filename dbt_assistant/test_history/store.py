@@ -0,0 +1,105 @@
+# stdlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# first party
+from dbt_assistant.analytics.flakiness import TestHistory
+from dbt_assistant.queries import query_engine
+
+TEST_HISTORY_DIR = os.getenv(
+    "DBT_CLOUD_TEST_HISTORY_DIR",
+    os.path.join("~", ".cache", "dbt_assistant", "test_history"),
+)
+# Seconds before the latest test results are collected again
+TEST_HISTORY_REFRESH_INTERVAL = float(
+    os.getenv("DBT_CLOUD_TEST_HISTORY_REFRESH_INTERVAL", 900)
+)
+
+
+class TestHistoryStore:
+    """History of the test results of one environment, kept on disk.
+
+    The Discovery API only knows the latest result of every test, so each
+    collection pages through every test once and appends the results of runs not
+    seen before to the stored history - which grows into a record of every run
+    collected over time.  Questions asked within `refresh_interval` seconds of the
+    last collection are answered from the store alone.
+
+    Args:
+        environment_id (int): Environment ID.
+        directory (str, optional): Where histories are stored. Defaults to
+            `DBT_CLOUD_TEST_HISTORY_DIR` or ~/.cache/dbt_assistant/test_history.
+        refresh_interval (float, optional): Seconds between collections.
+    """
+
+    def __init__(
+        self,
+        environment_id: int,
+        *,
+        directory: str = None,
+        refresh_interval: float = TEST_HISTORY_REFRESH_INTERVAL,
+    ):
+        host = os.getenv("DBT_CLOUD_HOST", "cloud.getdbt.com")
+        root = Path(directory or TEST_HISTORY_DIR).expanduser() / host
+        self.environment_id = environment_id
+        self.path = root / f"{environment_id}.npz"
+        self.refresh_interval = refresh_interval
+        self._history: Optional[TestHistory] = None
+        self._lock = threading.Lock()
+
+    @property
+    def collected_at(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    @property
+    def history(self) -> TestHistory:
+        if self._history is None:
+            try:
+                self._history = TestHistory.load(str(self.path))
+            except (OSError, KeyError, ValueError):
+                self._history = TestHistory.empty()
+        return self._history
+
+    def collect(self) -> Optional[str]:
+        """Append the latest result of every test to the history.  Returns an error
+        message if the query failed.
+        """
+        edges = query_engine.execute(
+            "get_test_results", raw=True, environment_id=self.environment_id
+        )
+        if isinstance(edges, str):
+            return edges
+
+        history = self.history.extend(TestHistory.from_edges(edges))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        history.save(str(self.path))
+        self._history = history
+        return None
+
+    def ensure_current(self) -> Optional[str]:
+        with self._lock:
+            collected_at = self.collected_at
+            if (
+                collected_at is None
+                or time.time() - collected_at > self.refresh_interval
+            ):
+                return self.collect()
+
+            return None
+
+
+_stores: Dict[int, TestHistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_test_history(environment_id: int) -> TestHistoryStore:
+    with _stores_lock:
+        if environment_id not in _stores:
+            _stores[environment_id] = TestHistoryStore(environment_id)
+        return _stores[environment_id]
@@ -1,12 +1,29 @@
 # first party
-from typing import List, Literal, Optional, Union
+import itertools
+from typing import Dict, List, Literal, Optional, Union
 
 # third party
+import numpy as np
 from langchain_core.pydantic_v1 import BaseModel, Field
+from langchain_core.runnables import ensure_config
 from langchain_core.tools import tool
 
 # first party
+from dbt_assistant.analytics import (
+    RunSimulator,
+    RunTiming,
+    summarize_run_history,
+    summarize_run_timing,
+    to_markdown_table,
+)
+from dbt_assistant.artifacts import get_artifact, get_manifest_index
+from dbt_assistant.audit_logs import get_audit_logs
+from dbt_assistant.run_history import get_run_history
 from dbt_assistant.tools.base_dbt_client import get_client
+from dbt_assistant.utils.bulk import BulkAction, run_bulk
+from dbt_assistant.utils.pagination import paginate
+from dbt_assistant.utils.render import OutputFormat, render_output
+from dbt_assistant.utils.run_watcher import run_watcher
 
 
 class Webhook(BaseModel):
@@ -149,9 +166,9 @@ def _is_success(response: dict) -> bool:
     return response["status"]["is_success"]
 
 
-def _simple_return(response: dict) -> list[dict]:
+def _simple_return(response: dict, output_format: OutputFormat = None) -> list[dict]:
     if _is_success(response):
-        return response["data"]
+        return render_output(response["data"], output_format, name="admin_api")
 
     try:
         return [{"error": response["status"]["user_message"]}]
@@ -159,6 +176,177 @@ def _simple_return(response: dict) -> list[dict]:
         return [{"error": "An unknown error occurred."}]
 
 
+def _paginated_return(response: dict, output_format: OutputFormat = None):
+    result = _simple_return(response, output_format)
+    if not _is_success(response):
+        return result
+
+    pagination = response["extra"]["pagination"]
+    offset = (response["extra"].get("filters") or {}).get("offset") or 0
+    remaining = pagination["total_count"] - offset - pagination["count"]
+    if remaining > 0 and isinstance(result, str):
+        note = (
+            f"Showing {pagination['count']} of {pagination['total_count']} results; "
+            f"use `offset` for the next {remaining}."
+        )
+        return f"{note}\n\n{result}"
+    return result
+
+
+def _thread_id() -> Optional[str]:
+    """Thread ID of the conversation the tool is running in, so runs it starts
+    watching are announced to that conversation only.
+    """
+    return ensure_config().get("configurable", {}).get("thread_id")
+
+
+def _bulk_return(rows: List[dict], dry_run: bool) -> str:
+    if dry_run:
+        summary = (
+            f"Dry run - nothing was changed.  {len(rows)} actions would be carried "
+            "out.  Confirm with the user, then call again with `dry_run=False`."
+        )
+    else:
+        failed = sum(row["result"] == "error" for row in rows)
+        summary = f"{len(rows) - failed} of {len(rows)} actions succeeded."
+    return f"{summary}\n\n{to_markdown_table(rows)}"
+
+
+# Bulk Tools
+
+
+@tool
+def bulk_create_environment_variables(
+    account_id: int,
+    project_ids: List[int],
+    payload: EnvironmentVariable,
+    *,
+    dry_run: bool = True,
+) -> str:
+    """Create the same environment variable in many projects at once.
+
+    Without `dry_run=False` nothing is created - only the actions that would be
+    carried out are listed, to confirm with the user first.
+
+    Args:
+        account_id (int): Numeric ID of the account
+        project_ids (List[int]): Numeric IDs of the projects
+        payload (EnvironmentVariable): The environment variable to create.  Its
+            `project_id` is replaced by each project's.
+        dry_run (bool, optional): Only list what would be done. Defaults to True.
+    """
+    actions = []
+    for project_id in project_ids:
+        body = payload.copy(update={"project_id": project_id}).dict()
+        actions.append(
+            BulkAction(
+                target=f"project {project_id}",
+                description=f"create environment variable {payload.name}",
+                call=lambda client, project_id=project_id, body=body: (
+                    client.cloud.create_env_vars(
+                        account_id=account_id, project_id=project_id, payload=body
+                    )
+                ),
+            )
+        )
+    return _bulk_return(run_bulk(actions, dry_run=dry_run), dry_run)
+
+
+@tool
+def bulk_create_environments(
+    account_id: int, payloads: List[Environment], *, dry_run: bool = True
+) -> str:
+    """Create many environments at once, in any projects.
+
+    Without `dry_run=False` nothing is created - only the actions that would be
+    carried out are listed, to confirm with the user first.
+
+    Args:
+        account_id (int): Numeric ID of the account
+        payloads (List[Environment]): The environments to create
+        dry_run (bool, optional): Only list what would be done. Defaults to True.
+    """
+    actions = [
+        BulkAction(
+            target=f"project {payload.project_id}",
+            description=f"create {payload.type} environment {payload.name}",
+            call=lambda client, payload=payload: client.cloud.create_environment(
+                account_id=account_id,
+                project_id=payload.project_id,
+                payload=payload.dict(),
+            ),
+        )
+        for payload in payloads
+    ]
+    return _bulk_return(run_bulk(actions, dry_run=dry_run), dry_run)
+
+
+@tool
+def bulk_create_webhooks(
+    account_id: int, payloads: List[Webhook], *, dry_run: bool = True
+) -> str:
+    """Create many webhooks at once.
+
+    Without `dry_run=False` nothing is created - only the actions that would be
+    carried out are listed, to confirm with the user first.
+
+    Args:
+        account_id (int): Numeric ID of the account
+        payloads (List[Webhook]): The webhooks to create
+        dry_run (bool, optional): Only list what would be done. Defaults to True.
+    """
+    actions = [
+        BulkAction(
+            target=payload.client_url,
+            description=(
+                f"create webhook {payload.name} for {', '.join(payload.event_types)}"
+            ),
+            call=lambda client, payload=payload: client.cloud.create_webhook(
+                account_id=account_id, payload=payload.dict()
+            ),
+        )
+        for payload in payloads
+    ]
+    return _bulk_return(run_bulk(actions, dry_run=dry_run), dry_run)
+
+
+@tool
+def bulk_trigger_jobs(
+    account_id: int, job_ids: List[int], payload: TriggerJob, *, dry_run: bool = True
+) -> str:
+    """Trigger many jobs at once, all with the same options.  The runs are watched
+    like those of `trigger_job`; use `wait_for_runs` with the IDs returned to wait
+    for them.
+
+    Without `dry_run=False` nothing is triggered - only the actions that would be
+    carried out are listed, to confirm with the user first.
+
+    Args:
+        account_id (int): Numeric ID of the account
+        job_ids (List[int]): Numeric IDs of the jobs
+        payload (TriggerJob): Options of every run
+        dry_run (bool, optional): Only list what would be done. Defaults to True.
+    """
+    actions = [
+        BulkAction(
+            target=f"job {job_id}",
+            description=f"trigger run ({payload.cause})",
+            call=lambda client, job_id=job_id: client.cloud.trigger_job(
+                account_id=account_id,
+                job_id=job_id,
+                payload=payload.dict(),
+                should_poll=False,
+            ),
+        )
+        for job_id in job_ids
+    ]
+    rows = run_bulk(actions, dry_run=dry_run)
+    for row in rows:
+        if row["id"] is not None:
+            run_watcher.watch(account_id, row["id"], _thread_id())
+    return _bulk_return(rows, dry_run)
+
+
 # Cancel Tools
 
 
@@ -273,6 +461,8 @@ def get_run_artifact(
     path: str,
     *,
     step: int = None,
+    section: str = None,
+    limit: int = 100,
 ) -> Union[str, dict]:
     """Fetch artifacts from a completed run.
 
@@ -284,6 +474,9 @@ def get_run_artifact(
         run. To list artifacts from other steps in the run, use the step query
         parameter described below.
 
+    JSON artifacts are downloaded once to a local cache and only summarized here
+    (size, dbt version, when they were generated); use `section` to read part of
+    one.
 
     Args:
         account_id (int): Numeric ID of the account to retrieve
@@ -295,8 +488,25 @@ def get_run_artifact(
             artifacts. The first step in the run has the index 1. If the step
             parameter is omitted, then this endpoint will return the artifacts
             compiled for the last step in the run.
+        section (str, optional): Only return the elements of one part of a JSON
+            artifact, e.g. "nodes" or "sources" of a manifest.json or "results" of a
+            run_results.json.  The artifact is read from the cache and never
+            decoded in full. Defaults to None.
+        limit (int, optional): Maximum number of elements to return from `section`.
+            Defaults to 100.
     """
     client = get_client()
+    if path.endswith(".json"):
+        artifact = get_artifact(account_id, run_id, path, step=step, client=client)
+        if section:
+            return render_output(
+                itertools.islice(artifact.iter_section(section), limit),
+                "csv",
+                name="run_artifact",
+            )
+
+        return render_output([artifact.summary()], "csv", name="run_artifact")
+
     response = client.cloud.get_run_artifact(
         account_id=account_id,
         run_id=run_id,
@@ -306,6 +516,394 @@ def get_run_artifact(
     return response
 
 
+@tool
+def find_manifest_resources(
+    account_id: int,
+    run_id: int,
+    *,
+    resource_type: str = None,
+    materialized: str = None,
+    tag: str = None,
+    package_name: str = None,
+    name: str = None,
+    step: int = None,
+    limit: int = 100,
+) -> str:
+    """Find resources in the manifest.json of a run, e.g. "list all incremental
+    models" (resource_type="model", materialized="incremental").  Without any
+    filter, returns the number of resources per type and materialization.
+
+    The manifest is downloaded and indexed once; later questions about the same run
+    are answered from the index.
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        run_id (int): Numeric ID of the run.
+        resource_type (str, optional): e.g. "model", "test", "seed", "snapshot" or
+            "source". Defaults to None.
+        materialized (str, optional): e.g. "table", "view", "incremental" or
+            "ephemeral". Defaults to None.
+        tag (str, optional): Only resources with this tag. Defaults to None.
+        package_name (str, optional): Only resources from this package. Defaults to
+            None.
+        name (str, optional): Only resources whose name contains this. Defaults to
+            None.
+        step (int, optional): Index of the step in the run. Defaults to the last.
+        limit (int, optional): Maximum number of resources returned. Defaults to 100.
+    """
+    index = get_manifest_index(account_id, run_id, step=step, client=get_client())
+    filters = [resource_type, materialized, tag, package_name, name]
+    if not any(filters):
+        return to_markdown_table(index.summary())
+
+    return to_markdown_table(
+        index.find(
+            resource_type=resource_type,
+            materialized=materialized,
+            tag=tag,
+            package_name=package_name,
+            name=name,
+            limit=limit,
+        )
+    )
+
+
+@tool
+def get_manifest_lineage(
+    account_id: int,
+    run_id: int,
+    resource: str,
+    *,
+    direction: Literal["upstream", "downstream"] = "upstream",
+    depth: int = 1,
+    step: int = None,
+    limit: int = 200,
+) -> str:
+    """Find what a resource depends on (upstream) or what depends on it (downstream)
+    according to the manifest.json of a run, e.g. "what does fct_orders depend on?".
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        run_id (int): Numeric ID of the run.
+        resource (str): Unique ID or name of the resource, e.g. "fct_orders".
+        direction (Literal["upstream", "downstream"], optional): Defaults to
+            "upstream".
+        depth (int, optional): How many hops to follow; 0 for the whole lineage.
+            Defaults to 1 (direct parents or children).
+        step (int, optional): Index of the step in the run. Defaults to the last.
+        limit (int, optional): Maximum number of resources returned. Defaults to 200.
+    """
+    index = get_manifest_index(account_id, run_id, step=step, client=get_client())
+    unique_id = index.resolve(resource)
+    if unique_id is None:
+        return f"No resource named {resource!r} in the manifest."
+
+    rows = index.lineage(unique_id, direction=direction, depth=depth, limit=limit)
+    if not rows:
+        return f"{unique_id} has no {direction} dependencies."
+
+    return f"{direction.capitalize()} of {unique_id}:\n\n{to_markdown_table(rows)}"
+
+
+@tool
+def find_macro_usage(
+    account_id: int,
+    run_id: int,
+    macro: str,
+    *,
+    step: int = None,
+    limit: int = 100,
+) -> str:
+    """Find the resources that call a macro according to the manifest.json of a run.
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        run_id (int): Numeric ID of the run.
+        macro (str): Unique ID (e.g. "macro.my_project.cents_to_dollars") or name of
+            the macro.
+        step (int, optional): Index of the step in the run. Defaults to the last.
+        limit (int, optional): Maximum number of resources returned. Defaults to 100.
+    """
+    index = get_manifest_index(account_id, run_id, step=step, client=get_client())
+    return to_markdown_table(index.macro_usage(macro, limit=limit))
+
+
+@tool
+def analyze_run_timing(
+    account_id: int,
+    run_id: int,
+    *,
+    step: int = None,
+    limit: int = 10,
+) -> str:
+    """Find what bound the wall-clock time of a completed run, from its
+    run_results.json joined with the dependencies in its manifest.json.  Returns the
+    run's wall-clock time and thread utilization over time, and the nodes on its
+    critical path - the chain of nodes that each had to wait for the one before,
+    the only ones whose speed affected how long the run took - longest first.
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        run_id (int): Numeric ID of the run.
+        step (int, optional): Index of the step in the run. Defaults to the last.
+        limit (int, optional): Number of critical path nodes to return. Defaults
+            to 10.
+    """
+    client = get_client()
+    run_results = get_artifact(
+        account_id, run_id, "run_results.json", step=step, client=client
+    )
+    timing = RunTiming.from_results(run_results.iter_array("results"))
+    if not len(timing):
+        return "No node in the run has timings."
+
+    index = get_manifest_index(account_id, run_id, step=step, client=client)
+    summary = summarize_run_timing(timing, index.edges())
+
+    busy_threads = ", ".join(f"{busy:.1f}" for busy in summary["busy_threads"])
+    critical_path = sorted(
+        summary["critical_path"], key=lambda row: row["duration_s"], reverse=True
+    )
+    critical_s = sum(row["duration_s"] for row in critical_path)
+    thread_bound = sum(row["waited_for"] == "thread" for row in critical_path)
+    lines = [
+        f"{summary['nodes']} nodes ran on {summary['threads']} threads in "
+        f"{summary['wall_clock_s']:.0f}s ({summary['utilization']:.0%} utilization).",
+        f"Busy threads over each tenth of the run: {busy_threads}.",
+        f"The critical path has {len(critical_path)} nodes taking {critical_s:.0f}s, "
+        f"{thread_bound} of which only started once a thread was free.  The longest "
+        f"dependency chain takes {summary['longest_chain_s']:.0f}s, the least the run "
+        "could take with unlimited threads.",
+        "",
+        to_markdown_table(critical_path[:limit]),
+    ]
+    return "\n".join(lines)
+
+
+def _configured_threads(client, account_id: int, run_id: int) -> Optional[int]:
+    # The threads the job is set to, which the run may not have kept busy
+    response = client.cloud.get_run(
+        account_id=account_id, run_id=run_id, include_related=["job"]
+    )
+    try:
+        return int(response["data"]["job"]["settings"]["threads"]) or None
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@tool
+def simulate_run(
+    account_id: int,
+    run_id: int,
+    *,
+    threads: List[int] = None,
+    speedups: Dict[str, float] = None,
+    step: int = None,
+) -> str:
+    """Predict how long a job would take with a different number of threads, or if
+    some models were faster or slower, by replaying a completed run of it: every
+    node takes as long as it did in that run (unless changed by `speedups`) and
+    waits for its parents and a free thread, like dbt schedules them.
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        run_id (int): Numeric ID of a completed run of the job.
+        threads (List[int], optional): Thread counts to predict. Defaults to 1, 2,
+            4, 8, 12, 16, 24, 32, 48 and 64. The run's own count is always added.
+        speedups (Dict[str, float], optional): Factor to multiply the duration of
+            nodes by, keyed by unique ID or name, e.g. {"fct_orders": 0.5} for
+            fct_orders taking half as long. Defaults to None.
+        step (int, optional): Index of the step in the run. Defaults to the last.
+    """
+    client = get_client()
+    run_results = get_artifact(
+        account_id, run_id, "run_results.json", step=step, client=client
+    )
+    timing = RunTiming.from_results(run_results.iter_array("results"))
+    if not len(timing):
+        return "No node in the run has timings."
+
+    index = get_manifest_index(account_id, run_id, step=step, client=client)
+    parent, child = timing.edges(index.edges())
+    # dbt breaks ties between nodes of the same generation by unique ID
+    simulator = RunSimulator(
+        timing.duration,
+        parent,
+        child,
+        tiebreak=np.argsort(np.argsort(timing.unique_ids)),
+    )
+
+    duration = simulator.duration.copy()
+    position = {unique_id: i for i, unique_id in enumerate(timing.unique_ids)}
+    unknown = []
+    for resource, factor in (speedups or {}).items():
+        node = position.get(index.resolve(resource) or resource)
+        if node is None:
+            unknown.append(resource)
+        else:
+            duration[node] *= factor
+
+    run_threads = _configured_threads(client, account_id, run_id)
+    observed = run_threads is None
+    if observed:
+        run_threads = len(timing.threads)
+    counts = set(threads or [1, 2, 4, 8, 12, 16, 24, 32, 48, 64]) | {run_threads}
+    baseline = simulator.sweep(counts)
+    changed = simulator.sweep(counts, duration) if speedups else None
+
+    actual_s = float(np.nanmax(timing.end))
+    rows = []
+    for count, simulated in baseline.items():
+        row = {
+            "threads": count,
+            "wall_clock_s": simulated.wall_clock_s,
+            "utilization": simulated.utilization,
+        }
+        if changed is not None:
+            row["with_speedups_s"] = changed[count].wall_clock_s
+        rows.append(row)
+
+    lines = [
+        f"The run took {actual_s:.0f}s on {run_threads} threads; replayed, it takes "
+        f"{baseline[run_threads].wall_clock_s:.0f}s.",
+    ]
+    if observed:
+        lines.append(
+            "The job's thread setting couldn't be found, so the number of threads "
+            "seen working in the run is used instead."
+        )
+    if unknown:
+        lines.append(f"Not in the run, so not sped up: {', '.join(unknown)}.")
+    lines += ["", to_markdown_table(rows, precision=2)]
+    return "\n".join(lines)
+
+
+@tool
+def get_job_run_trends(
+    account_id: int,
+    *,
+    job_ids: List[int] = None,
+    days: int = None,
+    recent_runs: int = 10,
+    sort_by: Literal["change_pct", "trend", "failure_rate", "runs"] = "change_pct",
+    limit: int = 20,
+) -> str:
+    """Duration trends, regressions, queue times and failure rates of jobs, e.g.
+    "is my nightly job getting slower?" or "which jobs got slower this week?".
+
+    Each job's latest `recent_runs` successful runs are compared with the ones
+    before them; the verdict says whether the job is significantly slower or
+    faster.  The trend is the change in run duration in seconds per day.
+
+    Runs are kept between calls and only the ones since the last call are pulled
+    from dbt Cloud, so prefer this to comparing `list_runs` results.
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        job_ids (List[int], optional): Only these jobs. Defaults to all of them.
+        days (int, optional): Only runs from the last number of days. Defaults to
+            None (every run kept).
+        recent_runs (int, optional): Runs compared against the ones before.
+            Defaults to 10.
+        sort_by (Literal["change_pct", "trend", "failure_rate", "runs"], optional):
+            What to rank jobs by, largest first. Defaults to "change_pct".
+        limit (int, optional): Number of jobs to return. Defaults to 20.
+    """
+    store = get_run_history(account_id)
+    error = store.ensure_current()
+    history = store.history
+    if error is not None and not len(history):
+        return error
+
+    since = None
+    if days is not None:
+        since = np.datetime64("now", "s") - np.timedelta64(days, "D")
+    rows = summarize_run_history(
+        history,
+        since=since,
+        job_ids=job_ids,
+        recent_runs=recent_runs,
+        sort_by=sort_by,
+        limit=limit,
+    )
+    header = (
+        f"{len(history)} finished runs of {len(np.unique(history.job_id))} jobs kept."
+    )
+    if error is not None:
+        header += f" Couldn't pull in the latest ones: {error}"
+    if not rows:
+        return f"{header}\nNo runs match."
+
+    return f"{header}\n\n{to_markdown_table(rows, precision=2)}"
+
+
+@tool
+def query_audit_logs(
+    account_id: int,
+    *,
+    since: str = None,
+    until: str = None,
+    event_type: str = None,
+    actor: str = None,
+    group_by: Literal[
+        "event_type", "actor_name", "actor_type", "service", "project_id", "date"
+    ] = None,
+    sql: str = None,
+    limit: int = 100,
+) -> str:
+    """Answer questions about an account's audit logs, e.g. "who changed job
+    settings last month?" or "which events happen most often?".
+
+    !!! note
+        This API is only available to enterprise customers.
+
+    Audit logs are exported to local Parquet files and only the ones logged since
+    the last export are pulled from dbt Cloud, so questions over months of logs are
+    answered locally.  Prefer this to `list_audit_logs`.
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        since (str, optional): First day, as yyyy-mm-dd.
+        until (str, optional): Last day, as yyyy-mm-dd.
+        event_type (str, optional): Part of the event type, e.g. "job".
+        actor (str, optional): Part of the name of who did it.
+        group_by (str, optional): Count logs per value of this column instead of
+            listing them.
+        sql (str, optional): A DuckDB SELECT over the `audit_logs` table (columns
+            id, logged_at, date, event_type, actor_id, actor_name, actor_type,
+            project_id, service, source and details, a JSON string) instead of the
+            filters.  Only works when DuckDB is installed.
+        limit (int, optional): Most rows to return. Defaults to 100.
+    """
+    store = get_audit_logs(account_id)
+    error = store.ensure_current()
+    if error is not None and not len(store):
+        return error
+
+    if sql:
+        try:
+            rows = store.sql(sql, limit=limit)
+        except Exception as e:
+            return f"The query failed: {e}"
+    else:
+        rows = store.query(
+            since=since,
+            until=until,
+            event_type=event_type,
+            actor=actor,
+            group_by=group_by,
+            limit=limit,
+        )
+
+    header = f"{len(store)} audit logs stored."
+    if error is not None:
+        header += f" Couldn't pull in the latest ones: {error}"
+    if not rows:
+        return f"{header}\nNo audit logs match."
+
+    return f"{header}\n\n{to_markdown_table(rows)}"
+
+
 # List Tools
 
 
@@ -314,6 +912,7 @@ def list_accounts() -> list[dict]:
     """List all accounts a user is associated with."""
     client = get_client()
     response = client.cloud.list_accounts()
+    # Left as records - the graph reads the account info from this tool
     return _simple_return(response)
 
 
@@ -337,20 +936,19 @@ def list_audit_logs(
             logs.  Format is yyyy-mm-dd
         logged_at_end (str, optional): Date to stop retrieving audit logs.
             Format is yyyy-mm-dd
-        offset (int, optional): The offset to apply when listing runs.
-            Use with limit to paginate results.
-        limit (int, optional): The limit to apply when listing runs.
-            Use with offset to paginate results.
+        offset (int, optional): Number of audit logs to skip. Defaults to 0.
+        limit (int, optional): Most audit logs to return, fetched page by page in one
+            call. Defaults to 200.
     """
-    client = get_client()
-    response = client.cloud.list_audit_logs(
+    response = paginate(
+        "list_audit_logs",
         account_id=account_id,
         logged_at_start=logged_at_start,
         logged_at_end=logged_at_end,
         offset=offset,
         limit=limit,
     )
-    return _simple_return(response)
+    return _paginated_return(response, output_format="csv")
 
 
 @tool
@@ -371,7 +969,7 @@ def list_connections(
         offset=offset,
         limit=limit,
     )
-    return _simple_return(response)
+    return _simple_return(response, output_format="csv")
 
 
 @tool
@@ -381,7 +979,7 @@ def list_credentials(account_id: int, project_id: int) -> dict:
     response = client.cloud.list_credentials(
         account_id=account_id, project_id=project_id
     )
-    return _simple_return(response)
+    return _simple_return(response, output_format="csv")
 
 
 @tool
@@ -412,7 +1010,7 @@ def list_environment_variables(
         state=state,
         user_id=user_id,
     )
-    return _simple_return(response)
+    return _simple_return(response, output_format="csv")
 
 
 @tool
@@ -445,7 +1043,7 @@ def list_environments(
         limit=limit,
         order_by=order_by,
     )
-    return _simple_return(response)
+    return _simple_return(response, output_format="csv")
 
 
 @tool
@@ -453,7 +1051,7 @@ def list_groups(account_id: int) -> dict:
     """List groups for a specific account and project"""
     client = get_client()
     response = client.cloud.list_groups(account_id=account_id)
-    return _simple_return(response)
+    return _simple_return(response, output_format="markdown")
 
 
 @tool
@@ -461,7 +1059,7 @@ def list_invited_users(account_id: int) -> dict:
     """List invited users in an account."""
     client = get_client()
     response = client.cloud.list_invited_users(account_id=account_id)
-    return _simple_return(response)
+    return _simple_return(response, output_format="csv")
 
 
 @tool
@@ -475,9 +1073,13 @@ def list_jobs(
     limit: int = None,
     order_by: str = None,
 ) -> dict:
-    """List jobs in an account, specific project, or environment."""
-    client = get_client()
-    response = client.cloud.list_jobs(
+    """List jobs in an account, specific project, or environment.
+
+    Up to 200 jobs are returned in one call, unless `limit` says otherwise; use
+    `offset` for the rest.
+    """
+    response = paginate(
+        "list_jobs",
         account_id=account_id,
         environment_id=environment_id,
         project_id=project_id,
@@ -486,7 +1088,7 @@ def list_jobs(
         limit=limit,
         order_by=order_by,
     )
-    return _simple_return(response)
+    return _paginated_return(response, output_format="csv")
 
 
 @tool
@@ -504,20 +1106,19 @@ def list_projects(
         account_id (int): Numeric ID of the account to retrieve
         project_id (int, optional): The project ID to retrieve
         state (int, optional): 1 = active, 2 = deleted
-        offset (int, optional): The offset to apply when listing projects.
-            Use with limit to paginate results.
-        limit (int, optional): The limit to apply when listing projects.
-            Use with offset to paginate results.
+        offset (int, optional): Number of projects to skip. Defaults to 0.
+        limit (int, optional): Most projects to return, fetched page by page in one
+            call. Defaults to 200.
     """
-    client = get_client()
-    response = client.cloud.list_projects(
+    response = paginate(
+        "list_projects",
         account_id=account_id,
         project_id=project_id,
         state=state,
         offset=offset,
         limit=limit,
     )
-    return _simple_return(response)
+    return _paginated_return(response, output_format="markdown")
 
 
 @tool
@@ -543,7 +1144,7 @@ def list_run_artifacts(
         run_id=run_id,
         step=step,
     )
-    return _simple_return(response)
+    return _simple_return(response, output_format="csv")
 
 
 @tool
@@ -576,13 +1177,12 @@ def list_runs(
             cancelled
         order_by (str, optional): Field to order the result by.
             Use - to indicate reverse order.
-        offset (int, optional): The offset to apply when listing runs.
-            Use with limit to paginate results.
-        limit (int, optional): The limit to apply when listing runs.
-            Use with offset to paginate results.
+        offset (int, optional): Number of runs to skip. Defaults to 0.
+        limit (int, optional): Most runs to return, fetched page by page in one
+            call. Defaults to 200.
     """
-    client = get_client()
-    response = client.cloud.list_runs(
+    response = paginate(
+        "list_runs",
         account_id=account_id,
         include_related=include_related,
         job_definition_id=job_definition_id,
@@ -594,7 +1194,7 @@ def list_runs(
         offset=offset,
         limit=limit,
     )
-    return _simple_return(response)
+    return _paginated_return(response, output_format="csv")
 
 
 @tool
@@ -604,7 +1204,7 @@ def list_service_token_permissions(account_id: int, service_token_id: int) -> di
     response = client.cloud.list_service_token_permissions(
         account_id=account_id, service_token_id=service_token_id
     )
-    return _simple_return(response)
+    return _simple_return(response, output_format="csv")
 
 
 @tool
@@ -612,7 +1212,7 @@ def list_service_tokens(account_id: int) -> dict:
     """List service tokens for a specific account."""
     client = get_client()
     response = client.cloud.list_service_tokens(account_id=account_id)
-    return _simple_return(response)
+    return _simple_return(response, output_format="csv")
 
 
 @tool
@@ -629,34 +1229,37 @@ def list_users(
     Args:
         account_id (int): Numeric ID of the account to retrieve
         state (int, optional): 1 = active, 2 = deleted
-        limit (int, optional): The limit to apply when listing runs.
-            Use with offset to paginate results.
-        offset (int, optional): The offset to apply when listing runs.
-            Use with limit to paginate results.
+        limit (int, optional): Most users to return, fetched page by page in one
+            call. Defaults to 200.
+        offset (int, optional): Number of users to skip. Defaults to 0.
         order_by (str, optional): Field to order the result by.
             Use - to indicate reverse order.
     """
-    client = get_client()
-    response = client.cloud.list_users(
+    response = paginate(
+        "list_users",
         account_id=account_id,
         state=state,
         limit=limit,
         offset=offset,
         order_by=order_by,
     )
-    return _simple_return(response)
+    return _paginated_return(response, output_format="csv")
 
 
 @tool
 def list_webhooks(account_id: int, *, limit: int = None, offset: int = None) -> dict:
-    """List of webhooks in account."""
-    client = get_client()
-    response = client.cloud.list_webhooks(
+    """List of webhooks in account.
+
+    Up to 200 webhooks are returned in one call, unless `limit` says otherwise;
+    use `offset` for the rest.
+    """
+    response = paginate(
+        "list_webhooks",
         account_id=account_id,
         limit=limit,
         offset=offset,
     )
-    return _simple_return(response)
+    return _paginated_return(response, output_format="csv")
 
 
 # Trigger Tools
@@ -673,12 +1276,49 @@ def trigger_job(
     response = client.cloud.trigger_job(
         account_id=account_id, job_id=job_id, payload=payload.dict(), should_poll=False
     )
+    # Watched in the background, so the conversation hears when it finishes
+    run_id = (response.get("data") or {}).get("id")
+    if run_id is not None:
+        run_watcher.watch(account_id, run_id, _thread_id())
     return response
 
 
+# Wait Tools
+
+
+@tool
+def wait_for_runs(account_id: int, run_ids: List[int], timeout: int = 300) -> str:
+    """Wait for one or more runs to finish, e.g. after triggering a job.
+
+    Returns once every run has finished or `timeout` seconds have passed, with the
+    latest status of each.  Prefer this to calling `get_run` repeatedly.
+
+    Args:
+        account_id (int): Numeric ID of the account.
+        run_ids (List[int]): Numeric IDs of the runs.
+        timeout (int, optional): Most seconds to wait. Defaults to 300.
+    """
+    statuses = run_watcher.wait(
+        account_id, run_ids, timeout=timeout, thread_id=_thread_id()
+    )
+    rows = [status.as_dict() for status in statuses]
+    pending = sum(not status.finished for status in statuses)
+    summary = (
+        f"{pending} of {len(rows)} runs still going after {timeout}s."
+        if pending
+        else f"All {len(rows)} runs finished."
+    )
+    return f"{summary}\n\n{to_markdown_table(rows)}"
+
+
 admin_api_safe_tools = [
+    analyze_run_timing,
+    find_macro_usage,
+    find_manifest_resources,
     get_account_licenses,
     get_job,
+    get_job_run_trends,
+    get_manifest_lineage,
     get_run,
     get_run_artifact,
     list_accounts,
@@ -697,9 +1337,16 @@ admin_api_safe_tools = [
     list_service_tokens,
     list_users,
     list_webhooks,
+    query_audit_logs,
+    simulate_run,
+    wait_for_runs,
 ]
 
 admin_api_unsafe_tools = [
+    bulk_create_environment_variables,
+    bulk_create_environments,
+    bulk_create_webhooks,
+    bulk_trigger_jobs,
     cancel_run,
     create_environment_variables,
     create_environment,
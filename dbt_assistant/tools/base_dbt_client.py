@@ -1,6 +1,8 @@
 # stdlib
 import os
-from typing import Optional, Type
+import queue
+from contextlib import contextmanager
+from typing import Iterator, Optional, Type
 
 # third party
 from dbtc import dbtCloudClient
@@ -9,20 +11,63 @@ from langchain_core.pydantic_v1 import BaseModel, Field
 from langchain_core.tools import BaseTool
 
 # first party
+from dbt_assistant.utils.cassette import get_cassette, install_cassette
 from dbt_assistant.utils.dbt_cloud import DbtCloudApiWrapper
 
 
+def can_reach_dbt_cloud() -> bool:
+    """Whether dbt Cloud requests can be answered, live or from a replayed cassette."""
+    cassette = get_cassette()
+    return "DBT_CLOUD_SERVICE_TOKEN" in os.environ or (
+        cassette is not None and cassette.mode == "replay"
+    )
+
+
 def get_client():
+    cassette = get_cassette()
     try:
         token = os.environ["DBT_CLOUD_SERVICE_TOKEN"]
     except KeyError:
-        raise Exception(
-            "Both DBT_CLOUD_ENVIRONMENT_ID and DBT_CLOUD_SERVICE_TOKEN environment "
-            "variables must be set."
-        )
+        # Replaying a cassette never talks to dbt Cloud, so no token is needed
+        if cassette is None or cassette.mode != "replay":
+            raise Exception(
+                "Both DBT_CLOUD_ENVIRONMENT_ID and DBT_CLOUD_SERVICE_TOKEN environment "
+                "variables must be set."
+            )
+        token = "replay"
     environment_id = os.getenv("DBT_CLOUD_ENVIRONMENT_ID", None)
     host = os.getenv("DBT_CLOUD_HOST", "cloud.getdbt.com")
-    return dbtCloudClient(service_token=token, environment_id=environment_id, host=host)
+    client = dbtCloudClient(
+        service_token=token, environment_id=environment_id, host=host
+    )
+    # All three API clients share a single session
+    install_cassette(client.cloud.session, cassette)
+    return client
+
+
+# Idle clients kept around so concurrent work reuses their open connections
+_client_pool = queue.LifoQueue(maxsize=int(os.getenv("DBT_CLOUD_CLIENT_POOL_SIZE", 8)))
+
+
+@contextmanager
+def pooled_client() -> Iterator[dbtCloudClient]:
+    """Borrow a client (and its HTTP connection pool) for the duration of the block.
+
+    Unlike `get_client`, clients are handed back afterwards and reused, so fanning
+    requests out over threads doesn't pay for new connections every time.
+    """
+    try:
+        client = _client_pool.get_nowait()
+    except queue.Empty:
+        client = get_client()
+
+    try:
+        yield client
+    finally:
+        try:
+            _client_pool.put_nowait(client)
+        except queue.Full:
+            client.cloud.session.close()
 
 
 class DbtCloudAction(BaseTool):
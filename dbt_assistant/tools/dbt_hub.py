@@ -1,20 +1,50 @@
+# stdlib
+import threading
+
 # third party
-from langchain.tools.retriever import create_retriever_tool
+from langchain_core.tools import tool
 
 # first party
 from dbt_assistant.retrievers.dbt_hub_retriever import DbtHubRetriever
+from dbt_assistant.utils.cassette import through_cassette
 
 INDEX_NAME = "dbt-hub"
 
-docsearch = DbtHubRetriever().from_pinecone(INDEX_NAME)
-retriever = docsearch.as_retriever()
-dbt_hub_retriever_tool = create_retriever_tool(
-    retriever,
-    "dbt_hub_package_search",
-    "Search for dbt Hub Packages.  Packages within dbt are a collection of macros, "
-    "models, tests, and other resources that can be installed within your own dbt "
-    "project.  This tool allows you to search for packages within dbt Hub. "
-    "When returning data, always be sure to return the name of the package and "
-    "then provide the relevant content for the user to consume. But the package name "
-    "is incredibly important.",
-)
+_retriever = None
+_retriever_lock = threading.Lock()
+
+
+def get_retriever():
+    """The dbt Hub retriever, connected to Pinecone on first use.
+
+    Connecting needs OpenAI and Pinecone credentials (and creates the index if it
+    doesn't exist yet), so it's put off until a package search actually happens.
+    """
+    global _retriever
+    with _retriever_lock:
+        if _retriever is None:
+            _retriever = DbtHubRetriever().from_pinecone(INDEX_NAME).as_retriever()
+
+    return _retriever
+
+
+def _search(query: str) -> str:
+    documents = get_retriever().invoke(query)
+    return "\n\n".join(document.page_content for document in documents)
+
+
+@tool("dbt_hub_package_search")
+def dbt_hub_retriever_tool(query: str) -> str:
+    """Search for dbt Hub Packages.  Packages within dbt are a collection of macros,
+    models, tests, and other resources that can be installed within your own dbt
+    project.  This tool allows you to search for packages within dbt Hub.
+    When returning data, always be sure to return the name of the package and
+    then provide the relevant content for the user to consume. But the package name
+    is incredibly important.
+
+    Args:
+        query (str): Query to look up in dbt Hub.
+    """
+    # Replayed from the cassette when there is one, as Pinecone isn't reached
+    # through a requests session
+    return through_cassette("dbt_hub", {"query": query}, lambda: _search(query))
@@ -1,81 +1,112 @@
-# first party
+# stdlib
 import os
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from typing import Dict, List, Literal, Tuple, Union
+from typing import Callable, Dict, List, Literal, Tuple, Union
 
 # third party
+import numpy as np
 from langchain_core.tools import tool
 
 # first party
-from dbt_assistant.tools.base_dbt_client import get_client
-
-FIRST_N_RESULTS = 500
-DEFAULT_DAYS_AGO = 14
-MAXIMUM_DAYS_AGO = 90
-
-
-def _create_date_range(start_date: str = None, end_date: str = None) -> Tuple[str, str]:
-    today = datetime.now().date()
-    default_start_date = today - timedelta(days=DEFAULT_DAYS_AGO)
-    minimum_start_date = today - timedelta(days=MAXIMUM_DAYS_AGO)
-
-    # Process start_date
-    if start_date:
-        try:
-            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-            start_date = max(start_date, minimum_start_date)
-        except ValueError:
-            # If there's an error parsing the date, default to two weeks ago
-            start_date = default_start_date
-    else:
-        start_date = default_start_date
-
-    # Process end_date
-    if end_date:
-        try:
-            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-            end_date = min(end_date, today)
-        except ValueError:
-            # If there's an error parsing the date, default to today
-            end_date = today
-    else:
-        end_date = today
-
-    # Ensure end_date is not before start_date
-    if end_date < start_date:
-        end_date = start_date
-
-    return start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+from dbt_assistant.analytics import (
+    ExecutionHistory,
+    detect_changes,
+    query_history_matrix,
+    summarize_execution_history,
+    summarize_freshness,
+    summarize_query_history,
+    summarize_test_history,
+    to_markdown_table,
+)
+from dbt_assistant.analytics.columnar import to_datetime64
+from dbt_assistant.freshness import get_source_freshness
+from dbt_assistant.queries import (
+    create_date_range,
+    map_concurrently,
+    query_engine,
+    resource_query_histories_query,
+)
+from dbt_assistant.queries.engine import MAX_CONCURRENT_REQUESTS
+from dbt_assistant.queries.spec import DEFAULT_DAYS_AGO
+from dbt_assistant.search import get_project_search
+from dbt_assistant.test_history import get_test_history
+from dbt_assistant.utils.prefetch import make_key, prefetcher
+from dbt_assistant.utils.render import render_output
+
+ENVIRONMENT_TIMEOUT = 30
+QUERY_HISTORY_BATCH_SIZE = 25
+
+
+def _fan_out(
+    func: Callable, environment_ids: List[int], timeout: float
+) -> Tuple[Dict[int, object], Dict[int, str]]:
+    """Call `func(environment_id)` for every environment concurrently.
+
+    Environments that fail or don't answer within `timeout` seconds are reported as
+    errors instead of holding up the others.
+
+    Returns:
+        Tuple[Dict[int, object], Dict[int, str]]: Results and error messages, both
+            keyed by environment ID.
+    """
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(len(environment_ids), MAX_CONCURRENT_REQUESTS))
+    )
+    futures = {
+        environment_id: executor.submit(func, environment_id)
+        for environment_id in environment_ids
+    }
+    wait(futures.values(), timeout=timeout)
+    # Don't wait on stragglers - their results are simply dropped
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results, errors = {}, {}
+    for environment_id, future in futures.items():
+        if not future.done():
+            errors[environment_id] = f"timed out after {timeout:g}s"
+        elif future.exception() is not None:
+            errors[environment_id] = str(future.exception())
+        elif isinstance(future.result(), str):
+            errors[environment_id] = future.result()
+        else:
+            results[environment_id] = future.result()
+
+    return results, errors
+
+
+def _get_execution_history(
+    unique_ids: List[str], start_date: str, end_date: str, environment_id: int
+) -> ExecutionHistory:
+    responses = query_engine.execute_many(
+        "get_model_execution_history",
+        [{"unique_id": unique_id} for unique_id in unique_ids],
+        start_date=start_date,
+        end_date=end_date,
+        environment_id=environment_id,
+    )
+    return ExecutionHistory.from_responses(dict(zip(unique_ids, responses)))
 
 
-def _extract_nested_edges(
-    response: Union[List[Dict], Dict],
-    keys: List[str],
-    *,
-    error_message: str = "Nothing found.",
-):
-    # If response is a dictionary, wrap it in a list
-    if isinstance(response, dict):
-        response = [response]
+def _failed_lookups(errors: Dict[str, str], what: str) -> str:
+    """One line per error message listing the unique IDs whose `what` couldn't be
+    looked up, so they aren't mistaken for resources without any history.
+    """
+    failed: Dict[str, List[str]] = {}
+    for unique_id, message in errors.items():
+        failed.setdefault(message, []).append(unique_id)
 
-    all_edges = []
+    return "\n".join(
+        f"Couldn't look up the {what} of {', '.join(failed_ids)}: {message}"
+        for message, failed_ids in failed.items()
+    )
 
-    for item in response:
-        # Navigate through the nested structure
-        current = item
-        for key in keys:
-            if isinstance(current, dict) and key in current:
-                current = current[key]
-            else:
-                # If we can't find the complete path, return the error message
-                print(f"An error seems to have occurred.  See response:\n{response}")
-                return error_message
 
-        # If we've successfully navigated to 'edges' extend our list
-        if isinstance(current, list):
-            all_edges.extend(current)
+def _with_failed_lookups(table: str, errors: Dict[str, str], what: str) -> str:
+    if not errors:
+        return table
 
-    return all_edges
+    return f"{table}\n\n{_failed_lookups(errors, what)}".strip()
 
 
 @tool
@@ -103,10 +134,9 @@ def get_longest_executed_models(
         job_id (int, optional): Filter by a specific job ID. Defaults to None.
         order_by ("MAX", "AVG", optional): How to order results. Defaults to "MAX".
     """
-    client = get_client()
-    start_date, end_date = _create_date_range(start_date, end_date)
-    response = client.metadata.longest_executed_models(
-        environment_id=int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
+    return query_engine.execute(
+        "get_longest_executed_models",
+        environment_id=environment_id,
         start_date=start_date,
         end_date=end_date,
         limit=limit,
@@ -114,9 +144,6 @@ def get_longest_executed_models(
         job_id=job_id,
         order_by=order_by,
     )
-    return _extract_nested_edges(
-        response, ["data", "performance", "longestExecutedModels"]
-    )
 
 
 @tool
@@ -138,19 +165,75 @@ def get_model_performance_history(
             Defaults to None.
         environment_id (int, optional): Environment ID. Defaults to None.
     """
-    client = get_client()
-    start_date, end_date = _create_date_range(start_date, end_date)
-    response = client.metadata.model_execution_history(
+    return query_engine.execute(
+        "get_model_execution_history",
         unique_id=unique_id,
         start_date=start_date,
         end_date=end_date,
-        environment_id=int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-    )
-    return _extract_nested_edges(
-        response, ["data", "performance", "modelExecutionHistory"]
+        environment_id=environment_id,
     )
 
 
+@tool
+def summarize_model_performance(
+    unique_ids: List[str] = None,
+    *,
+    start_date: str = None,
+    end_date: str = None,
+    environment_id: int = None,
+    limit: int = 5,
+    by_job: bool = False,
+    rolling_runs: int = 5,
+) -> str:
+    """Summarize the execution history of models as a compact table: number of runs
+    and failures, p50/p95/max/mean execution time (seconds), week-over-week change,
+    a rolling mean over the most recent runs and the trend (seconds per day).
+    Models whose history couldn't be looked up are listed below the table.
+
+    Prefer this tool over get_model_performance_history when asked about
+    performance trends, regressions or comparisons between models.
+
+    Args:
+        unique_ids (List[str], optional): Unique IDs of the models to summarize.
+            Defaults to the `limit` longest executed models.
+        start_date (str, optional): Start date in the format YYYY-MM-DD.
+            Defaults to None.
+        end_date (str, optional): End date in the format YYYY-MM-DD.
+            Defaults to None.
+        environment_id (int, optional): Environment ID. Defaults to None.
+        limit (int, optional): Number of longest executed models to summarize when
+            no unique IDs are given. Defaults to 5.
+        by_job (bool, optional): Summarize each job a model runs in separately.
+            Defaults to False.
+        rolling_runs (int, optional): Number of most recent runs in the rolling
+            mean. Defaults to 5.
+    """
+    environment_id = int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
+    start_date, end_date = create_date_range(start_date, end_date)
+    if not unique_ids:
+        longest = query_engine.execute(
+            "get_longest_executed_models",
+            raw=True,
+            environment_id=environment_id,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+        )
+        if isinstance(longest, str):
+            return longest
+
+        unique_ids = [model["uniqueId"] for model in longest]
+
+    history = _get_execution_history(unique_ids, start_date, end_date, environment_id)
+    if by_job:
+        history = history.by_job()
+
+    end = np.datetime64(end_date) + np.timedelta64(1, "D")
+    rows = summarize_execution_history(history, end=end, rolling_runs=rolling_runs)
+    table = to_markdown_table(rows) if rows else ""
+    return _with_failed_lookups(table, history.errors, "execution history")
+
+
 @tool
 def get_most_executed_models(
     environment_id: int = None,
@@ -172,18 +255,14 @@ def get_most_executed_models(
         job_limit (int, optional): Limit the number of jobs to return for each model.
             Defaults to 5.
     """
-    client = get_client()
-    start_date, end_date = _create_date_range(start_date, end_date)
-    response = client.metadata.most_executed_models(
-        environment_id=int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
+    return query_engine.execute(
+        "get_most_executed_models",
+        environment_id=environment_id,
         start_date=start_date,
         end_date=end_date,
         limit=limit,
         job_limit=job_limit,
     )
-    return _extract_nested_edges(
-        response, ["data", "performance", "mostExecutedModels"]
-    )
 
 
 @tool
@@ -204,15 +283,13 @@ def get_most_failed_models(
             Defaults to None.
         limit (int, optional): Number of models to return. Defaults to 5.
     """
-    client = get_client()
-    start_date, end_date = _create_date_range(start_date, end_date)
-    response = client.metadata.most_failed_models(
-        environment_id=int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
+    return query_engine.execute(
+        "get_most_failed_models",
+        environment_id=environment_id,
         start_date=start_date,
         end_date=end_date,
         limit=limit,
     )
-    return _extract_nested_edges(response, ["data", "performance", "mostFailedModels"])
 
 
 @tool
@@ -223,28 +300,7 @@ def get_consumer_projects(environment_id: int = None) -> Union[List[Dict], str]:
     Args:
         environment_id (int, optional): Environment ID. Defaults to None.
     """
-    client = get_client()
-    query = """
-    query Environment($environmentId: BigInt!) {
-    environment(id: $environmentId) {
-        consumerProjects {
-        consumerCloudProject
-        consumerCoreProject
-        consumerEnvironmentId
-        consumerProjectId
-        producerPublicModels {
-            numEdges
-            uniqueId
-        }
-        }
-    }
-    }
-    """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(response, ["data", "environment", "consumerProjects"])
+    return query_engine.execute("get_consumer_projects", environment_id=environment_id)
 
 
 @tool
@@ -263,55 +319,12 @@ def get_exposures(
         exposure_type (str, optional): Filter by exposure type. Defaults to None.
         tags (List[str], optional): Filter by tags. Defaults to None.
     """
-    client = get_client()
-    query = """
-    query Environment($environmentId: BigInt!, $after: String, $filter: ExposureFilter, $first: Int) {
-    environment(id: $environmentId) {
-        applied {
-        exposures(after: $after, filter: $filter, first: $first) {
-            pageInfo {
-            endCursor
-            hasNextPage
-            hasPreviousPage
-            startCursor
-            }
-            totalCount
-            edges {
-            cursor
-            node {
-                description
-                exposureType
-                label
-                maturity
-                meta
-                name
-                ownerEmail
-                ownerName
-                packageName
-                resourceType
-                tags
-                uniqueId
-                url
-            }
-            }
-        }
-        }
-    }
-    }
-    """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-        "first": FIRST_N_RESULTS,
-        "after": None,
-        "filter": {
-            "exposureType": exposure_type,
-            "tags": tags,
-            "uniqueIds": unique_ids,
-        },
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(
-        response, ["data", "environment", "applied", "exposures", "edges"]
+    return query_engine.execute(
+        "get_exposures",
+        unique_ids=unique_ids,
+        environment_id=environment_id,
+        exposure_type=exposure_type,
+        tags=tags,
     )
 
 
@@ -332,6 +345,10 @@ def get_models(
 ) -> List[Dict]:
     """Get a list of models by unique_id in a user's dbt Cloud project.
 
+    Results come back as a node table, with the requested models first (marked
+    `matched`) followed by their ancestors and children, and an edge list of
+    upstream -> downstream unique IDs.
+
     Args:
         unique_ids (List[str], required): Filter by unique IDs.
         environment_id (int, optional): Environment ID. Defaults to None.
@@ -344,110 +361,19 @@ def get_models(
         database_schema (str, optional): Filter by schema. Defaults to None.
         tags (List[str], optional): Filter by tags. Defaults to None.
     """
-    client = get_client()
-    query = """
-    query Environment($environmentId: BigInt!, $after: String, $filter: ModelAppliedFilter, $first: Int, $types: [AncestorNodeType!]!) {
-    environment(id: $environmentId) {
-        applied {
-        models(after: $after, filter: $filter, first: $first) {
-            pageInfo {
-            endCursor
-            hasNextPage
-            hasPreviousPage
-            startCursor
-            }
-            totalCount
-            edges {
-            cursor
-            node {
-                access
-                alias
-                ancestors(types: $types) {
-                    description
-                    name
-                    resourceType
-                    uniqueId
-                }
-                catalog {
-                columns {
-                    description
-                    name
-                    type
-                }
-                rowCountStat
-                stats {
-                    description
-                    label
-                    value
-                }
-                }
-                children {
-                    description
-                    name
-                    resourceType
-                    uniqueId
-                }
-                database
-                dbtVersion
-                deprecationDate
-                description
-                executionInfo {
-                    compileCompletedAt
-                    compileStartedAt
-                    executeCompletedAt
-                    executeStartedAt
-                    executionTime
-                    lastJobDefinitionId
-                    lastRunError
-                    lastRunGeneratedAt
-                    lastRunId
-                    lastRunStatus
-                    lastSuccessJobDefinitionId
-                    lastSuccessRunId
-                    runElapsedTime
-                    runGeneratedAt
-                }
-                fqn
-                group
-                language
-                materializedType
-                meta
-                modelingLayer
-                name
-                packageName
-                resourceType
-                schema
-                tags
-                uniqueId
-                usageQueryCount
-            }
-            }
-        }
-        }
-    }
-    }
-    """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-        "first": FIRST_N_RESULTS,
-        "after": None,
-        "types": ["Model", "Source", "Snapshot", "Seed"],
-        "filter": {
-            "access": access,
-            "database": database,
-            "group": group,
-            "identifier": identifier,
-            "lastRunStatus": last_run_status,
-            "modelingLayer": modeling_layer,
-            "packageName": package_name,
-            "schema": database_schema,
-            "tags": tags,
-            "uniqueIds": unique_ids,
-        },
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(
-        response, ["data", "environment", "applied", "models", "edges"]
+    return query_engine.execute(
+        "get_models",
+        unique_ids=unique_ids,
+        environment_id=environment_id,
+        access=access,
+        database=database,
+        group=group,
+        identifier=identifier,
+        last_run_status=last_run_status,
+        modeling_layer=modeling_layer,
+        package_name=package_name,
+        database_schema=database_schema,
+        tags=tags,
     )
 
 
@@ -462,100 +388,244 @@ def get_recent_resource_changes(
         environment_id (int, optional): Environment ID. Defaults to None.
         number_of_days (int, optional): Number of days to look back. Defaults to 7.
     """
-    client = get_client()
-    query = """
-    query Environment($environmentId: BigInt!, $after: String, $first: Int, $numDays: Int!) {
-    environment(id: $environmentId) {
-        applied {
-        recentResourceChanges(after: $after, first: $first, numDays: $numDays) {
-            totalCount
-            pageInfo {
-            endCursor
-            hasNextPage
-            hasPreviousPage
-            startCursor
-            }
-            edges {
-            cursor
-            node {
-                changes
-                accountId
-                environmentId
-                gitSha
-                jobDefinitionId
-                mostRecentChangedAt
-                projectId
-                resource {
-                ... on ExposureAppliedStateNestedNode {
-                    name
-                    resourceType
-                    uniqueId
-                }
-                ... on ExternalModelNode {
-                    name
-                    resourceType
-                    uniqueId
-                }
-                ... on MacroDefinitionNestedNode {
-                    name
-                    resourceType
-                    uniqueId
-                }
-                ... on MetricDefinitionNestedNode {
-                    name
-                    resourceType
-                    uniqueId
-                }
-                ... on ModelAppliedStateNestedNode {
-                    name
-                    resourceType
-                    uniqueId
-                }
-                ... on SeedAppliedStateNestedNode {
-                    name
-                    resourceType
-                    uniqueId
-                }
-                ... on SemanticModelDefinitionNestedNode {
-                    name
-                    resourceType
-                    uniqueId
-                }
-                ... on SnapshotAppliedStateNestedNode {
-                    name
-                    resourceType
-                    uniqueId
-                }
-                ... on SourceAppliedStateNestedNode {
-                    name
-                    resourceType
-                    uniqueId
-                }
-                ... on TestAppliedStateNestedNode {
-                    name
-                    resourceType
-                    uniqueId
-                }
-                }
-                runId
-                uniqueId
-            }
-            }
+    return query_engine.execute(
+        "get_recent_resource_changes",
+        environment_id=environment_id,
+        number_of_days=number_of_days,
+    )
+
+
+@tool
+def detect_performance_change(
+    unique_ids: List[str] = None,
+    *,
+    changed_at: str = None,
+    number_of_days: int = 7,
+    days_before_change: int = DEFAULT_DAYS_AGO,
+    environment_id: int = None,
+    alpha: float = 0.05,
+    min_change_pct: float = 10.0,
+) -> str:
+    """Answer "did my change affect performance?" for models that changed recently.
+
+    For every model changed in the last `number_of_days` days, the execution times
+    before and after its most recent change are compared with a Mann-Whitney U test
+    and CUSUM is used to find where the execution time actually shifted.  Returns a
+    table with a verdict (slower, faster, no significant change or not enough runs),
+    median execution time before and after, the change in percent, the effect size
+    (-1 = every run after is faster, 1 = every run after is slower) and the p-value.
+    Models whose history couldn't be looked up are listed below the table.
+
+    Prefer this tool over get_model_performance_history when asked whether a change
+    impacted performance.
+
+    Args:
+        unique_ids (List[str], optional): Unique IDs of the models to check.
+            Defaults to every model changed in the last `number_of_days` days.
+        changed_at (str, optional): When the change happened in the format
+            YYYY-MM-DD, for models without a recorded change. Defaults to None.
+        number_of_days (int, optional): Number of days to look back for changes.
+            Defaults to 7.
+        days_before_change (int, optional): Number of days of history to compare
+            against before the earliest change. Defaults to 14.
+        environment_id (int, optional): Environment ID. Defaults to None.
+        alpha (float, optional): Significance level. Defaults to 0.05.
+        min_change_pct (float, optional): Smallest change in median execution time
+            reported as slower or faster. Defaults to 10.0.
+    """
+    environment_id = int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
+    changes = query_engine.execute(
+        "get_recent_resource_changes",
+        raw=True,
+        environment_id=environment_id,
+        number_of_days=number_of_days,
+    )
+    if isinstance(changes, str):
+        return changes
+
+    changes_by_model = {}
+    for edge in changes:
+        node = edge["node"]
+        resource_type = (node.get("resource") or {}).get("resourceType") or ""
+        if resource_type.lower() != "model" or not node.get("mostRecentChangedAt"):
+            continue
+
+        unique_id = node["uniqueId"]
+        changes_by_model[unique_id] = max(
+            node["mostRecentChangedAt"], changes_by_model.get(unique_id, "")
+        )
+
+    if changed_at:
+        for unique_id in unique_ids or []:
+            changes_by_model.setdefault(unique_id, changed_at)
+
+    unique_ids = [
+        unique_id
+        for unique_id in (unique_ids or sorted(changes_by_model))
+        if unique_id in changes_by_model
+    ]
+    if not unique_ids:
+        return (
+            f"No model changes found in the last {number_of_days} days.  Provide "
+            "`changed_at` to check specific models."
+        )
+
+    change_times = to_datetime64(changes_by_model[u] for u in unique_ids)
+    earliest = change_times.min().astype(datetime).date()
+    start_date, end_date = create_date_range(
+        (earliest - timedelta(days=days_before_change)).strftime("%Y-%m-%d")
+    )
+    history = _get_execution_history(unique_ids, start_date, end_date, environment_id)
+    # Models whose history lookup failed are reported below the table instead
+    change_times = to_datetime64(changes_by_model[u] for u in history.unique_ids)
+    rows = detect_changes(
+        history, change_times, alpha=alpha, min_change_pct=min_change_pct
+    )
+    # Lead with the models that changed the most
+    rows.sort(key=lambda row: -abs(np.nan_to_num(row["effect"])))
+    table = to_markdown_table(rows, precision=2) if rows else ""
+    return _with_failed_lookups(table, history.errors, "execution history")
+
+
+def _get_model_states(
+    environment_id: int, unique_ids: List[str] = None
+) -> Union[Dict[str, Dict], str]:
+    edges = query_engine.execute(
+        "get_model_states",
+        raw=True,
+        environment_id=environment_id,
+        unique_ids=unique_ids,
+    )
+    if isinstance(edges, str):
+        return edges
+
+    states = {}
+    for edge in edges:
+        execution_info = edge["node"].get("executionInfo") or {}
+        states[edge["node"]["uniqueId"]] = {
+            "execution_time_s": execution_info.get("executionTime"),
+            "last_run_status": execution_info.get("lastRunStatus"),
+            "last_run_at": execution_info.get("executeCompletedAt"),
         }
+    return states
+
+
+def _get_model_performance(
+    environment_id: int, unique_ids: List[str], start_date: str, end_date: str
+) -> Union[Dict[str, Dict], str]:
+    history = _get_execution_history(unique_ids, start_date, end_date, environment_id)
+    if history.errors and not history.unique_ids:
+        return _failed_lookups(history.errors, "execution history")
+
+    end = np.datetime64(end_date) + np.timedelta64(1, "D")
+    return {
+        row["unique_id"]: {
+            "runs": row["runs"],
+            "failures": row["failures"],
+            "p50_s": row["p50_s"],
+            "p95_s": row["p95_s"],
         }
+        for row in summarize_execution_history(history, end=end)
+        if row["runs"]
     }
-    }
+
+
+@tool
+def compare_environments(
+    environment_ids: List[int],
+    unique_ids: List[str] = None,
+    *,
+    compare: Literal["latest_run", "performance"] = "latest_run",
+    start_date: str = None,
+    end_date: str = None,
+    timeout: float = ENVIRONMENT_TIMEOUT,
+) -> str:
+    """Compare models across several environments (e.g. prod vs staging) in one call.
+
+    The same query runs against every environment concurrently and the results are
+    aligned by unique ID into a single table.  The first environment is the
+    baseline: for every other environment the percent difference in execution time
+    from the baseline is included.  Environments that fail or don't answer within
+    `timeout` seconds are listed below the table.
+
+    Args:
+        environment_ids (List[int]): Environment IDs to compare, baseline first.
+        unique_ids (List[str], optional): Unique IDs of the models to compare.
+            Required when comparing performance. Defaults to every model.
+        compare ("latest_run", "performance", optional): Compare the latest run of
+            each model (execution time and status) or the execution history
+            between `start_date` and `end_date` (runs, failures, p50/p95 execution
+            time). Defaults to "latest_run".
+        start_date (str, optional): Start date in the format YYYY-MM-DD.
+            Defaults to None.
+        end_date (str, optional): End date in the format YYYY-MM-DD.
+            Defaults to None.
+        timeout (float, optional): Seconds to wait for each environment.
+            Defaults to 30.
     """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-        "first": FIRST_N_RESULTS,
-        "after": None,
-        "numDays": number_of_days,
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(
-        response, ["data", "environment", "applied", "recentResourceChanges", "edges"]
+    environment_ids = list(dict.fromkeys(int(e) for e in environment_ids))
+    if compare == "performance":
+        if not unique_ids:
+            return "Provide the unique IDs of the models to compare performance for."
+
+        start_date, end_date = create_date_range(start_date, end_date)
+        metric = "p50_s"
+        results, errors = _fan_out(
+            lambda environment_id: _get_model_performance(
+                environment_id, unique_ids, start_date, end_date
+            ),
+            environment_ids,
+            timeout,
+        )
+    else:
+        metric = "execution_time_s"
+        results, errors = _fan_out(
+            lambda environment_id: _get_model_states(environment_id, unique_ids),
+            environment_ids,
+            timeout,
+        )
+
+    answered = [e for e in environment_ids if e in results]
+    # Requested models first, then anything else an environment returned
+    aligned_ids = dict.fromkeys(unique_ids or [])
+    for environment_id in answered:
+        aligned_ids.update(dict.fromkeys(results[environment_id]))
+
+    rows = []
+    baseline = answered[0] if answered else None
+    for unique_id in aligned_ids:
+        row = {"unique_id": unique_id}
+        for environment_id in answered:
+            values = results[environment_id].get(unique_id, {})
+            for name, value in values.items():
+                row[f"{name} ({environment_id})"] = value
+
+        base_value = (
+            results[baseline].get(unique_id, {}).get(metric) if answered else None
+        )
+        for environment_id in answered[1:]:
+            value = results[environment_id].get(unique_id, {}).get(metric)
+            row[f"vs {baseline} % ({environment_id})"] = (
+                (value - base_value) / base_value * 100
+                if value is not None and base_value
+                else None
+            )
+        rows.append(row)
+
+    names = {name: None for r in results.values() for v in r.values() for name in v}
+    columns = (
+        ["unique_id"]
+        + [f"{name} ({e})" for e in answered for name in names]
+        + [f"vs {baseline} % ({e})" for e in answered[1:]]
     )
+    table = to_markdown_table(rows, columns)
+    if errors:
+        table += "\n\n" + "\n".join(
+            f"Environment {environment_id}: {error}"
+            for environment_id, error in errors.items()
+        )
+
+    return table
 
 
 @tool
@@ -565,21 +635,7 @@ def get_resource_counts(environment_id: int = None) -> Dict:
     Args:
         environment_id (int, optional): Environment ID. Defaults to None.
     """
-    client = get_client()
-    query = """
-    query Environment($environmentId: BigInt!) {
-    environment(id: $environmentId) {
-        applied {
-        resourceCounts
-        }
-    }
-    }
-    """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
-    }
-    response = client.metadata.query(query, variables)
-    return response["data"]["environment"]["applied"]["resourceCounts"]
+    return query_engine.execute("get_resource_counts", environment_id=environment_id)
 
 
 @tool
@@ -589,23 +645,7 @@ def get_project_tags(environment_id: int = None) -> List[Dict]:
     Args:
         environment_id (int, optional): Environment ID. Defaults to None.
     """
-    client = get_client()
-    query = """
-    query Environment($environmentId: BigInt!) {
-    environment(id: $environmentId) {
-        applied {
-        tags {
-            name
-        }
-        }
-    }
-    }
-    """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(response, ["data", "environment", "applied", "tags"])
+    return query_engine.execute("get_project_tags", environment_id=environment_id)
 
 
 @tool
@@ -630,89 +670,15 @@ def get_sources(
         source_names (List[str], optional): Filter by source names. Defaults to None.
         tags (List[str], optional): Filter by tags. Defaults to None.
     """
-    client = get_client()
-    query = """
-query Environment($environmentId: BigInt!, $after: String, $filter: SourceAppliedFilter, $first: Int) {
-  environment(id: $environmentId) {
-    applied {
-      sources(after: $after, filter: $filter, first: $first) {
-        edges {
-          cursor
-          node {
-            accountId
-            database
-            children {
-              ... on ExposureAppliedStateNestedNode {
-                name
-                uniqueId
-                description
-                url
-              }
-              ... on MetricDefinitionNestedNode {
-                name
-                description
-                uniqueId
-                resourceType
-              }
-              ... on ModelAppliedStateNestedNode {
-                name
-                description
-                uniqueId
-              }
-            }
-            description
-            fqn
-            freshness {
-              freshnessChecked
-              freshnessJobDefinitionId
-              freshnessRunGeneratedAt
-              freshnessRunId
-              freshnessStatus
-              maxLoadedAt
-              maxLoadedAtTimeAgoInS
-              snapshottedAt
-            }
-            identifier
-            loader
-            meta
-            name
-            projectId
-            resourceType
-            schema
-            sourceDescription
-            sourceName
-            tags
-            uniqueId
-          }
-        }
-        pageInfo {
-          endCursor
-          hasNextPage
-          hasPreviousPage
-          startCursor
-        }
-        totalCount
-      }
-    }
-  }
-}
-    """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-        "first": FIRST_N_RESULTS,
-        "after": None,
-        "filter": {
-            "database": database,
-            "freshnessChecked": freshness_checked,
-            "schema": database_schema,
-            "sourceNames": source_names,
-            "tags": tags,
-            "uniqueIds": unique_ids,
-        },
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(
-        response, ["data", "environment", "applied", "sources", "edges"]
+    return query_engine.execute(
+        "get_sources",
+        unique_ids=unique_ids,
+        environment_id=environment_id,
+        database=database,
+        freshness_checked=freshness_checked,
+        database_schema=database_schema,
+        source_names=source_names,
+        tags=tags,
     )
 
 
@@ -727,63 +693,8 @@ def get_groups(
         environment_id (int, optional): Environment ID. Defaults to None.
         unique_ids (List[str], optional): Filter by unique IDs. Defaults to None.
     """
-    client = get_client()
-    query = """
-query Definition($environmentId: BigInt!, $after: String, $filter: GroupFilter, $first: Int) {
-  environment(id: $environmentId) {
-    definition {
-      groups(after: $after, filter: $filter, first: $first) {
-        pageInfo {
-          endCursor
-          hasNextPage
-          hasPreviousPage
-          startCursor
-        }
-        totalCount
-        edges {
-          node {
-            accountId
-            description
-            environmentId
-            meta
-            modelCount
-            name
-            ownerEmail
-            ownerName
-            packageName
-            projectId
-            runGeneratedAt
-            resourceType
-            uniqueId
-            models {
-              materializedType
-              name
-              description
-              resourceType
-              runGeneratedAt
-              runId
-              schema
-              uniqueId
-              database
-            }
-          }
-        }
-      }
-    }
-  }
-}
-    """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-        "first": FIRST_N_RESULTS,
-        "after": None,
-        "filter": {
-            "uniqueIds": unique_ids,
-        },
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(
-        response, ["data", "environment", "definition", "groups", "edges"]
+    return query_engine.execute(
+        "get_groups", environment_id=environment_id, unique_ids=unique_ids
     )
 
 
@@ -801,6 +712,10 @@ def get_semantic_models(
     sources feed into those semantic models and what metrics are created from the
     measures within the semantic model.
 
+    Results come back as a node table, with the requested semantic models first
+    (marked `matched`) followed by their ancestors and children, and an edge list of
+    upstream -> downstream unique IDs.
+
     Args:
         environment_id (int, optional): Environment ID. Defaults to None.
         unique_ids (List[str], optional): Filter by unique IDs. Defaults to None.
@@ -809,114 +724,14 @@ def get_semantic_models(
         tags (List[str], optional): Filter by tags. Defaults to None.
         identifier (str, optional): Filter by identifier. Defaults to None.
     """
-    client = get_client()
-    query = """
-query Definition($environmentId: BigInt!, $after: String, $filter: GenericMaterializedFilter, $first: Int) {
-  environment(id: $environmentId) {
-    definition {
-      semanticModels(after: $after, filter: $filter, first: $first) {
-        pageInfo {
-          endCursor
-          hasNextPage
-          hasPreviousPage
-          startCursor
-        }
-        totalCount
-        edges {
-          node {
-            ancestors {
-              ... on ExternalModelNode {
-                name
-                resourceType
-                description
-                database
-                schema
-                uniqueId
-              }
-              ... on ModelDefinitionNestedNode {
-                database
-                description
-                group
-                name
-                resourceType
-                schema
-                uniqueId
-              }
-              ... on SnapshotDefinitionNestedNode {
-                database
-                name
-                description
-                schema
-                uniqueId
-              }
-              ... on SourceDefinitionNestedNode {
-                description
-                database
-                name
-                resourceType
-                schema
-                sourceName
-                sourceDescription
-                uniqueId
-              }
-            }
-            children {
-              ... on MetricDefinitionNestedNode {
-                description
-                filter
-                formula
-                group
-                name
-                resourceType
-                type
-                typeParams
-                uniqueId
-              }
-            }
-            description
-            dimensions {
-              description
-              name
-              type
-            }
-            entities {
-              description
-              name
-              type
-            }
-            measures {
-              agg
-              createMetric
-              description
-              expr
-              name
-            }
-            name
-            resourceType
-            tags
-            uniqueId
-          }
-        }
-      }
-    }
-  }
-}
-    """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-        "first": FIRST_N_RESULTS,
-        "after": None,
-        "filter": {
-            "database": database,
-            "schema": database_schema,
-            "tags": tags,
-            "uniqueIds": unique_ids,
-            "identifier": identifier,
-        },
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(
-        response, ["data", "environment", "definition", "semanticModels", "edges"]
+    return query_engine.execute(
+        "get_semantic_models",
+        environment_id=environment_id,
+        unique_ids=unique_ids,
+        database=database,
+        database_schema=database_schema,
+        tags=tags,
+        identifier=identifier,
     )
 
 
@@ -932,6 +747,10 @@ def get_metrics(
 ) -> List[Dict]:
     """Get a list of metrics in a user's dbt Cloud project.
 
+    Results come back as a node table, with the requested metrics first (marked
+    `matched`) followed by their ancestors and children, and an edge list of
+    upstream -> downstream unique IDs.
+
     Args:
         unique_ids (List[str], required): Filter by unique IDs.
         environment_id (int, optional): Environment ID. Defaults to None.
@@ -940,65 +759,14 @@ def get_metrics(
         tags (List[str], optional): Filter by tags. Defaults to None.
         identifier (str, optional): Filter by identifier. Defaults to None.
     """
-    client = get_client()
-    query = """
-query Definition($environmentId: BigInt!, $after: String, $filter: GenericMaterializedFilter, $first: Int) {
-  environment(id: $environmentId) {
-    definition {
-      metrics(after: $after, filter: $filter, first: $first) {
-        pageInfo {
-          endCursor
-          hasNextPage
-          hasPreviousPage
-          startCursor
-        }
-        totalCount
-        edges {
-          node {
-            ancestors {
-              description
-              name
-              resourceType
-              uniqueId
-            }
-            children {
-              description
-              name
-              resourceType
-              uniqueId
-            }
-            description
-            filter
-            formula
-            group
-            name
-            meta
-            resourceType
-            type
-            uniqueId
-            tags
-          }
-        }
-      }
-    }
-  }
-}
-    """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-        "first": FIRST_N_RESULTS,
-        "after": None,
-        "filter": {
-            "database": database,
-            "schema": database_schema,
-            "tags": tags,
-            "uniqueIds": unique_ids,
-            "identifier": identifier,
-        },
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(
-        response, ["data", "environment", "definition", "metrics", "edges"]
+    return query_engine.execute(
+        "get_metrics",
+        unique_ids=unique_ids,
+        environment_id=environment_id,
+        database=database,
+        database_schema=database_schema,
+        tags=tags,
+        identifier=identifier,
     )
 
 
@@ -1020,27 +788,13 @@ def get_most_queried_resources(
         resource_type (Literal["model", "source"], optional): Resource type to filter by.
             Defaults to "model".
     """
-    client = get_client()
-    query = """
-    query MostQueriedResources($end: Date!, $start: Date!, $environmentId: BigInt!, $limit: Int, $resourceType: [MostQueriedResourceType!]!) {
-        performance(environmentId: $environmentId) {
-            mostQueriedResources(end: $end, start: $start, limit: $limit, resourceType: $resourceType) {
-            totalCount
-            uniqueId
-            }
-        }
-    }
-    """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-        "start": start or (datetime.now() - timedelta(months=1)).strftime("%Y-%m-%d"),
-        "end": end or datetime.now().strftime("%Y-%m-%d"),
-        "limit": limit,
-        "resourceType": [resource_type],
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(
-        response, ["data", "performance", "mostQueriedResources"]
+    return query_engine.execute(
+        "get_most_queried_resources",
+        environment_id=environment_id,
+        start=start,
+        end=end,
+        limit=limit,
+        resource_type=resource_type,
     )
 
 
@@ -1062,26 +816,140 @@ def get_resource_query_history(
         start (str, optional): Start date in the format YYYY-MM-DD. Defaults to None.
         end (str, optional): End date in the format YYYY-MM-DD. Defaults to None.
     """
-    client = get_client()
-    query = """
-    query ResourceQueryHistory($environmentId: BigInt!, $end: Date!, $uniqueId: String!, $start: Date!) {
-        performance(environmentId: $environmentId) {
-            resourceQueryHistory(end: $end, uniqueId: $uniqueId, start: $start) {
-                date
-                totalCount
-            }
+    return query_engine.execute(
+        "get_resource_query_history",
+        unique_id=unique_id,
+        environment_id=environment_id,
+        start=start,
+        end=end,
+    )
+
+
+def _get_query_histories(
+    unique_ids: List[str], environment_id: int, start: str, end: str
+) -> Dict[str, Union[List[Dict], str]]:
+    """Look up the query history of many resources with one aliased
+    `resourceQueryHistory` field per resource, `QUERY_HISTORY_BATCH_SIZE` resources
+    per request and requests sent concurrently.
+    """
+    batches = [
+        unique_ids[i : i + QUERY_HISTORY_BATCH_SIZE]
+        for i in range(0, len(unique_ids), QUERY_HISTORY_BATCH_SIZE)
+    ]
+
+    def query_batch(batch: List[str]) -> Dict[str, Union[List[Dict], str]]:
+        performance = query_engine.execute(
+            resource_query_histories_query(len(batch)),
+            raw=True,
+            environment_id=environment_id,
+            start=start,
+            end=end,
+            unique_ids=batch,
+        )
+        if isinstance(performance, str):
+            return {unique_id: performance for unique_id in batch}
+
+        return {
+            unique_id: performance.get(f"r{i}") or []
+            for i, unique_id in enumerate(batch)
         }
-    }
+
+    histories = {}
+    for result in map_concurrently(query_batch, batches):
+        histories.update(result)
+    return histories
+
+
+@tool
+def get_bulk_resource_query_history(
+    unique_ids: List[str] = None,
+    *,
+    environment_id: int = None,
+    start: str = None,
+    end: str = None,
+    limit: int = 20,
+    resource_type: Literal["model", "source"] = "model",
+    window_days: int = 7,
+) -> str:
+    """Summarize how often many resources have been queried, as one table: total
+    and daily average queries, active days, the busiest day, queries in the last
+    `window_days` days vs the `window_days` before, the change in percent and the
+    trend (queries per day).
+
+    Prefer this tool over get_resource_query_history when asked about usage of more
+    than one resource.
+
+    Args:
+        unique_ids (List[str], optional): Unique IDs of the resources. Defaults to
+            the `limit` most queried resources.
+        environment_id (int, optional): Environment ID. Defaults to None.
+        start (str, optional): Start date in the format YYYY-MM-DD. Defaults to None.
+        end (str, optional): End date in the format YYYY-MM-DD. Defaults to None.
+        limit (int, optional): Number of most queried resources to summarize when
+            no unique IDs are given. Defaults to 20.
+        resource_type (Literal["model", "source"], optional): Resource type of the
+            most queried resources. Defaults to "model".
+        window_days (int, optional): Length of the windows compared. Defaults to 7.
     """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-        "uniqueId": unique_id,
-        "start": start or (datetime.now() - timedelta(months=1)).strftime("%Y-%m-%d"),
-        "end": end or datetime.now().strftime("%Y-%m-%d"),
+    environment_id = int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
+    start, end = create_date_range(start, end)
+    if not unique_ids:
+        most_queried = query_engine.execute(
+            "get_most_queried_resources",
+            raw=True,
+            environment_id=environment_id,
+            start=start,
+            end=end,
+            limit=limit,
+            resource_type=resource_type,
+        )
+        if isinstance(most_queried, str):
+            return most_queried
+
+        unique_ids = [resource["uniqueId"] for resource in most_queried]
+
+    histories = _get_query_histories(list(unique_ids), environment_id, start, end)
+    rows = summarize_query_history(
+        *query_history_matrix(histories, start, end), window_days=window_days
+    )
+    rows.sort(key=lambda row: -row["total_queries"])
+    table = to_markdown_table(rows) if rows else ""
+
+    # Lookups that failed are left out of the table, not shown as never queried
+    errors = {
+        unique_id: records
+        for unique_id, records in histories.items()
+        if not isinstance(records, list)
     }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(
-        response, ["data", "performance", "resourceQueryHistory"]
+    return _with_failed_lookups(table, errors, "query history")
+
+
+def _resources_key(environment_id: int, resource_types: List[str]) -> str:
+    return make_key(
+        "get_resources",
+        environment_id=environment_id,
+        resource_types=sorted(resource_types),
+    )
+
+
+def prefetch_discovery_api(group: str = None) -> None:
+    """Start fetching the resources the Discovery API Assistant almost always looks up
+    first, while its LLM call is still in flight.
+    """
+    environment_id = os.getenv("DBT_CLOUD_ENVIRONMENT_ID", None)
+    if environment_id is None:
+        return
+
+    environment_id = int(environment_id)
+    resource_types = ["Model"]
+    prefetcher.submit(
+        _resources_key(environment_id, resource_types),
+        query_engine.execute,
+        "get_resources",
+        raw=True,
+        environment_id=environment_id,
+        resource_types=resource_types,
+        group=group,
     )
 
 
@@ -1113,50 +981,162 @@ def get_resources(
         unique_ids (List[str], optional): Filter by unique IDs. Defaults to None.
         tags (List[str], optional): Filter by tags. Defaults to None.
     """
-    client = get_client()
-    query = """
-query Resources($filter: DefinitionResourcesFilter!, $environmentId: BigInt!, $after: String, $first: Int) {
-  environment(id: $environmentId) {
-    definition {
-      resources(filter: $filter, after: $after, first: $first) {
-        pageInfo {
-          endCursor
-          hasNextPage
-          hasPreviousPage
-          startCursor
-        }
-        totalCount
-        edges {
-          node {
-            description
-            name
-            resourceType
-            tags
-            uniqueId
-          }
-        }
-      }
-    }
-  }
-}
+    environment_id = int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
+    resources = prefetcher.get(
+        _resources_key(environment_id, resource_types),
+        query_engine.execute,
+        "get_resources",
+        raw=True,
+        environment_id=environment_id,
+        resource_types=resource_types,
+    )
+    return render_output(resources, "csv", name="resources")
+
+
+@tool
+def search_project(
+    query: str,
+    *,
+    resource_type: Literal["model", "source"] = None,
+    limit: int = 10,
+    environment_id: int = None,
+) -> str:
+    """Search the names, descriptions, tags and columns (names and descriptions) of
+    every model and source in a user's dbt Cloud project, e.g. "which models have a
+    customer_id column?" or "where is ARR defined?".  Returns the best matching
+    unique IDs, ranked, with the columns that matched.
+
+    Prefer this tool over get_resources or get_models when looking for resources by
+    what they contain rather than by unique ID.  Typos and partial names are fine.
+
+    Args:
+        query (str): Words to search for, e.g. "customer_id" or "annual recurring
+            revenue".
+        resource_type (Literal["model", "source"], optional): Only return this type
+            of resource. Defaults to None.
+        limit (int, optional): Number of results to return. Defaults to 10.
+        environment_id (int, optional): Environment ID. Defaults to None.
     """
-    variables = {
-        "environmentId": int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"]),
-        "first": FIRST_N_RESULTS,
-        "after": None,
-        "filter": {
-            "types": resource_types,
-        },
-    }
-    response = client.metadata.query(query, variables)
-    return _extract_nested_edges(
-        response, ["data", "environment", "definition", "resources", "edges"]
+    environment_id = int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
+    search = get_project_search(environment_id)
+    error = search.ensure_current()
+    if error is not None and not len(search.index):
+        return error
+
+    rows = search.search(query, limit=limit, resource_type=resource_type)
+    if not rows:
+        return f"Nothing in the project matches {query!r}."
+
+    return to_markdown_table(rows, precision=2)
+
+
+@tool
+def get_stale_sources(
+    stale_after_hours: float = None,
+    *,
+    source_names: List[str] = None,
+    limit: int = 50,
+    environment_id: int = None,
+) -> str:
+    """Find the stale sources in a user's dbt Cloud project: those whose freshness
+    check warned or errored, or - when `stale_after_hours` is given - that haven't
+    been loaded for that long.  Returns how many sources fall in each staleness
+    bucket (time since last loaded) and freshness status, then only the offenders,
+    stalest first.
+
+    Prefer this tool over get_sources for any question about source freshness; it
+    doesn't need unique IDs.
+
+    Args:
+        stale_after_hours (float, optional): Also count sources not loaded for this
+            many hours as stale. Defaults to None.
+        source_names (List[str], optional): Only look at these sources (the name of
+            the source, not the table). Defaults to None.
+        limit (int, optional): Most offenders returned. Defaults to 50.
+        environment_id (int, optional): Environment ID. Defaults to None.
+    """
+    environment_id = int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
+    freshness = get_source_freshness(environment_id)
+    error = freshness.ensure_current()
+    if error is not None and freshness.built_at is None:
+        return error
+
+    summary = summarize_freshness(
+        freshness.table,
+        np.datetime64("now", "s"),
+        stale_after_hours=stale_after_hours,
+        source_names=source_names,
+        limit=limit,
+    )
+    buckets = ", ".join(f"{label}: {n}" for label, n in summary["buckets"].items())
+    statuses = ", ".join(f"{status}: {n}" for status, n in summary["statuses"].items())
+    lines = [
+        f"{summary['offenders']} of {summary['sources']} sources are stale.",
+        f"Since last loaded - {buckets}.",
+        f"Freshness status - {statuses}.",
+    ]
+    if summary["rows"]:
+        lines += ["", to_markdown_table(summary["rows"])]
+    return "\n".join(lines)
+
+
+@tool
+def get_failing_tests(
+    sort_by: Literal["failure_rate", "flakiness", "failures"] = "failure_rate",
+    *,
+    days: int = None,
+    min_runs: int = 1,
+    limit: int = 20,
+    environment_id: int = None,
+) -> str:
+    """Rank the tests in a user's dbt Cloud project by how often they fail or how
+    flaky they are, e.g. "which tests fail most often?".  Flakiness is the share of
+    consecutive runs where a test switched between passing and failing (1 = fails
+    every other run).  Only tests that failed or warned at least once are listed.
+
+    Results are collected from every test at once and kept between calls, so the
+    history covers the runs seen since results were first collected.
+
+    Args:
+        sort_by (Literal["failure_rate", "flakiness", "failures"], optional): What
+            to rank by. Defaults to "failure_rate".
+        days (int, optional): Only results from the last number of days. Defaults
+            to None (all collected results).
+        min_runs (int, optional): Leave out tests with fewer runs. Defaults to 1.
+        limit (int, optional): Number of tests to return. Defaults to 20.
+        environment_id (int, optional): Environment ID. Defaults to None.
+    """
+    environment_id = int(environment_id or os.environ["DBT_CLOUD_ENVIRONMENT_ID"])
+    store = get_test_history(environment_id)
+    error = store.ensure_current()
+    history = store.history
+    if error is not None and not len(history):
+        return error
+
+    since = None
+    if days is not None:
+        since = np.datetime64("now", "s") - np.timedelta64(days, "D")
+    rows = summarize_test_history(
+        history, since=since, min_runs=min_runs, sort_by=sort_by, limit=limit
+    )
+    runs = len(np.unique(history.run_id))
+    header = (
+        f"{len(history.unique_ids)} tests, {len(history)} results from {runs} runs "
+        "collected."
     )
+    if not rows:
+        return f"{header}\nNo test has failed or warned."
+
+    return f"{header}\n\n{to_markdown_table(rows, precision=2)}"
 
 
 discovery_api_tools = [
+    compare_environments,
     # get_consumer_projects,
+    detect_performance_change,
+    get_bulk_resource_query_history,
     get_exposures,
+    get_failing_tests,
     get_groups,
     get_longest_executed_models,
     get_metrics,
@@ -1172,4 +1152,7 @@ discovery_api_tools = [
     get_resources,
     get_semantic_models,
     get_sources,
+    get_stale_sources,
+    search_project,
+    summarize_model_performance,
 ]
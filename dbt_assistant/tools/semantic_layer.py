@@ -6,15 +6,24 @@ from langchain_core.tools import tool
 
 # first party
 from dbt_assistant.tools.base_dbt_client import get_client
+from dbt_assistant.utils.prefetch import make_key, prefetcher
 
 
-@tool
-def get_dimensions_for_metrics(metrics: list[str]) -> Union[list[dict], str]:
-    """Get a list of all dimensions for a given list of metrics in a user's dbt project.
+def _list_metrics() -> Union[list[dict], str]:
+    client = get_client()
+    response = client.sl.list_metrics()
+    try:
+        metrics = response.get("data", {}).get("metrics", [])
+    except (KeyError, AttributeError):
+        return "No metrics found in the response."
 
-    Args:
-        metrics (list[str]): Names of metrics to get dimensions for.
-    """
+    if not metrics:
+        return "No metrics found in the response."
+
+    return metrics
+
+
+def _list_dimensions(metrics: list[str]) -> Union[list[dict], str]:
     client = get_client()
     response = client.sl.list_dimensions(metrics)
     try:
@@ -28,6 +37,26 @@ def get_dimensions_for_metrics(metrics: list[str]) -> Union[list[dict], str]:
     return dimensions
 
 
+def prefetch_semantic_layer(group: str = None) -> None:
+    """Start fetching the metric listing while the Semantic Layer Assistant's LLM
+    call is still in flight.
+    """
+    prefetcher.submit(make_key("list_metrics"), _list_metrics, group=group)
+
+
+@tool
+def get_dimensions_for_metrics(metrics: list[str]) -> Union[list[dict], str]:
+    """Get a list of all dimensions for a given list of metrics in a user's dbt project.
+
+    Args:
+        metrics (list[str]): Names of metrics to get dimensions for.
+    """
+    names = sorted(metrics)
+    return prefetcher.get(
+        make_key("list_dimensions", metrics=names), _list_dimensions, names
+    )
+
+
 @tool
 def get_dimension_values(dimension: str) -> Union[list[Any], str]:
     """Get a list of all values for a given dimension in a user's dbt project.
@@ -46,17 +75,7 @@ def get_dimension_values(dimension: str) -> Union[list[Any], str]:
 @tool
 def get_metrics() -> Union[list[dict], str]:
     """Get a list of all metrics in a user's dbt project."""
-    client = get_client()
-    response = client.sl.list_metrics()
-    try:
-        metrics = response.get("data", {}).get("metrics", [])
-    except (KeyError, AttributeError):
-        return "No metrics found in the response."
-
-    if not metrics:
-        return "No metrics found in the response."
-
-    return metrics
+    return prefetcher.get(make_key("list_metrics"), _list_metrics)
 
 
 semantic_layer_tools = [
@@ -0,0 +1,100 @@
+# stdlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+# first party
+from dbt_assistant.utils.rate_limit import dbt_cloud_rate_limiter
+
+BULK_WORKERS = int(os.getenv("DBT_CLOUD_BULK_WORKERS", 4))
+
+
+@dataclass
+class BulkAction:
+    """One mutation of a bulk operation.
+
+    Args:
+        target (str): What's acted on, e.g. "project 12".
+        description (str): What's done to it, e.g. "create env var DBT_FOO".
+        call (Callable): Sends the request given a `dbtCloudClient` and returns
+            the response.
+    """
+
+    target: str
+    description: str
+    call: Callable[[Any], Dict] = field(repr=False)
+
+
+def _error_message(response: Any) -> str:
+    try:
+        return response["status"]["user_message"] or "Unknown error."
+    except (KeyError, TypeError):
+        return "An unknown error occurred."
+
+
+def _run(action: BulkAction) -> Dict[str, Any]:
+    # Imported here as the tools package itself depends on this one
+    from dbt_assistant.tools.base_dbt_client import pooled_client
+
+    row = {"target": action.target, "action": action.description}
+    dbt_cloud_rate_limiter.acquire()
+    try:
+        with pooled_client() as client:
+            response = action.call(client)
+    except Exception as e:
+        return {**row, "result": "error", "id": None, "detail": str(e)}
+
+    if not isinstance(response, dict) or not response.get("status", {}).get(
+        "is_success"
+    ):
+        return {
+            **row,
+            "result": "error",
+            "id": None,
+            "detail": _error_message(response),
+        }
+
+    data = response.get("data")
+    created_id = data.get("id") if isinstance(data, dict) else None
+    return {**row, "result": "ok", "id": created_id, "detail": None}
+
+
+def run_bulk(
+    actions: List[BulkAction],
+    *,
+    dry_run: bool = True,
+    max_workers: int = BULK_WORKERS,
+) -> List[Dict[str, Any]]:
+    """Carry out many Admin API mutations concurrently on a bounded pool, each
+    respecting the shared dbt Cloud rate limit.  One failing doesn't stop the
+    others.
+
+    Args:
+        actions (List[BulkAction]): The mutations.
+        dry_run (bool, optional): Only list what would be done, without sending
+            anything. Defaults to True.
+        max_workers (int, optional): Most requests in flight at once.
+
+    Returns:
+        List[Dict[str, Any]]: One row per action, in order, with its target,
+            description, result ("dry run", "ok" or "error"), the ID of what it
+            created and any error message.
+    """
+    if dry_run:
+        return [
+            {
+                "target": action.target,
+                "action": action.description,
+                "result": "dry run",
+                "id": None,
+                "detail": None,
+            }
+            for action in actions
+        ]
+
+    if len(actions) <= 1:
+        return [_run(action) for action in actions]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(actions))) as executor:
+        return list(executor.map(_run, actions))
@@ -0,0 +1,368 @@
+# stdlib
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence
+from urllib.parse import urlsplit
+
+# third party
+import requests
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CASSETTE_PATH = "cassettes/default.jsonl"
+
+# Only these response headers are kept - anything else is noise (or a secret).
+# Bodies are stored decoded, so Content-Encoding is deliberately left out.
+RECORDED_HEADERS = ["Content-Type"]
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when no recorded interaction matches a request."""
+
+
+def _hash(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class Cassette:
+    """Records LLM and dbt Cloud HTTP interactions to a JSONL file and serves them back
+    deterministically.
+
+    Every interaction is stored with an exact key and a loose key.  The exact key
+    covers the full request; the loose key drops the parts that legitimately change
+    between runs (dates computed from "now", the current time in system prompts), so a
+    cassette recorded yesterday still replays today.  Interactions with the same key
+    are served in the order they were recorded, wrapping around once they've all been
+    served so a recording can be replayed repeatedly.
+
+    Args:
+        path (str): Location of the cassette file.
+        mode ("record", "replay"): Whether to record live interactions or serve
+            recorded ones.
+        latency ("original", "zero", optional): In replay mode, whether to sleep for
+            the originally recorded duration of each interaction. Defaults to "zero".
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: Literal["record", "replay"],
+        *,
+        latency: Literal["original", "zero"] = "zero",
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid cassette mode: {mode}")
+
+        if latency not in ("original", "zero"):
+            raise ValueError(f"Invalid cassette latency: {latency}")
+
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._exact: Dict[str, List[dict]] = defaultdict(list)
+        self._loose: Dict[str, List[dict]] = defaultdict(list)
+        if mode == "replay":
+            self._load()
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Start every recording from a clean slate
+            open(path, "w").close()
+
+    def _load(self):
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+
+                interaction = json.loads(line)
+                interaction["served"] = 0
+                self._exact[interaction["key"]].append(interaction)
+                self._loose[interaction["loose_key"]].append(interaction)
+
+    def record(
+        self,
+        kind: str,
+        key: str,
+        loose_key: str,
+        request: dict,
+        response: dict,
+        elapsed: float,
+    ):
+        interaction = {
+            "kind": kind,
+            "key": key,
+            "loose_key": loose_key,
+            "request": request,
+            "response": response,
+            "elapsed": elapsed,
+        }
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(interaction, default=str) + "\n")
+
+    def _next(self, interactions: List[dict]) -> Optional[dict]:
+        if not interactions:
+            return None
+
+        # The least served interaction, earliest recorded first
+        return min(interactions, key=lambda interaction: interaction["served"])
+
+    def play(self, kind: str, key: str, loose_key: str) -> dict:
+        """Return the next recorded interaction for a request, honoring the
+        configured latency.
+        """
+        with self._lock:
+            interaction = self._next(self._exact.get(key)) or self._next(
+                self._loose.get(loose_key)
+            )
+            if interaction is None:
+                raise CassetteMissError(
+                    f"No recorded {kind} interaction found in {self.path} for the "
+                    f"request (key={key}, loose_key={loose_key})."
+                )
+
+            interaction["served"] += 1
+
+        if self.latency == "original":
+            time.sleep(interaction["elapsed"])
+
+        return interaction["response"]
+
+
+# HTTP
+
+
+def _http_keys(request: requests.PreparedRequest) -> tuple[str, str]:
+    parts = urlsplit(request.url)
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode()
+
+    try:
+        payload = json.loads(body) if body else None
+    except ValueError:
+        payload = body.decode(errors="replace")
+
+    exact = _hash([request.method, request.url, payload])
+
+    # GraphQL requests are matched on the document alone, REST requests on the path
+    if isinstance(payload, dict) and "query" in payload:
+        loose_payload = " ".join(payload["query"].split())
+    else:
+        loose_payload = None
+    loose = _hash([request.method, parts.netloc, parts.path, loose_payload])
+    return exact, loose
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter that records or replays every request sent on a session."""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        key, loose_key = _http_keys(request)
+        if self.cassette.mode == "replay":
+            recorded = self.cassette.play("http", key, loose_key)
+            return self._build_replayed_response(request, recorded)
+
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        elapsed = time.perf_counter() - start
+        try:
+            body, encoding = content.decode("utf-8"), "text"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode(), "base64"
+
+        self.cassette.record(
+            "http",
+            key,
+            loose_key,
+            request={"method": request.method, "url": request.url},
+            response={
+                "status_code": response.status_code,
+                "reason": response.reason,
+                "headers": {
+                    name: response.headers[name]
+                    for name in RECORDED_HEADERS
+                    if name in response.headers
+                },
+                "body": body,
+                "encoding": encoding,
+            },
+            elapsed=elapsed,
+        )
+        return response
+
+    def _build_replayed_response(
+        self, request: requests.PreparedRequest, recorded: dict
+    ) -> requests.Response:
+        if recorded["encoding"] == "base64":
+            content = base64.b64decode(recorded["body"])
+        else:
+            content = recorded["body"].encode("utf-8")
+
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.reason = recorded["reason"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response._content = content
+        response._content_consumed = True
+        response.raw = io.BytesIO(content)
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def install_cassette(session: requests.Session, cassette: "Cassette" = None):
+    """Route every request sent on `session` through the active cassette (if any)."""
+    cassette = cassette or get_cassette()
+    if cassette is None:
+        return session
+
+    adapter = CassetteAdapter(cassette)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Other calls
+
+
+def through_cassette(kind: str, request: Any, call: Callable[[], Any]) -> Any:
+    """Return the result of `call`, recorded to or replayed from the active cassette.
+
+    For calls that don't go over a `requests` session (e.g. vector store lookups),
+    so they can't be routed through a `CassetteAdapter`.  `request` identifies the
+    call and the result must be JSON serializable.
+    """
+    cassette = get_cassette()
+    if cassette is None:
+        return call()
+
+    key = _hash([kind, request])
+    if cassette.mode == "replay":
+        return cassette.play(kind, key, key)["result"]
+
+    start = time.perf_counter()
+    result = call()
+    elapsed = time.perf_counter() - start
+    cassette.record(
+        kind, key, key, request=request, response={"result": result}, elapsed=elapsed
+    )
+    return result
+
+
+# LLM
+
+
+def _message_key(message: BaseMessage) -> dict:
+    return {
+        "type": message.type,
+        "content": message.content,
+        "tool_calls": [
+            {"name": tc["name"], "args": tc["args"]}
+            for tc in getattr(message, "tool_calls", [])
+        ],
+    }
+
+
+def _llm_keys(messages: List[BaseMessage], tools: List[dict]) -> tuple[str, str]:
+    tool_names = sorted(tool["function"]["name"] for tool in tools or [])
+    exact = _hash([[_message_key(m) for m in messages], tool_names])
+    # System prompts embed the current time, so they're left out of the loose key
+    loose = _hash(
+        [[_message_key(m) for m in messages if m.type != "system"], tool_names]
+    )
+    return exact, loose
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model that records the responses of a wrapped model, or replays recorded
+    responses without needing any provider credentials.
+    """
+
+    cassette: Any
+    llm: Optional[BaseChatModel] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs):
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tools = kwargs.pop("tools", None)
+        key, loose_key = _llm_keys(messages, tools)
+        if self.cassette.mode == "replay":
+            recorded = self.cassette.play("llm", key, loose_key)
+            message = messages_from_dict([recorded["message"]])[0]
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        llm = self.llm.bind_tools(tools, **kwargs) if tools else self.llm
+        start = time.perf_counter()
+        message = llm.invoke(messages, stop=stop)
+        elapsed = time.perf_counter() - start
+        self.cassette.record(
+            "llm",
+            key,
+            loose_key,
+            request={"messages": [message_to_dict(m) for m in messages]},
+            response={"message": message_to_dict(message)},
+            elapsed=elapsed,
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the cassette configured through the environment, if any.
+
+    Set `DBT_CASSETTE_MODE` to `record` or `replay` to turn it on.  The cassette is
+    stored at `DBT_CASSETTE_PATH` and `DBT_CASSETTE_LATENCY` (`original` or `zero`)
+    controls replay timings.
+    """
+    global _cassette
+    mode = os.getenv("DBT_CASSETTE_MODE", None)
+    if not mode:
+        return None
+
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(
+                os.getenv("DBT_CASSETTE_PATH", DEFAULT_CASSETTE_PATH),
+                mode,
+                latency=os.getenv("DBT_CASSETTE_LATENCY", "zero"),
+            )
+
+    return _cassette
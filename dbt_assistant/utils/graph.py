@@ -1,5 +1,5 @@
 # stdlib
-from typing import Callable
+from typing import Callable, List
 
 # third party
 from langchain_core.messages import ToolMessage
@@ -10,8 +10,17 @@ from langgraph.prebuilt import ToolNode
 from dbt_assistant.state import State
 
 
-def create_entry_node(assistant_name: str, new_dialog_state: str) -> Callable:
+def create_entry_node(
+    assistant_name: str,
+    new_dialog_state: str,
+    prefetch: List[Callable[[str], None]] = None,
+) -> Callable:
     def entry_node(state: State) -> dict:
+        # Kick off background lookups the specialist is likely to need so they run
+        # while its LLM call is in flight.
+        for start_prefetch in prefetch or []:
+            start_prefetch(new_dialog_state)
+
         tool_call_id = state["messages"][-1].tool_calls[0]["id"]
         return {
             "messages": [
@@ -0,0 +1,63 @@
+# stdlib
+from typing import Any, Dict, Iterable, List
+
+
+def _unwrap(record: Dict) -> Dict:
+    if "node" in record and set(record) <= {"cursor", "node"}:
+        return record["node"] or {}
+
+    return record
+
+
+def normalize_graph(
+    records: List[Dict], relations: Iterable[str] = ("ancestors", "children")
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Split records that embed their related nodes (e.g. `ancestors` and `children`)
+    into a node table and an edge list that refers to nodes by unique ID, so every
+    node - and its description - appears once no matter how often it's referenced.
+
+    Args:
+        records (List[Dict]): Nodes (or `{"node": ...}` edges) as returned by the
+            Discovery API.
+        relations (Iterable[str], optional): Fields holding related nodes.
+            `ancestors` point upstream, anything else downstream. Defaults to
+            ("ancestors", "children").
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: `nodes`, with the requested records first
+            (marked `matched`), and `edges` as `{upstream, downstream, relation}`.
+    """
+    relations = tuple(relations)
+    nodes: Dict[str, Dict[str, Any]] = {}
+    edges: Dict[tuple, Dict[str, str]] = {}
+
+    def add_node(node: Dict[str, Any]) -> str:
+        unique_id = node.get("uniqueId") or node.get("name")
+        existing = nodes.setdefault(unique_id, {})
+        for key, value in node.items():
+            if key not in relations and existing.get(key) is None:
+                existing[key] = value
+        return unique_id
+
+    for record in records:
+        node = _unwrap(record)
+        unique_id = add_node({"matched": True, **node})
+        for relation in relations:
+            for related in node.get(relation) or []:
+                related_id = add_node(related)
+                if relation == "ancestors":
+                    upstream, downstream = related_id, unique_id
+                else:
+                    upstream, downstream = unique_id, related_id
+                edges.setdefault(
+                    (upstream, downstream),
+                    {
+                        "upstream": upstream,
+                        "downstream": downstream,
+                        "relation": relation,
+                    },
+                )
+
+    matched = [node for node in nodes.values() if node.get("matched")]
+    related = [node for node in nodes.values() if not node.get("matched")]
+    return {"nodes": matched + related, "edges": list(edges.values())}
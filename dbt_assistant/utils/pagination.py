@@ -0,0 +1,143 @@
+# stdlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+
+# first party
+from dbt_assistant.utils.rate_limit import dbt_cloud_rate_limiter
+
+# Most results the Admin API returns per request
+PAGE_SIZE = 100
+PAGINATION_WORKERS = int(os.getenv("DBT_CLOUD_PAGINATION_WORKERS", 4))
+# Most results fetched for one call when no limit is given.  Kept low as the list
+# tools hand their results to the LLM; callers that need everything (e.g. to store
+# it locally) pass their own limit
+MAX_RESULTS = int(os.getenv("DBT_CLOUD_PAGINATION_MAX_RESULTS", 200))
+
+
+def _total_count(response: Dict) -> Optional[int]:
+    pagination = (response.get("extra") or {}).get("pagination") or {}
+    return pagination.get("total_count")
+
+
+def _is_success(response: Dict) -> bool:
+    return bool((response.get("status") or {}).get("is_success"))
+
+
+def _fetch_page(method: str, offset: int, limit: int, params: Dict) -> Dict:
+    # Imported here as the tools package itself depends on this one
+    from dbt_assistant.tools.base_dbt_client import pooled_client
+
+    dbt_cloud_rate_limiter.acquire()
+    with pooled_client() as client:
+        return getattr(client.cloud, method)(offset=offset, limit=limit, **params)
+
+
+def iter_pages(
+    method: str,
+    *,
+    offset: int = None,
+    limit: int = None,
+    max_workers: int = PAGINATION_WORKERS,
+    **params,
+) -> Iterator[Dict]:
+    """Yield every page of an Admin API list endpoint, in order.
+
+    The first page is fetched on its own for the total count; the rest are then
+    fetched concurrently on a bounded pool, each respecting the shared dbt Cloud
+    rate limit.  Endpoints that don't report a total are paged one at a time until
+    a page comes back short.
+
+    Args:
+        method (str): Name of the `dbtCloudClient.cloud` method, e.g. "list_runs".
+        offset (int, optional): Offset of the first result. Defaults to 0.
+        limit (int, optional): Most results to fetch. Defaults to `MAX_RESULTS`.
+        max_workers (int, optional): Most pages fetched at once.
+        **params: Any other arguments of the method.
+    """
+    start = offset or 0
+    end = start + (limit or MAX_RESULTS)
+    first = _fetch_page(method, start, min(PAGE_SIZE, end - start), params)
+    yield first
+    if not _is_success(first):
+        return
+
+    fetched = start + len(first.get("data") or [])
+    total = _total_count(first)
+    if total is None:
+        # No total to plan with - keep going while pages come back full
+        count = len(first.get("data") or [])
+        while count == PAGE_SIZE and fetched < end:
+            page = _fetch_page(method, fetched, min(PAGE_SIZE, end - fetched), params)
+            yield page
+            if not _is_success(page):
+                return
+            count = len(page.get("data") or [])
+            fetched += count
+        return
+
+    offsets = range(fetched, min(end, total), PAGE_SIZE)
+    if not offsets:
+        return
+
+    def fetch(page_offset: int) -> Dict:
+        return _fetch_page(
+            method, page_offset, min(PAGE_SIZE, end - page_offset), params
+        )
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(offsets)))
+    try:
+        # `map` yields in submission order, so pages stream out as soon as every
+        # page before them has arrived
+        yield from executor.map(fetch, offsets)
+    finally:
+        # Callers that stop early (e.g. on reaching data they already have) only
+        # wait for the pages already being fetched
+        executor.shutdown(cancel_futures=True)
+
+
+def paginate(
+    method: str,
+    *,
+    offset: int = None,
+    limit: int = None,
+    sink: Callable[[List[Dict]], None] = None,
+    **params,
+) -> Dict:
+    """Every result of an Admin API list endpoint, merged into a single response
+    shaped like one page of it.
+
+    Args:
+        method (str): Name of the `dbtCloudClient.cloud` method, e.g. "list_runs".
+        offset (int, optional): Offset of the first result. Defaults to 0.
+        limit (int, optional): Most results to fetch. Defaults to `MAX_RESULTS`.
+        sink (Callable, optional): Called with the results of every page, in
+            order, instead of keeping them in the response - e.g. to write them to
+            a local table as they arrive. Defaults to None.
+        **params: Any other arguments of the method.
+
+    Returns:
+        Dict: The first page's response with `data` holding every result (or none,
+            with a `sink`) and `extra.pagination` the number fetched.  If a page
+            fails, its response is returned instead.
+    """
+    merged, count, response = [], 0, None
+    for page in iter_pages(method, offset=offset, limit=limit, **params):
+        if not _is_success(page):
+            return page
+
+        data = page.get("data") or []
+        count += len(data)
+        if sink is not None:
+            sink(data)
+        else:
+            merged.extend(data)
+        if response is None:
+            response = page
+
+    extra = dict(response.get("extra") or {})
+    pagination = dict(extra.get("pagination") or {})
+    pagination["count"] = count
+    pagination.setdefault("total_count", count)
+    extra["pagination"] = pagination
+    return {**response, "data": merged, "extra": extra}
@@ -0,0 +1,142 @@
+# stdlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+# first party
+from dbt_assistant.utils.rate_limit import RateLimiter, dbt_cloud_rate_limiter
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_WORKERS = 2
+
+
+def make_key(name: str, **kwargs) -> str:
+    """Build a cache key out of a lookup name and its (JSON-able) arguments."""
+    return f"{name}:{json.dumps(kwargs, sort_keys=True, default=str)}"
+
+
+class _Entry:
+    def __init__(self, group: Optional[str]):
+        self.future: Optional[Future] = None
+        self.group = group
+        self.created_at = time.monotonic()
+        self.cancel_event = threading.Event()
+
+
+class Prefetcher:
+    """Runs likely-needed lookups in the background so later tool calls hit a warm
+    cache.
+
+    Prefetches are tagged with a group (the dialog state that requested them) so that
+    everything a specialist assistant asked for can be cancelled when it hands control
+    back to the primary assistant.
+
+    Args:
+        max_workers (int, optional): Number of background threads. Defaults to 2.
+        ttl (float, optional): Seconds a prefetched result stays valid.
+            Defaults to 300.
+        rate_limiter (RateLimiter, optional): Limiter every prefetch has to acquire
+            a token from before it runs. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        rate_limiter: RateLimiter = None,
+    ):
+        self.ttl = ttl
+        self.rate_limiter = rate_limiter
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="dbt-prefetch"
+        )
+        self._entries: dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, entry: _Entry) -> bool:
+        return (
+            not entry.cancel_event.is_set()
+            and not entry.future.cancelled()
+            and time.monotonic() - entry.created_at < self.ttl
+        )
+
+    def _run(self, entry: _Entry, func: Callable, args: tuple, kwargs: dict) -> Any:
+        if self.rate_limiter is not None and not self.rate_limiter.acquire(
+            cancel_event=entry.cancel_event
+        ):
+            raise CancelledError()
+
+        if entry.cancel_event.is_set():
+            raise CancelledError()
+
+        return func(*args, **kwargs)
+
+    def submit(
+        self,
+        key: Hashable,
+        func: Callable,
+        *args,
+        group: str = None,
+        **kwargs,
+    ) -> Future:
+        """Start a background lookup unless a fresh one already exists for `key`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry):
+                return entry.future
+
+            entry = _Entry(group)
+            entry.future = self._executor.submit(self._run, entry, func, args, kwargs)
+            self._entries[key] = entry
+            return entry.future
+
+    def get(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """Return the prefetched result for `key`, waiting on it if it's still in
+        flight, or call `func` directly if nothing usable was prefetched.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is not None and self._is_fresh(entry):
+            try:
+                return entry.future.result()
+            except CancelledError:
+                pass
+            except Exception:
+                # A failed prefetch shouldn't be cached - retry in the foreground
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+
+        return func(*args, **kwargs)
+
+    def cancel(self, group: str = None) -> int:
+        """Cancel prefetches for a group (or all of them when no group is given).
+
+        Returns:
+            int: The number of entries that were cancelled.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key, entry in self._entries.items()
+                if group is None or entry.group == group
+            ]
+            entries = [self._entries.pop(key) for key in keys]
+
+        for entry in entries:
+            entry.cancel_event.set()
+            entry.future.cancel()
+
+        return len(entries)
+
+
+prefetcher = Prefetcher(
+    max_workers=int(os.getenv("DBT_CLOUD_PREFETCH_WORKERS", DEFAULT_MAX_WORKERS)),
+    ttl=float(os.getenv("DBT_CLOUD_PREFETCH_TTL", DEFAULT_TTL_SECONDS)),
+    rate_limiter=dbt_cloud_rate_limiter,
+)
@@ -0,0 +1,80 @@
+# stdlib
+import os
+import threading
+import time
+
+DEFAULT_REQUESTS_PER_SECOND = 5
+
+
+class RateLimiter:
+    """Token bucket shared by everything that sends background requests to dbt Cloud.
+
+    Args:
+        rate (float): Number of requests allowed per second.
+        burst (int, optional): Number of requests that can be sent back to back
+            before throttling kicks in. Defaults to the rate (at least 1).
+    """
+
+    def __init__(self, rate: float, burst: int = None):
+        if rate <= 0:
+            raise ValueError("The rate must be greater than 0.")
+
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if one is available, otherwise return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+
+            return (1 - self._tokens) / self.rate
+
+    def acquire(
+        self, *, timeout: float = None, cancel_event: threading.Event = None
+    ) -> bool:
+        """Block until a request is allowed to go out.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait.
+                Defaults to None (wait forever).
+            cancel_event (threading.Event, optional): Stop waiting as soon as this
+                event is set. Defaults to None.
+
+        Returns:
+            bool: True if a token was acquired, False on timeout or cancellation.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+
+            wait = self._take()
+            if wait == 0:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+
+                wait = min(wait, remaining)
+
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+dbt_cloud_rate_limiter = RateLimiter(
+    float(os.getenv("DBT_CLOUD_REQUESTS_PER_SECOND", DEFAULT_REQUESTS_PER_SECOND))
+)
@@ -0,0 +1,232 @@
+# stdlib
+import csv
+import io
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional
+
+# third party
+import tiktoken
+
+# first party
+from dbt_assistant.analytics.columnar import to_markdown_table
+from dbt_assistant.utils.normalize import normalize_graph
+
+OutputFormat = Literal["csv", "markdown", "raw"]
+
+# Set to `raw` to hand tool results to the LLM untouched
+OUTPUT_FORMAT_OVERRIDE = os.getenv("DBT_CLOUD_OUTPUT_FORMAT")
+# Counting tokens isn't free, so savings are only measured when asked for
+MEASURE_TOKENS = os.getenv("DBT_CLOUD_MEASURE_TOKENS", "").lower() in ("1", "true")
+LIST_SEPARATOR = "; "
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def flatten(record: Dict, prefix: str = "") -> Dict[str, Any]:
+    """Flatten a record into a single level of dotted keys.
+
+    GraphQL `{"cursor": ..., "node": {...}}` wrappers are unwrapped, nulls and empty
+    values are dropped, lists of scalars are joined and lists of objects are kept as
+    compact JSON.
+    """
+    if not prefix and "node" in record and set(record) <= {"cursor", "node"}:
+        record = record["node"] or {}
+
+    flat = {}
+    for key, value in record.items():
+        if _is_empty(value):
+            continue
+
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, list):
+            if all(not isinstance(item, (dict, list)) for item in value):
+                flat[name] = LIST_SEPARATOR.join(str(item) for item in value)
+            else:
+                flat[name] = json.dumps(
+                    [_drop_empty(item) for item in value], separators=(",", ":")
+                )
+        else:
+            flat[name] = value
+
+    return flat
+
+
+def _drop_empty(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _drop_empty(v) for k, v in value.items() if not _is_empty(v)}
+
+    if isinstance(value, list):
+        return [_drop_empty(item) for item in value]
+
+    return value
+
+
+def _columns(rows: List[Dict[str, Any]]) -> List[str]:
+    # Every key in order of first appearance
+    return list({key: None for row in rows for key in row})
+
+
+def to_csv(rows: List[Dict[str, Any]]) -> str:
+    columns = _columns(rows)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().rstrip("\n")
+
+
+def _to_table(rows: List[Dict[str, Any]], output_format: OutputFormat) -> str:
+    if output_format == "markdown":
+        # Values straight from the API are shown as they are, not rounded
+        return to_markdown_table(rows, precision=None)
+
+    return to_csv(rows)
+
+
+class TokenSavings:
+    """Running totals of the tokens a rendered tool output takes vs its raw JSON."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: {"calls": 0, "raw": 0, "rendered": 0})
+        self._encoding = None
+
+    def count(self, text: str) -> int:
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                # The encoding is downloaded on first use, which fails offline
+                print(f"Couldn't load tiktoken encoding, estimating tokens: {e}")
+                self._encoding = False
+
+        if self._encoding is False:
+            return len(text) // 4
+
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def record(self, name: str, raw: Any, rendered: str) -> None:
+        raw_tokens = self.count(json.dumps(raw, default=str))
+        rendered_tokens = self.count(rendered)
+        with self._lock:
+            totals = self._totals[name]
+            totals["calls"] += 1
+            totals["raw"] += raw_tokens
+            totals["rendered"] += rendered_tokens
+
+    def summary(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "name": name,
+                    "calls": totals["calls"],
+                    "raw_tokens": totals["raw"],
+                    "rendered_tokens": totals["rendered"],
+                    "saved_pct": (
+                        round((1 - totals["rendered"] / totals["raw"]) * 100, 1)
+                        if totals["raw"]
+                        else 0.0
+                    ),
+                }
+                for name, totals in sorted(self._totals.items())
+            ]
+
+
+token_savings = TokenSavings()
+
+
+def render_output(
+    result: Any, output_format: Optional[OutputFormat], *, name: str = "output"
+) -> Any:
+    """Render a homogeneous list of records (e.g. the edges of a Discovery API
+    response) as a compact table for the LLM.  Anything else - error messages,
+    single objects, empty results - is returned untouched.
+
+    Args:
+        result (Any): The tool result.  Streamed records (an iterator) are
+            flattened one at a time as they arrive, or collected into a list when
+            they're not rendered.
+        output_format ("csv", "markdown", "raw", optional): Table format.  `None`
+            and "raw" leave the result untouched.  `DBT_CLOUD_OUTPUT_FORMAT`
+            overrides it for every tool that renders its output.
+        name (str, optional): Name savings are recorded under when
+            `DBT_CLOUD_MEASURE_TOKENS` is set. Defaults to "output".
+    """
+    if output_format is not None:
+        output_format = OUTPUT_FORMAT_OVERRIDE or output_format
+
+    if isinstance(result, Iterator):
+        if output_format in (None, "raw") or MEASURE_TOKENS:
+            result = list(result)
+        else:
+            rows = [flatten(record) for record in result]
+            if not rows:
+                return []
+            return _to_table(rows, output_format)
+
+    if output_format in (None, "raw") or not isinstance(result, list) or not result:
+        return result
+
+    if not all(isinstance(record, dict) for record in result):
+        return result
+
+    rows = [flatten(record) for record in result]
+    rendered = _to_table(rows, output_format)
+    if MEASURE_TOKENS:
+        token_savings.record(name, result, rendered)
+
+    return rendered
+
+
+def render_graph(
+    records: Any,
+    output_format: Optional[OutputFormat],
+    *,
+    relations: Iterable[str] = ("ancestors", "children"),
+    name: str = "output",
+) -> Any:
+    """Normalize records that embed related nodes into a node table plus an edge list
+    (see `normalize_graph`) and render both as tables.
+
+    Args:
+        records (Any): The tool result - a list of records or an iterator of
+            streamed ones.  Anything else (e.g. an error message) is returned
+            untouched.
+        output_format ("csv", "markdown", "raw", optional): Table format.  `None`
+            and "raw" return the normalized graph as a dict.
+        relations (Iterable[str], optional): Fields holding related nodes.
+            Defaults to ("ancestors", "children").
+        name (str, optional): Name savings are recorded under when
+            `DBT_CLOUD_MEASURE_TOKENS` is set. Defaults to "output".
+    """
+    if not isinstance(records, (list, Iterator)):
+        return records
+
+    if MEASURE_TOKENS and not isinstance(records, list):
+        records = list(records)
+
+    graph = normalize_graph(records, relations)
+    if not graph["nodes"]:
+        return []
+
+    output_format = OUTPUT_FORMAT_OVERRIDE or output_format
+    if output_format in (None, "raw"):
+        return graph
+
+    nodes = _to_table([flatten(node) for node in graph["nodes"]], output_format)
+    sections = [f"Nodes:\n{nodes}"]
+    if graph["edges"]:
+        edges = _to_table(graph["edges"], output_format)
+        sections.append(f"Edges (upstream -> downstream):\n{edges}")
+    rendered = "\n\n".join(sections)
+    if MEASURE_TOKENS:
+        token_savings.record(name, records, rendered)
+
+    return rendered
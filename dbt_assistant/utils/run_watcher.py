@@ -0,0 +1,243 @@
+# stdlib
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# first party
+from dbt_assistant.utils.rate_limit import RateLimiter, dbt_cloud_rate_limiter
+
+RUN_STATUSES = {
+    1: "Queued",
+    2: "Starting",
+    3: "Running",
+    10: "Success",
+    20: "Error",
+    30: "Cancelled",
+}
+FINISHED_STATUSES = {10, 20, 30}
+
+# Seconds between polls of a run: the shortest right after its status changes,
+# growing by `POLL_BACKOFF` each time it hasn't, up to the longest
+MIN_POLL_INTERVAL = float(os.getenv("DBT_CLOUD_RUN_POLL_MIN_INTERVAL", 2))
+MAX_POLL_INTERVAL = float(os.getenv("DBT_CLOUD_RUN_POLL_MAX_INTERVAL", 60))
+POLL_BACKOFF = 1.5
+# Consecutive failed polls before a watch gives up
+MAX_POLL_ERRORS = 5
+
+
+@dataclass
+class RunStatus:
+    account_id: int
+    run_id: int
+    status: Optional[int] = None
+    job_id: Optional[int] = None
+    duration: Optional[str] = None
+    href: Optional[str] = None
+    polls: int = 0
+    updated_at: float = field(default_factory=time.time)
+    # Conversations (thread IDs) still to be told the run finished
+    watchers: Set[Optional[str]] = field(default_factory=set)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def status_humanized(self) -> str:
+        return RUN_STATUSES.get(self.status, "Unknown")
+
+    def as_dict(self) -> Dict:
+        return {
+            "run_id": self.run_id,
+            "job_id": self.job_id,
+            "status": self.status_humanized,
+            "finished": self.finished,
+            "duration": self.duration,
+            "href": self.href,
+        }
+
+
+def _get_run(account_id: int, run_id: int) -> Dict:
+    # Imported here as the tools package itself depends on this one
+    from dbt_assistant.tools.base_dbt_client import pooled_client
+
+    with pooled_client() as client:
+        return client.cloud.get_run(account_id=account_id, run_id=run_id)["data"]
+
+
+class RunWatcher:
+    """Watches any number of dbt Cloud runs at once from a single background event
+    loop, so waiting on runs doesn't cost a tool call (or a thread) per poll.
+
+    Each run is polled on its own schedule: often right after its status changes,
+    then less and less often while it doesn't.  Watching a run that's already being
+    watched returns the existing watch.  A run that finishes becomes a notification
+    for every conversation (thread ID) that watched it, unless `wait` has already
+    returned it to that conversation, and is forgotten once they've all been told.
+
+    Args:
+        get_run (Callable, optional): Fetches a run's data given the account and run
+            ID. Defaults to the Admin API's `get_run`.
+        rate_limiter (RateLimiter, optional): Limiter every poll has to acquire a
+            token from. Defaults to None.
+        min_interval (float, optional): Seconds between polls after a change.
+        max_interval (float, optional): Most seconds between polls.
+    """
+
+    def __init__(
+        self,
+        *,
+        get_run: Callable[[int, int], Dict] = _get_run,
+        rate_limiter: RateLimiter = None,
+        min_interval: float = MIN_POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL,
+    ):
+        self.get_run = get_run
+        self.rate_limiter = rate_limiter
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._watches: Dict[Tuple[int, int], Future] = {}
+        self._statuses: Dict[Tuple[int, int], RunStatus] = {}
+        # Finished runs, in the order they finished
+        self._finished: Dict[Tuple[int, int], RunStatus] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=self._loop.run_forever, name="dbt-run-watcher", daemon=True
+            ).start()
+        return self._loop
+
+    def _poll_once(self, account_id: int, run_id: int) -> Dict:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return self.get_run(account_id, run_id)
+
+    async def _watch(self, status: RunStatus) -> RunStatus:
+        loop = asyncio.get_running_loop()
+        interval, errors = self.min_interval, 0
+        while True:
+            try:
+                # The clients are synchronous, so polls run on the default executor
+                data = await loop.run_in_executor(
+                    None, self._poll_once, status.account_id, status.run_id
+                )
+            except Exception as e:
+                errors += 1
+                if errors >= MAX_POLL_ERRORS:
+                    raise
+                print(f"Couldn't poll run {status.run_id}, retrying: {e}")
+                interval = min(interval * POLL_BACKOFF, self.max_interval)
+            else:
+                errors = 0
+                status.polls += 1
+                changed = data.get("status") != status.status
+                status.status = data.get("status")
+                status.job_id = data.get("job_definition_id") or status.job_id
+                status.duration = data.get("duration_humanized") or status.duration
+                status.href = data.get("href") or status.href
+                status.updated_at = time.time()
+                if status.finished:
+                    with self._lock:
+                        self._finished[(status.account_id, status.run_id)] = status
+                    return status
+
+                if changed:
+                    interval = self.min_interval
+                else:
+                    interval = min(interval * POLL_BACKOFF, self.max_interval)
+
+            await asyncio.sleep(interval)
+
+    def _start(
+        self, account_id: int, run_id: int, thread_id: Optional[str]
+    ) -> RunStatus:
+        # Called with the lock held
+        key = (account_id, run_id)
+        status = self._statuses.setdefault(key, RunStatus(account_id, run_id))
+        status.watchers.add(thread_id)
+        watch = self._watches.get(key)
+        # A watch that failed is started again
+        if watch is None or (watch.done() and watch.exception()):
+            self._watches[key] = asyncio.run_coroutine_threadsafe(
+                self._watch(status), self._ensure_loop()
+            )
+        return status
+
+    def _delivered(self, status: RunStatus, thread_id: Optional[str]) -> None:
+        # Called with the lock held
+        status.watchers.discard(thread_id)
+        if not status.watchers:
+            key = (status.account_id, status.run_id)
+            self._watches.pop(key, None)
+            self._statuses.pop(key, None)
+            self._finished.pop(key, None)
+
+    def watch(self, account_id: int, run_id: int, thread_id: str = None) -> Future:
+        """Start watching a run on behalf of a conversation, unless it already is.
+
+        Args:
+            account_id (int): Numeric ID of the account.
+            run_id (int): Numeric ID of the run.
+            thread_id (str, optional): Conversation to notify once the run has
+                finished. Defaults to None.
+
+        Returns:
+            Future: Resolves to the run's `RunStatus` once it has finished.
+        """
+        with self._lock:
+            self._start(account_id, run_id, thread_id)
+            return self._watches[(account_id, run_id)]
+
+    def wait(
+        self,
+        account_id: int,
+        run_ids: List[int],
+        timeout: float = None,
+        thread_id: str = None,
+    ) -> List[RunStatus]:
+        """Block until every run has finished or `timeout` seconds have passed,
+        without polling from the calling thread.
+
+        Runs that have finished count as delivered to `thread_id`, so they aren't
+        announced to it again.
+
+        Returns:
+            List[RunStatus]: The latest status of every run, in order.
+        """
+        with self._lock:
+            statuses = [
+                self._start(account_id, run_id, thread_id) for run_id in run_ids
+            ]
+            watches = [self._watches[(account_id, run_id)] for run_id in run_ids]
+
+        wait(watches, timeout=timeout)
+        with self._lock:
+            for status in statuses:
+                if status.finished:
+                    self._delivered(status, thread_id)
+        return statuses
+
+    def notifications(self, thread_id: str = None) -> List[RunStatus]:
+        """Runs watched by `thread_id` that finished since its last call, and haven't
+        been returned to it by `wait` already.
+        """
+        with self._lock:
+            finished = [
+                status
+                for status in self._finished.values()
+                if thread_id in status.watchers
+            ]
+            for status in finished:
+                self._delivered(status, thread_id)
+        return finished
+
+
+run_watcher = RunWatcher(rate_limiter=dbt_cloud_rate_limiter)
@@ -0,0 +1,195 @@
+# stdlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# third party
+import orjson
+import requests
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+CHUNK_SIZE = 64 * 1024
+
+_START = ("start_map", "start_array")
+_END = ("end_map", "end_array")
+
+
+class ChunkReader:
+    """File-like view over an iterator of byte chunks (e.g. `iter_content`), so
+    incremental parsers can consume a response body as it arrives.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            data = self._buffer + b"".join(self._chunks)
+            self._buffer = b""
+            return data
+
+        while len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _walk(document: Any, path: str) -> Any:
+    current = document
+    for key in path.split(".") if path else []:
+        if isinstance(current, dict):
+            current = current.get(key)
+        elif isinstance(current, list) and key == "item":
+            # Only the first element is captured, like a scalar ijson prefix
+            current = current[0] if current else None
+        else:
+            return None
+    return current
+
+
+def iter_section(
+    fileobj, path: str, capture: Optional[Dict[str, Any]] = None
+) -> Iterator[Any]:
+    """Yield the elements of the array - or the values of the object - found at
+    `path` in a JSON document, one at a time, without decoding the whole document.
+
+    Args:
+        fileobj: Anything with a `read(size)` method returning bytes.
+        path (str): Dotted path to the section, e.g.
+            "data.environment.applied.models.edges" or "nodes".
+        capture (Dict[str, Any], optional): Scalars to pick up along the way, keyed
+            by their dotted path (e.g. "data.environment.applied.models.pageInfo
+            .endCursor").  Values are filled in as they're parsed.
+    """
+    capture = capture if capture is not None else {}
+    if ijson is None:
+        # No incremental parser available - decode in one go with orjson
+        document = orjson.loads(fileobj.read())
+        for prefix in capture:
+            capture[prefix] = _walk(document, prefix)
+        section = _walk(document, path)
+        if isinstance(section, dict):
+            yield from section.values()
+        elif isinstance(section, list):
+            yield from section
+        return
+
+    in_section = False
+    builder = None
+    depth = 0
+    for prefix, event, value in ijson.parse(fileobj, use_float=True):
+        if not in_section:
+            if prefix == path and event in _START:
+                in_section = True
+            elif prefix in capture and event not in _START + _END + ("map_key",):
+                capture[prefix] = value
+            continue
+
+        if builder is None:
+            if event in _END:
+                # The section is done, but keep going for anything captured after it
+                in_section = False
+            elif event in _START:
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                depth = 1
+            elif event != "map_key":
+                yield value
+            continue
+
+        builder.event(event, value)
+        if event in _START:
+            depth += 1
+        elif event in _END:
+            depth -= 1
+            if depth == 0:
+                yield builder.value
+                builder = None
+
+
+class StreamedQuery:
+    """Discovery API query whose result list is streamed out of the response body,
+    page after page, as it arrives.
+
+    Iterate over it to get the items at `path`.  Pagination follows the query's
+    `pageInfo`, the same way `client.metadata.query` does.  GraphQL error messages
+    are collected in `errors`, as are HTTP errors - which end the iteration, as
+    their body isn't a result.
+
+    Args:
+        client: A `dbtCloudClient`.
+        query (str): The GraphQL query.
+        variables (Dict): Variables for the query.
+        path (str): Dotted path to the list, e.g.
+            "data.environment.applied.models.edges".
+        max_pages (int, optional): Stop after this many pages. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        client,
+        query: str,
+        variables: Dict,
+        path: str,
+        *,
+        max_pages: int = None,
+    ):
+        self.client = client
+        self.query = query
+        self.variables = dict(variables or {})
+        self.path = path
+        self.max_pages = max_pages
+        self.errors: List[str] = []
+        self.pages = 0
+
+    @property
+    def _paginates(self) -> bool:
+        return "pageInfo" in self.query and self.query.count("$after") >= 2
+
+    def _post(self, variables: Dict) -> requests.Response:
+        metadata = self.client.metadata
+        return metadata.session.post(
+            metadata.full_url(),
+            json={"query": self.query, "variables": variables},
+            stream=True,
+        )
+
+    def __iter__(self) -> Iterator[Dict]:
+        page_info = self.path.rsplit(".", 1)[0] + ".pageInfo"
+        variables = dict(self.variables)
+        while True:
+            capture = {
+                f"{page_info}.hasNextPage": None,
+                f"{page_info}.endCursor": None,
+                "errors.item.message": None,
+            }
+            with self._post(variables) as response:
+                if not response.ok:
+                    self.errors.append(
+                        f"HTTP {response.status_code} {response.reason}: "
+                        f"{response.text[:500]}"
+                    )
+                    return
+
+                reader = ChunkReader(response.iter_content(CHUNK_SIZE))
+                yield from iter_section(reader, self.path, capture)
+
+            self.pages += 1
+            if capture["errors.item.message"]:
+                self.errors.append(capture["errors.item.message"])
+
+            cursor = capture[f"{page_info}.endCursor"]
+            if not (self._paginates and capture[f"{page_info}.hasNextPage"] and cursor):
+                return
+
+            if self.max_pages and self.pages >= self.max_pages:
+                return
+
+            variables["after"] = cursor